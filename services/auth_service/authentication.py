@@ -0,0 +1,142 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from core.metrics import TOKEN_CACHE
+
+CACHE_PREFIX = 'auth:token:'
+
+
+def _settings():
+    defaults = {'LOCAL_MAXSIZE': 1024, 'LOCAL_TTL': 30, 'SHARED_TTL': 300}
+    defaults.update(getattr(settings, 'TOKEN_AUTH_CACHE', {}))
+    return defaults
+
+
+def _cache_key(key):
+    return CACHE_PREFIX + hashlib.sha256(key.encode()).hexdigest()
+
+
+class LocalTTLCache:
+    def __init__(self):
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl, maxsize):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+local_cache = LocalTTLCache()
+
+
+def invalidate_token(key):
+    cache_key = _cache_key(key)
+    local_cache.delete(cache_key)
+    cache.delete(cache_key)
+
+
+def invalidate_tokens(keys):
+    cache_keys = [_cache_key(key) for key in keys]
+    for cache_key in cache_keys:
+        local_cache.delete(cache_key)
+    if cache_keys:
+        cache.delete_many(cache_keys)
+
+
+def invalidate_user_tokens(*users):
+    user_ids = [getattr(user, 'pk', user) for user in users]
+    invalidate_tokens(Token.objects.filter(user_id__in=user_ids).values_list('key', flat=True))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication que guarda la resolución token -> usuario en caché.
+
+    Primero consulta un LRU local del proceso y luego la caché de Django
+    (compartida entre workers); solo si ambas fallan se consulta la base de
+    datos. Las entradas se invalidan al guardar el usuario o borrar el token
+    (``auth_service.signals``); los UPDATE masivos de usuarios no disparan
+    señales y deben llamar a ``invalidate_tokens``.
+
+    La invalidación solo puede borrar el LRU del proceso que la hace, así que
+    un acierto local vale mientras la entrada siga en la caché compartida: si
+    otro worker la borró, se vuelve a resolver el token.
+    """
+
+    def authenticate_credentials(self, key):
+        options = _settings()
+        cache_key = _cache_key(key)
+
+        cached = local_cache.get(cache_key)
+        result = 'local'
+        if cached is not None and not cache.has_key(cache_key):
+            local_cache.delete(cache_key)
+            cached = None
+        if cached is None:
+            cached = cache.get(cache_key)
+            result = 'shared'
+            if cached is not None:
+                local_cache.set(cache_key, cached, options['LOCAL_TTL'], options['LOCAL_MAXSIZE'])
+
+        if cached is None:
+            result = 'miss'
+            user, token = super().authenticate_credentials(key)
+            cached = (user, token)
+            cache.set(cache_key, cached, options['SHARED_TTL'])
+            local_cache.set(cache_key, cached, options['LOCAL_TTL'], options['LOCAL_MAXSIZE'])
+
+        TOKEN_CACHE.labels(result).inc()
+        user, token = cached
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+
+        # Cada request recibe su propia copia: las vistas modifican request.user.
+        user = copy.copy(user)
+        token = copy.copy(token)
+        token.user = user
+        return user, token
+
+
+class QueryParamTokenAuthentication(CachedTokenAuthentication):
+    """Token en ``?token=``, para clientes que no pueden enviar headers (EventSource).
+
+    Usar solo en vistas de lectura que lo necesiten: el token queda en los
+    logs de acceso.
+    """
+
+    def authenticate(self, request):
+        key = request.query_params.get('token')
+        if not key:
+            return None
+        return self.authenticate_credentials(key)
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DniRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dni', models.CharField(max_length=8, unique=True)),
+                ('payload', models.JSONField()),
+                ('fetched_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Registro RENIEC',
+                'verbose_name_plural': 'Registros RENIEC',
+            },
+        ),
+    ]
@@ -1,3 +1,14 @@
 from django.db import models
 
-# Create your models here.
+
+class DniRecord(models.Model):
+    dni = models.CharField(max_length=8, unique=True)
+    payload = models.JSONField()
+    fetched_at = models.DateTimeField()
+
+    def __str__(self):
+        return self.dni
+
+    class Meta:
+        verbose_name = 'Registro RENIEC'
+        verbose_name_plural = 'Registros RENIEC'
@@ -2,7 +2,7 @@ from rest_framework import serializers
 from users_service.models import User
 from django.contrib.auth import authenticate
 from rest_framework.validators import UniqueValidator
-from .utils.reniec import validate_dni
+from .utils.reniec import validate_dni, ReniecUnavailable
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
     dni = serializers.CharField(
@@ -60,23 +60,24 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
     def validate(self, data):
         if data.get('password') != data.get('password_confirm'):
             raise serializers.ValidationError({'password_confirm': 'Las contraseñas no coinciden.'})
-        return data
 
-    def create(self, validated_data):
-        dni = validated_data['dni']
-        result = validate_dni(dni)
+        # La consulta a RENIEC va aquí y no en create(): así corre antes de que
+        # la vista abra la transacción del registro.
+        try:
+            result = validate_dni(data['dni'])
+        except ReniecUnavailable:
+            raise serializers.ValidationError({
+                'dni': "El servicio de validación de DNI no está disponible. Intente nuevamente en unos minutos."
+            })
 
-        print(result)
-        
         if not result or not all(k in result for k in ['nombres', 'apellidoPaterno', 'apellidoMaterno']):
             raise serializers.ValidationError({'dni': "El DNI proporcionado no es válido."})
 
-        first_name = result.get('nombres', '').strip().lower()
-        last_name = f"{result.get('apellidoPaterno', '')} {result.get('apellidoMaterno', '')}".strip().lower()
-
-        validated_data['first_name'] = first_name
-        validated_data['last_name'] = last_name
+        data['first_name'] = result.get('nombres', '').strip().lower()
+        data['last_name'] = f"{result.get('apellidoPaterno', '')} {result.get('apellidoMaterno', '')}".strip().lower()
+        return data
 
+    def create(self, validated_data):
         validated_data.pop('password_confirm', None)
         password = validated_data.pop('password')
 
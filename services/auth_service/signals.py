@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import invalidate_token, invalidate_user_tokens
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_saved_user(sender, instance, created, update_fields=None, **kwargs):
+    # Un usuario recién creado no tiene tokens en caché, y el login solo toca last_login.
+    if created or (update_fields is not None and set(update_fields) == {'last_login'}):
+        return
+    user_id = instance.pk
+    transaction.on_commit(lambda: invalidate_user_tokens(user_id))
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    # Cubre también el borrado del usuario: sus tokens caen en cascada.
+    key = instance.key
+    transaction.on_commit(lambda: invalidate_token(key))
@@ -1,3 +1,90 @@
-from django.test import TestCase
+from unittest.mock import Mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+from core.testing import QueryBudgetTestCase
+from users_service.models import User
+from .authentication import CachedTokenAuthentication, _cache_key, local_cache
+from .utils import reniec
+from .utils.reniec import ApisPeruBackend, ReniecClient, ReniecUnavailable
+
+
+class AuthQueryBudgetTests(QueryBudgetTestCase):
+    def test_register(self):
+        response = self.assertQueryBudget('register', None, method='post', data={
+            'dni': '45678912',
+            'email': 'nuevo@example.com',
+            'password': 'clave-segura-123',
+            'password_confirm': 'clave-segura-123',
+        }, format='json', status_code=201)
+        self.assertIn('token', response.data)
+
+    def test_login(self):
+        self.assertQueryBudget('login', None, method='post', data={
+            'email': self.user.email,
+            'password': 'clave-segura-123',
+        }, format='json')
+
+    def test_logout(self):
+        self.assertQueryBudget('logout', self.user, method='post')
+
+
+class ReniecParseTests(SimpleTestCase):
+    def setUp(self):
+        self.backend = ApisPeruBackend(reniec._settings())
+
+    def test_invalid_json_counts_as_unavailable(self):
+        response = Mock(status_code=200)
+        response.json.side_effect = ValueError('Expecting value')
+        with self.assertRaises(ReniecUnavailable):
+            self.backend.parse(response)
+
+    def test_invalid_json_opens_circuit(self):
+        client = ReniecClient(dict(reniec._settings(), FAILURE_THRESHOLD=1))
+        client.get_cached = lambda dni: None
+        response = Mock(status_code=200)
+        response.json.side_effect = ValueError('Expecting value')
+        client.backend.session.get = Mock(return_value=response)
+
+        with self.assertRaises(ReniecUnavailable):
+            client.lookup('12345678')
+        self.assertFalse(client.breaker.allow())
+
+
+class TokenInvalidationTests(QueryBudgetTestCase):
+    def authenticate(self, key):
+        return CachedTokenAuthentication().authenticate_credentials(key)
+
+    def test_user_save_drops_cached_token(self):
+        token = Token.objects.create(user=self.user)
+        self.authenticate(token.key)
+        self.assertIsNotNone(local_cache.get(_cache_key(token.key)))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.get(pk=self.user.pk).save()
+        self.assertIsNone(local_cache.get(_cache_key(token.key)))
+
+    def test_token_delete_drops_cached_token(self):
+        token = Token.objects.create(user=self.user)
+        self.authenticate(token.key)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.get(pk=self.user.pk).delete()
+        self.assertIsNone(local_cache.get(_cache_key(token.key)))
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token.key)
+
+    def test_invalidation_from_another_worker(self):
+        token = Token.objects.create(user=self.user)
+        self.authenticate(token.key)
+
+        # Otro worker desactiva al usuario: solo puede borrar la caché compartida.
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        cache.delete(_cache_key(token.key))
+        self.assertIsNotNone(local_cache.get(_cache_key(token.key)))
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token.key)
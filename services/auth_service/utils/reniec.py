@@ -1,14 +1,267 @@
-import requests 
-from dotenv import load_dotenv
+import asyncio
+import hashlib
+import logging
 import os
+import threading
+import time
+import weakref
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+from auth_service.models import DniRecord
+from core.metrics import observe_outbound
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
 
 load_dotenv()
 
 API_KEY = os.getenv("API_KEY")
 
+REQUIRED_KEYS = ['nombres', 'apellidoPaterno', 'apellidoMaterno']
+
+logger = logging.getLogger(__name__)
+
+
+class ReniecUnavailable(Exception):
+    pass
+
+
+def _settings():
+    defaults = {
+        'BACKEND': 'auth_service.utils.reniec.ApisPeruBackend',
+        'URL': 'https://dniruc.apisperu.com/api/v1/dni/',
+        'CONNECT_TIMEOUT': 2,
+        'READ_TIMEOUT': 4,
+        'POOL_SIZE': 10,
+        'FAILURE_THRESHOLD': 5,
+        'RESET_TIMEOUT': 30,
+        'CACHE_DAYS': 365,
+    }
+    defaults.update(getattr(settings, 'RENIEC', {}))
+    return defaults
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            # Medio abierto: deja pasar una petición de prueba cada reset_timeout.
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class ApisPeruBackend:
+    def __init__(self, options):
+        self.url = options['URL']
+        self.api_key = options.get('API_KEY') or API_KEY
+        self.timeout = (options['CONNECT_TIMEOUT'], options['READ_TIMEOUT'])
+        self.pool_size = options['POOL_SIZE']
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=options['POOL_SIZE'])
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        # Un cliente httpx por event loop: sus conexiones no se comparten entre loops.
+        self._async_clients = weakref.WeakKeyDictionary()
+
+    def parse(self, response):
+        if response.status_code >= 500 or response.status_code == 429:
+            raise ReniecUnavailable(f"HTTP {response.status_code}")
+        if response.status_code != 200:
+            return {"error": "Error al conectar con el servicio de validación de DNI."}
+        # Un 200 con un cuerpo que no es JSON también cuenta como caída del servicio.
+        try:
+            data = response.json()
+        except ValueError as e:
+            raise ReniecUnavailable(f"Respuesta inválida: {e}")
+        if not isinstance(data, dict):
+            raise ReniecUnavailable("Respuesta inválida")
+        return data
+
+    def lookup(self, dni):
+        with observe_outbound('reniec'):
+            try:
+                response = self.session.get(
+                    f"{self.url}{dni}",
+                    params={'token': self.api_key},
+                    timeout=self.timeout
+                )
+            except requests.RequestException as e:
+                raise ReniecUnavailable(str(e))
+            return self.parse(response)
+
+    def async_client(self):
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout[1], connect=self.timeout[0]),
+                limits=httpx.Limits(max_connections=self.pool_size)
+            )
+            self._async_clients[loop] = client
+        return client
+
+    async def alookup(self, dni):
+        if httpx is None:
+            return await asyncio.to_thread(self.lookup, dni)
+
+        with observe_outbound('reniec'):
+            try:
+                response = await self.async_client().get(
+                    f"{self.url}{dni}",
+                    params={'token': self.api_key}
+                )
+            except httpx.HTTPError as e:
+                raise ReniecUnavailable(str(e))
+            return self.parse(response)
+
+
+class FakeBackend:
+    """Backend local sin red para desarrollo y pruebas.
+
+    Devuelve los registros de ``RENIEC['FAKE_RECORDS']`` o, si el DNI no está
+    ahí, un nombre determinístico derivado del propio DNI.
+    """
+
+    FIRST_NAMES = ['JUAN', 'MARIA', 'CARLOS', 'ROSA', 'LUIS', 'ANA', 'JORGE', 'LUCIA']
+    LAST_NAMES = ['QUISPE', 'FLORES', 'SANCHEZ', 'GARCIA', 'ROJAS', 'TORRES', 'MENDOZA', 'RAMOS']
+
+    def __init__(self, options):
+        self.records = options.get('FAKE_RECORDS', {})
+
+    def lookup(self, dni):
+        if dni in self.records:
+            return self.records[dni]
+
+        digest = hashlib.sha256(dni.encode()).digest()
+        return {
+            'success': True,
+            'dni': dni,
+            'nombres': self.FIRST_NAMES[digest[0] % len(self.FIRST_NAMES)],
+            'apellidoPaterno': self.LAST_NAMES[digest[1] % len(self.LAST_NAMES)],
+            'apellidoMaterno': self.LAST_NAMES[digest[2] % len(self.LAST_NAMES)],
+        }
+
+
+class ReniecClient:
+    def __init__(self, options):
+        self.options = options
+        self.backend = import_string(options['BACKEND'])(options)
+        self.breaker = CircuitBreaker(options['FAILURE_THRESHOLD'], options['RESET_TIMEOUT'])
+
+    def get_cached(self, dni):
+        max_age = timezone.now() - timedelta(days=self.options['CACHE_DAYS'])
+        record = DniRecord.objects.filter(dni=dni, fetched_at__gte=max_age).first()
+        return record.payload if record else None
+
+    async def aget_cached(self, dni):
+        max_age = timezone.now() - timedelta(days=self.options['CACHE_DAYS'])
+        record = await DniRecord.objects.filter(dni=dni, fetched_at__gte=max_age).afirst()
+        return record.payload if record else None
+
+    def store(self, dni, payload):
+        DniRecord.objects.update_or_create(
+            dni=dni,
+            defaults={'payload': payload, 'fetched_at': timezone.now()}
+        )
+
+    async def astore(self, dni, payload):
+        await DniRecord.objects.aupdate_or_create(
+            dni=dni,
+            defaults={'payload': payload, 'fetched_at': timezone.now()}
+        )
+
+    def lookup(self, dni):
+        cached = self.get_cached(dni)
+        if cached is not None:
+            return cached
+
+        if not self.breaker.allow():
+            raise ReniecUnavailable("Circuito abierto")
+
+        try:
+            result = self.backend.lookup(dni)
+        except ReniecUnavailable as e:
+            self.breaker.record_failure()
+            logger.warning("Consulta de DNI fallida: %s", e)
+            raise
+        self.breaker.record_success()
+
+        if result and all(k in result for k in REQUIRED_KEYS):
+            self.store(dni, result)
+        return result
+
+    async def alookup(self, dni):
+        cached = await self.aget_cached(dni)
+        if cached is not None:
+            return cached
+
+        if not self.breaker.allow():
+            raise ReniecUnavailable("Circuito abierto")
+
+        try:
+            if hasattr(self.backend, 'alookup'):
+                result = await self.backend.alookup(dni)
+            else:
+                result = await asyncio.to_thread(self.backend.lookup, dni)
+        except ReniecUnavailable as e:
+            self.breaker.record_failure()
+            logger.warning("Consulta de DNI fallida: %s", e)
+            raise
+        self.breaker.record_success()
+
+        if result and all(k in result for k in REQUIRED_KEYS):
+            await self.astore(dni, result)
+        return result
+
+
+_client = None
+_client_options = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    global _client, _client_options
+    options = _settings()
+    with _client_lock:
+        if _client is None or options != _client_options:
+            _client = ReniecClient(options)
+            _client_options = options
+    return _client
+
+
 def validate_dni(dni):
-    url = f"https://dniruc.apisperu.com/api/v1/dni/{dni}?token={API_KEY}"
-    response = requests.get(url)
-    if response.status_code != 200:
-        return {"error": "Error al conectar con el servicio de validación de DNI."}
-    return response.json()
\ No newline at end of file
+    return get_client().lookup(dni)
+
+
+async def avalidate_dni(dni):
+    return await get_client().alookup(dni)
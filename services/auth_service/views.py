@@ -1,11 +1,12 @@
-import requests
-from django.contrib.auth import authenticate, login, logout
+from django.contrib.auth import login, logout
+from django.db import transaction
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.authtoken.models import Token
 
+from outbox_service.outbox import enqueue_email
 from .serializers import (
     UserRegistrationSerializer,
     UserLoginSerializer,
@@ -18,15 +19,16 @@ class UserRegistrationView(APIView):
     def post(self, request):
         serializer = UserRegistrationSerializer(data=request.data)
         if serializer.is_valid():
-            user = serializer.save()
-            token, _ = Token.objects.get_or_create(user=user)
+            with transaction.atomic():
+                user = serializer.save()
+                token, _ = Token.objects.get_or_create(user=user)
+                enqueue_email(
+                    user.email,
+                    "Bienvenido a Roadify!",
+                    f"Hola {user.first_name}, gracias por registrarte en Roadify.",
+                )
             user_data = UserSerializer(user).data
 
-            requests.post(
-                "http://notification_service:3001/send-email",
-                json={"email": user.email, "subject": "Bienvenido a Roadify!", "message": f"Hola {user.first_name}, gracias por registrarte en Roadify."},
-            )
-
             return Response(
                 {
                     "message": "Registro exitoso",
@@ -46,15 +48,8 @@ class UserLoginView(APIView):
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        email = serializer.validated_data["email"]
-        password = serializer.validated_data["password"]
-
-        user = authenticate(request, username=email, password=password)
-        if not user:
-            return Response(
-                {"error": "Credenciales inválidas"},
-                status=status.HTTP_401_UNAUTHORIZED,
-            )
+        # El serializer ya autenticó al usuario; no repetir el hash de la contraseña.
+        user = serializer.validated_data["user"]
 
         token, _ = Token.objects.get_or_create(user=user)
         user_data = UserSerializer(user, context={'request': request}).data
@@ -0,0 +1,87 @@
+"""Carga concurrente contra los endpoints de lectura (ver benchmarks/README.md).
+
+Uso:
+    python benchmarks/read_endpoints.py --url http://127.0.0.1:8000 --token <token> \
+        --concurrency 64 --duration 20
+"""
+import argparse
+import statistics
+import threading
+import time
+
+import requests
+
+DEFAULT_PATHS = [
+    '/api/incidents/',
+    '/api/incidents/?include_archived=true',
+    '/api/incidents/heatmap/?type=theft',
+    '/api/dashboard/my-stats/',
+]
+
+
+def worker(base_url, token, paths, deadline, results, lock):
+    session = requests.Session()
+    session.headers['Authorization'] = f'Token {token}'
+    latencies = []
+    errors = 0
+    index = 0
+    while time.monotonic() < deadline:
+        path = paths[index % len(paths)]
+        index += 1
+        started = time.monotonic()
+        try:
+            response = session.get(base_url + path, timeout=30)
+            if response.status_code != 200:
+                errors += 1
+        except requests.RequestException:
+            errors += 1
+        latencies.append(time.monotonic() - started)
+    with lock:
+        results['latencies'].extend(latencies)
+        results['errors'] += errors
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--token', required=True)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=15)
+    parser.add_argument('--path', action='append', dest='paths')
+    args = parser.parse_args()
+
+    paths = args.paths or DEFAULT_PATHS
+    results = {'latencies': [], 'errors': 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.duration
+
+    threads = [
+        threading.Thread(target=worker, args=(args.url.rstrip('/'), args.token, paths, deadline, results, lock))
+        for _ in range(args.concurrency)
+    ]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    latencies = results['latencies']
+    print(f'peticiones: {len(latencies)} en {elapsed:.1f}s ({len(latencies) / elapsed:.1f} req/s), errores: {results["errors"]}')
+    print(
+        f'latencia ms: p50 {percentile(latencies, 50) * 1000:.0f}, '
+        f'p95 {percentile(latencies, 95) * 1000:.0f}, '
+        f'p99 {percentile(latencies, 99) * 1000:.0f}, '
+        f'media {statistics.fmean(latencies) * 1000 if latencies else 0:.0f}'
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+import inspect
+
+from asgiref.sync import sync_to_async
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.views import APIView
+
+from .routers import is_pinned, replicas, use_replica
+
+
+class AsyncAPIView(APIView):
+    """APIView cuyos handlers (``get``, ``post``...) son corrutinas.
+
+    DRF no ejecuta vistas async por sí mismo: la autenticación, los permisos y
+    el throttling siguen siendo código síncrono que puede tocar la base, así
+    que corren con ``sync_to_async`` y solo el handler se espera en el event
+    loop. Con ``use_read_replica`` las lecturas van a la réplica igual que con
+    ``ReadReplicaMixin``.
+    """
+
+    use_read_replica = False
+
+    def _initial(self, request, *args, **kwargs):
+        self.initial(request, *args, **kwargs)
+        return bool(
+            self.use_read_replica
+            and request.method in SAFE_METHODS
+            and replicas()
+            and not is_pinned(request.user)
+        )
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            replica = await sync_to_async(self._initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            with use_replica(replica):
+                response = handler(request, *args, **kwargs)
+                if inspect.isawaitable(response):
+                    response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
@@ -0,0 +1,95 @@
+from contextlib import contextmanager
+
+from django.db import connections, models
+from django.db.models import signals
+from django.db.models.deletion import Collector
+
+
+@contextmanager
+def explicit_auto_now_add(model, *field_names):
+    """Permite asignar a mano campos ``auto_now_add`` (p. ej. en bulk_create).
+
+    Django sobrescribe esos campos con la hora actual al insertar; dentro de
+    este bloque se respeta el valor que traiga cada instancia. Pensado para
+    comandos de carga masiva, no para el código de las vistas.
+    """
+    fields = [model._meta.get_field(name) for name in field_names]
+    previous = [field.auto_now_add for field in fields]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, value in zip(fields, previous):
+            field.auto_now_add = value
+
+
+def _file_fields(model):
+    return [field.attname for field in model._meta.concrete_fields if isinstance(field, models.FileField)]
+
+
+def raw_cascade_delete(queryset, files=None, send_signals=True):
+    """Borra las filas de ``queryset`` y sus dependencias CASCADE con DELETE directos.
+
+    A diferencia de ``QuerySet.delete()``, no carga los objetos en memoria:
+    baja por las relaciones CASCADE usando subconsultas. Si algún modelo del
+    árbol tiene señales de borrado o relaciones que no son CASCADE, ese bloque
+    se borra con el ORM normal para no saltarse ninguna lógica; con
+    ``send_signals=False`` las señales se ignoran y solo cuentan las
+    relaciones. Los nombres de los archivos de FileField borrados se agregan a
+    ``files``.
+    """
+    model = queryset.model
+
+    if files is not None:
+        fields = _file_fields(model)
+        if fields:
+            for values in queryset.values_list(*fields):
+                files.extend(name for name in values if name)
+
+    if send_signals and (signals.pre_delete.has_listeners(model) or signals.post_delete.has_listeners(model)):
+        return _orm_delete(queryset, files)
+
+    for relation in model._meta.related_objects:
+        if relation.many_to_many:
+            return _orm_delete(queryset, files)
+        if relation.on_delete is models.DO_NOTHING:
+            continue
+        if relation.on_delete is not models.CASCADE:
+            return _orm_delete(queryset, files)
+
+        related = relation.related_model._base_manager.using(queryset.db).filter(
+            **{f'{relation.field.name}__in': queryset.values(relation.field.target_field.attname)}
+        )
+        raw_cascade_delete(related, files, send_signals)
+
+    return queryset._raw_delete(queryset.db)
+
+
+def _orm_delete(queryset, files):
+    collector = Collector(using=queryset.db)
+    collector.collect(queryset)
+    if files is not None:
+        for model, instances in collector.data.items():
+            if model is queryset.model:
+                continue
+            for field in _file_fields(model):
+                files.extend(getattr(obj, field).name for obj in instances if getattr(obj, field))
+    return collector.delete()[1].get(queryset.model._meta.label, 0)
+
+
+def insert_from_select(model, queryset, fields):
+    """Copia filas con un único ``INSERT INTO ... SELECT`` sin pasar por Python.
+
+    ``queryset`` debe ser un ``values_list`` cuyas columnas correspondan, en
+    orden, a los ``fields`` (attnames) de ``model``. Devuelve las filas insertadas.
+    """
+    connection = connections[queryset.db]
+    sql, params = queryset.order_by().query.get_compiler(queryset.db).as_sql()
+    table = connection.ops.quote_name(model._meta.db_table)
+    columns = ', '.join(
+        connection.ops.quote_name(model._meta.get_field(name).column) for name in fields
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f'INSERT INTO {table} ({columns}) {sql}', params)
+        return cursor.rowcount
@@ -0,0 +1,305 @@
+import asyncio
+import itertools
+import queue
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import StreamingHttpResponse
+from django.utils.module_loading import import_string
+
+from .renderers import format_event
+from .throttling import Overloaded
+
+CACHE_PREFIX = 'events:'
+CACHE_SEQUENCE_KEY = CACHE_PREFIX + 'seq'
+
+
+def _settings():
+    defaults = {
+        'BACKEND': 'core.events.LocalBroker',
+        'KEEPALIVE': 15,
+        'MAX_DURATION': 300,
+        'MAX_SUBSCRIBERS': 100,
+        'RETRY_AFTER': 5,
+        'BUFFER_SIZE': 500,
+        'CACHE_TTL': 300,
+        'POLL_INTERVAL': 1,
+    }
+    defaults.update(getattr(settings, 'EVENTS', {}))
+    return defaults
+
+
+class Subscription:
+    """Cola de eventos de un cliente conectado.
+
+    ``get``/``aget`` esperan hasta ``timeout`` segundos y devuelven la lista
+    de eventos nuevos (vacía si no llegó ninguno).
+    """
+
+    def __init__(self, broker, backlog):
+        self.broker = broker
+        self.backlog = list(backlog)
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class LocalSubscription(Subscription):
+    """Los eventos se encolan en una ``queue.Queue``; ``aget`` además se despierta
+    con un ``asyncio.Event`` del loop que consume el stream.
+
+    El loop se toma en cada espera y no al suscribirse: bajo WSGI la vista
+    async corre en un loop temporal distinto del que luego recorre el stream.
+    """
+
+    def __init__(self, broker, backlog):
+        super().__init__(broker, backlog)
+        self.queue = queue.Queue()
+        self.loop = None
+        self.wakeup = None
+
+    def put(self, event):
+        self.queue.put(event)
+        loop, wakeup = self.loop, self.wakeup
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                # El loop ya se cerró: el stream terminó sin cerrar la suscripción.
+                self.close()
+
+    def drain(self):
+        events, self.backlog = self.backlog, []
+        while True:
+            try:
+                events.append(self.queue.get_nowait())
+            except queue.Empty:
+                return events
+
+    def get(self, timeout):
+        events = self.drain()
+        if events:
+            return events
+        try:
+            events.append(self.queue.get(timeout=timeout))
+        except queue.Empty:
+            return events
+        return events + self.drain()
+
+    async def aget(self, timeout):
+        events = self.drain()
+        if events:
+            return events
+        self.wakeup = asyncio.Event()
+        self.loop = asyncio.get_running_loop()
+        # Lo que llegó antes de registrar el loop no despertó a nadie.
+        events = self.drain()
+        if events:
+            return events
+        try:
+            await asyncio.wait_for(self.wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.drain()
+
+
+class Broker:
+    def __init__(self, options):
+        self.options = options
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, last_event_id=None):
+        """Registra un cliente; devuelve ``None`` si el proceso ya tiene el máximo."""
+        with self._lock:
+            if len(self._subscribers) >= self.options['MAX_SUBSCRIBERS']:
+                return None
+            subscription = self.create_subscription(last_event_id)
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, name, data):
+        raise NotImplementedError
+
+    def create_subscription(self, last_event_id):
+        raise NotImplementedError
+
+
+class LocalBroker(Broker):
+    """Pub/sub en memoria: cada worker solo ve los eventos de sus propias escrituras.
+
+    Guarda los últimos ``BUFFER_SIZE`` eventos para que un cliente que se
+    reconecta con ``Last-Event-ID`` reciba lo que se perdió.
+    """
+
+    def __init__(self, options):
+        super().__init__(options)
+        self._ids = itertools.count(1)
+        self._buffer = deque(maxlen=options['BUFFER_SIZE'])
+
+    def publish(self, name, data):
+        with self._lock:
+            event = (next(self._ids), name, data)
+            self._buffer.append(event)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.put(event)
+
+    def create_subscription(self, last_event_id):
+        backlog = []
+        if last_event_id is not None:
+            backlog = [event for event in self._buffer if event[0] > last_event_id]
+        return LocalSubscription(self, backlog)
+
+
+class CacheSubscription(Subscription):
+    def __init__(self, broker, last_event_id):
+        super().__init__(broker, [])
+        self.last_id = last_event_id
+        self.missing_id = None
+
+    def poll(self):
+        last_seen = cache.get(CACHE_SEQUENCE_KEY, 0)
+        if self.last_id is None or last_seen - self.last_id > self.broker.options['BUFFER_SIZE']:
+            self.last_id = last_seen
+            return []
+
+        ids = range(self.last_id + 1, last_seen + 1)
+        stored = cache.get_many([f'{CACHE_PREFIX}{event_id}' for event_id in ids])
+        events = []
+        for event_id in ids:
+            event = stored.get(f'{CACHE_PREFIX}{event_id}')
+            if event is None:
+                # Otro worker reservó el id pero aún no guardó el evento; si
+                # sigue faltando en la siguiente vuelta, expiró y se salta.
+                if self.missing_id != event_id:
+                    self.missing_id = event_id
+                    break
+                continue
+            events.append(event)
+            self.last_id = event_id
+        else:
+            self.last_id = last_seen
+        return events
+
+    def get(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            events = self.poll()
+            if events or time.monotonic() >= deadline:
+                return events
+            time.sleep(self.broker.options['POLL_INTERVAL'])
+
+    async def aget(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            events = await asyncio.to_thread(self.poll)
+            if events or time.monotonic() >= deadline:
+                return events
+            await asyncio.sleep(self.broker.options['POLL_INTERVAL'])
+
+
+class CacheBroker(Broker):
+    """Eventos compartidos entre workers a través de la caché de Django.
+
+    Cada evento se guarda con un id correlativo (``cache.incr``) y los clientes
+    consultan la caché cada ``POLL_INTERVAL`` segundos. Requiere una caché
+    compartida (Redis, Memcached); con la caché local de cada proceso se
+    comporta como ``LocalBroker`` pero con sondeo.
+    """
+
+    def publish(self, name, data):
+        try:
+            event_id = cache.incr(CACHE_SEQUENCE_KEY)
+        except ValueError:
+            cache.add(CACHE_SEQUENCE_KEY, 0, None)
+            event_id = cache.incr(CACHE_SEQUENCE_KEY)
+        cache.set(f'{CACHE_PREFIX}{event_id}', (event_id, name, data), self.options['CACHE_TTL'])
+
+    def create_subscription(self, last_event_id):
+        return CacheSubscription(self, last_event_id)
+
+
+_broker = None
+_broker_options = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker, _broker_options
+    options = _settings()
+    with _broker_lock:
+        if _broker is None or options != _broker_options:
+            _broker = import_string(options['BACKEND'])(options)
+            _broker_options = options
+    return _broker
+
+
+def publish(name, data):
+    get_broker().publish(name, data)
+
+
+def last_event_id(request):
+    try:
+        return int(request.META.get('HTTP_LAST_EVENT_ID') or request.query_params['last_event_id'])
+    except (KeyError, ValueError):
+        return None
+
+
+def open_stream(request, visible, asynchronous=False):
+    """Suscribe al cliente y devuelve la respuesta SSE.
+
+    ``visible(data)`` decide qué eventos recibe. Si el proceso ya tiene
+    ``MAX_SUBSCRIBERS`` conexiones abiertas responde 503 con ``Retry-After``.
+    """
+    subscription = get_broker().subscribe(last_event_id(request))
+    if subscription is None:
+        raise Overloaded(_settings()['RETRY_AFTER'])
+
+    stream = aevent_stream if asynchronous else event_stream
+    response = StreamingHttpResponse(stream(subscription, visible), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    # El finally del generador no corre si el stream nunca empieza (HEAD, o
+    # el cliente se desconecta antes del primer chunk); el servidor siempre
+    # llama a response.close(). close() de la suscripción es idempotente.
+    response._resource_closers.append(subscription.close)
+    return response
+
+
+def event_stream(subscription, visible):
+    """Generador SSE para WSGI: eventos visibles, keepalives y cierre por tiempo.
+
+    El navegador se reconecta solo al cerrarse el stream y manda
+    ``Last-Event-ID`` para retomar.
+    """
+    options = _settings()
+    deadline = time.monotonic() + options['MAX_DURATION']
+    try:
+        yield f"retry: {options['RETRY_AFTER'] * 1000}\n\n".encode()
+        while time.monotonic() < deadline:
+            events = subscription.get(options['KEEPALIVE'])
+            chunk = b''.join(format_event(*event) for event in events if visible(event[2]))
+            yield chunk or b': keepalive\n\n'
+    finally:
+        subscription.close()
+
+
+async def aevent_stream(subscription, visible):
+    options = _settings()
+    deadline = time.monotonic() + options['MAX_DURATION']
+    try:
+        yield f"retry: {options['RETRY_AFTER'] * 1000}\n\n".encode()
+        while time.monotonic() < deadline:
+            events = await subscription.aget(options['KEEPALIVE'])
+            chunk = b''.join(format_event(*event) for event in events if visible(event[2]))
+            yield chunk or b': keepalive\n\n'
+    finally:
+        subscription.close()
@@ -0,0 +1,61 @@
+import io
+import logging
+import os
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+# GIF se deja intacto para no romper animaciones.
+OUTPUT_FORMATS = {
+    '.jpg': 'JPEG',
+    '.jpeg': 'JPEG',
+    '.png': 'PNG',
+    '.webp': 'WEBP',
+}
+
+
+def optimize_image(file, max_dimension, quality):
+    """Redimensiona, recomprime y elimina los metadatos (EXIF, GPS) de una imagen.
+
+    Devuelve ``(ContentFile, tamaño_original, tamaño_final)`` o ``None`` si el
+    archivo no es una imagen que se pueda procesar o si recomprimirla no la
+    achica y no tiene metadatos que quitar.
+    """
+    output_format = OUTPUT_FORMATS.get(os.path.splitext(file.name)[1].lower())
+    if output_format is None:
+        return None
+
+    original_size = file.size
+    try:
+        file.seek(0)
+        with Image.open(file) as image:
+            has_metadata = bool(image.getexif()) or 'xmp' in image.info
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+
+            if output_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+                image = image.convert('RGB')
+
+            buffer = io.BytesIO()
+            if output_format == 'PNG':
+                image.save(buffer, format='PNG', optimize=True)
+            else:
+                image.save(buffer, format=output_format, quality=quality, optimize=True)
+    except (UnidentifiedImageError, OSError, ValueError, Image.DecompressionBombError) as e:
+        logger.warning('No se pudo optimizar la imagen %s: %s', file.name, e)
+        return None
+    finally:
+        file.seek(0)
+
+    data = buffer.getvalue()
+    if len(data) >= original_size and not has_metadata:
+        return None
+
+    content = ContentFile(data, name=os.path.basename(file.name))
+    logger.info(
+        'Imagen optimizada %s: %d -> %d bytes',
+        file.name, original_size, content.size
+    )
+    return content, original_size, content.size
@@ -0,0 +1,197 @@
+import mimetypes
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.db.models import Q
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import parse_etags
+from django.utils.http import http_date
+from rest_framework.permissions import AllowAny
+from rest_framework.views import APIView
+
+from denuncias_service.models import DenunciaEvidencia, ArchivedDenunciaEvidencia
+from denuncias_service.permissions import IsOwnerOrSuperUser
+
+EVIDENCE_PREFIX = 'denuncias/'
+PROTECTED_PREFIXES = ['defaults/']
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+def delete_media_files(names, max_workers=8):
+    names = {
+        name for name in names
+        if name and not any(name.startswith(prefix) for prefix in PROTECTED_PREFIXES)
+    }
+    if not names:
+        return 0, 0
+
+    def delete(name):
+        try:
+            default_storage.delete(name)
+            return True
+        except OSError:
+            return False
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        deleted = sum(executor.map(delete, names))
+    return deleted, len(names) - deleted
+
+
+def build_etag(stat):
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def etag_matches(header, etag):
+    """Comparación débil de If-None-Match: acepta ``*``, ``W/`` y listas."""
+    if not header:
+        return False
+    etags = parse_etags(header)
+    return etags == ['*'] or etag in (tag.removeprefix('W/') for tag in etags)
+
+
+def cache_control_for(name):
+    for prefix in getattr(settings, 'MEDIA_IMMUTABLE_PREFIXES', []):
+        if name.startswith(prefix):
+            visibility = 'private' if name.startswith(EVIDENCE_PREFIX) else 'public'
+            return f'{visibility}, max-age=31536000, immutable'
+    return 'public, max-age=0, must-revalidate'
+
+
+def parse_range(header, size):
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+
+    start, end = match.groups()
+    if start == '' and end == '':
+        return None
+
+    if start == '':
+        length = int(end)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+
+    start = int(start)
+    end = int(end) if end else size - 1
+    if start >= size or start > end:
+        return False
+    return start, min(end, size - 1)
+
+
+def iter_file_range(path, start, end):
+    with open(path, 'rb') as handle:
+        handle.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = handle.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+class MediaServeView(APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request, path):
+        try:
+            full_path = safe_join(settings.MEDIA_ROOT, path)
+        except SuspiciousFileOperation:
+            raise Http404('Archivo no encontrado')
+
+        name = os.path.relpath(full_path, settings.MEDIA_ROOT).replace(os.sep, '/')
+
+        if name.startswith(EVIDENCE_PREFIX):
+            self.check_evidence_access(request, name)
+
+        try:
+            stat = os.stat(full_path)
+        except OSError:
+            raise Http404('Archivo no encontrado')
+        if not os.path.isfile(full_path):
+            raise Http404('Archivo no encontrado')
+
+        etag = build_etag(stat)
+        headers = {
+            'ETag': etag,
+            'Last-Modified': http_date(stat.st_mtime),
+            'Cache-Control': cache_control_for(name),
+            'Accept-Ranges': 'bytes',
+        }
+
+        if etag_matches(request.headers.get('If-None-Match'), etag):
+            response = HttpResponseNotModified()
+            for header, value in headers.items():
+                response[header] = value
+            return response
+
+        content_type, encoding = mimetypes.guess_type(full_path)
+        content_type = content_type or 'application/octet-stream'
+
+        backend = getattr(settings, 'MEDIA_SENDFILE_BACKEND', None)
+        if backend:
+            response = HttpResponse(content_type=content_type)
+            if backend == 'x-accel-redirect':
+                response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_REDIRECT_PREFIX + name
+            elif backend == 'x-sendfile':
+                response['X-Sendfile'] = full_path
+            else:
+                raise ImproperlyConfigured(f'MEDIA_SENDFILE_BACKEND desconocido: {backend!r}')
+            for header, value in headers.items():
+                response[header] = value
+            return response
+
+        range_header = request.headers.get('Range')
+        if_range = request.headers.get('If-Range')
+        if range_header and (not if_range or if_range == etag):
+            byte_range = parse_range(range_header, stat.st_size)
+            if byte_range is False:
+                response = HttpResponse(status=416)
+                response['Content-Range'] = f'bytes */{stat.st_size}'
+                return response
+            if byte_range:
+                start, end = byte_range
+                response = StreamingHttpResponse(
+                    iter_file_range(full_path, start, end),
+                    status=206,
+                    content_type=content_type
+                )
+                response['Content-Length'] = str(end - start + 1)
+                response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+                for header, value in headers.items():
+                    response[header] = value
+                return response
+
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+        if encoding:
+            response['Content-Encoding'] = encoding
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    def check_evidence_access(self, request, name):
+        if not request.user or not request.user.is_authenticated:
+            self.permission_denied(request)
+
+        evidence = None
+        for model in (DenunciaEvidencia, ArchivedDenunciaEvidencia):
+            evidence = (
+                model.objects
+                .select_related('incident__user')
+                .filter(Q(file=name) | Q(original_file=name))
+                .first()
+            )
+            if evidence is not None:
+                break
+        if evidence is None:
+            raise Http404('Archivo no encontrado')
+
+        if not IsOwnerOrSuperUser().has_object_permission(request, self, evidence.incident):
+            self.permission_denied(request)
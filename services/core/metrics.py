@@ -0,0 +1,221 @@
+import atexit
+import glob
+import hmac
+import os
+import socket
+import tempfile
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+
+def _settings():
+    defaults = {
+        'ENABLED': True,
+        'ROOT': os.path.join(tempfile.gettempdir(), 'denuncias-metrics'),
+        'TOKEN': '',
+    }
+    defaults.update(getattr(settings, 'METRICS', {}))
+    return defaults
+
+
+def process_dir(root):
+    """Directorio de los archivos de este contenedor dentro de ``ROOT``.
+
+    prometheus_client nombra los archivos por PID (``counter_<pid>.db``) y los
+    PIDs solo son únicos dentro de un contenedor, así que cada host escribe en
+    su propio subdirectorio.
+    """
+    return os.path.join(root, socket.gethostname())
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def clean_stale_files(path):
+    """Borra los archivos de procesos de este contenedor que ya no existen.
+
+    Se llama al arrancar cada proceso: quedan los de los workers hermanos
+    vivos y se descartan los de ejecuciones anteriores, incluido un archivo
+    viejo con el mismo PID que el proceso actual.
+    """
+    for name in os.listdir(path):
+        if not name.endswith('.db'):
+            continue
+        try:
+            pid = int(name[:-len('.db')].rsplit('_', 1)[1])
+        except (IndexError, ValueError):
+            continue
+        if pid == os.getpid() or not _alive(pid):
+            try:
+                os.remove(os.path.join(path, name))
+            except FileNotFoundError:
+                pass
+
+
+# prometheus_client elige su almacenamiento al importarse: con
+# PROMETHEUS_MULTIPROC_DIR definido, cada proceso escribe sus muestras en
+# archivos mmap de ese directorio y el endpoint las suma.
+METRICS_DIR = process_dir(_settings()['ROOT'])
+os.makedirs(METRICS_DIR, exist_ok=True)
+clean_stale_files(METRICS_DIR)
+os.environ['PROMETHEUS_MULTIPROC_DIR'] = METRICS_DIR
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction  # noqa: E402
+from django.http import HttpResponse, HttpResponseForbidden  # noqa: E402
+from prometheus_client import (  # noqa: E402
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from .middleware import current_stats  # noqa: E402
+
+
+@atexit.register
+def _mark_process_dead():
+    multiprocess.mark_process_dead(os.getpid(), METRICS_DIR)
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'Duración de las peticiones HTTP por vista',
+    ['view', 'method'],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUESTS = Counter(
+    'http_requests_total',
+    'Peticiones HTTP por vista, método y código de estado',
+    ['view', 'method', 'status'],
+)
+DB_QUERIES = Counter(
+    'db_queries_total',
+    'Consultas SQL ejecutadas por vista',
+    ['view'],
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    'db_queries_per_request',
+    'Consultas SQL por petición',
+    ['view'],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 250, 500),
+)
+DB_TIME = Counter(
+    'db_query_seconds_total',
+    'Tiempo total en consultas SQL por vista',
+    ['view'],
+)
+UPLOAD_BYTES = Counter(
+    'upload_bytes_total',
+    'Bytes recibidos en peticiones multipart por vista',
+    ['view'],
+)
+TOKEN_CACHE = Counter(
+    'token_cache_lookups_total',
+    'Resoluciones de token por nivel de caché',
+    ['result'],
+)
+OUTBOUND_LATENCY = Histogram(
+    'outbound_request_duration_seconds',
+    'Latencia de las llamadas a servicios externos',
+    ['service', 'outcome'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 16),
+)
+
+
+@contextmanager
+def observe_outbound(service):
+    started = time.perf_counter()
+    outcome = 'error'
+    try:
+        yield
+        outcome = 'ok'
+    finally:
+        OUTBOUND_LATENCY.labels(service, outcome).observe(time.perf_counter() - started)
+
+
+class MetricsMiddleware:
+    """Registra latencia, consultas y bytes subidos de cada petición por vista.
+
+    Debe ir después de ``RequestTimingMiddleware``: el conteo de consultas sale
+    de las estadísticas que esta deja en la petición en curso.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        response = self.get_response(request)
+        self.record(request, response, started)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self.record(request, response, started)
+        return response
+
+    def record(self, request, response, started):
+        if not _settings()['ENABLED']:
+            return
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.url_name if match and match.url_name else 'unmatched'
+
+        REQUEST_LATENCY.labels(view, request.method).observe(time.perf_counter() - started)
+        REQUESTS.labels(view, request.method, str(response.status_code)).inc()
+
+        stats = current_stats()
+        if stats is not None:
+            DB_QUERIES.labels(view).inc(stats.queries)
+            DB_QUERIES_PER_REQUEST.labels(view).observe(stats.queries)
+            DB_TIME.labels(view).inc(stats.db_time)
+
+        if request.content_type == 'multipart/form-data':
+            try:
+                UPLOAD_BYTES.labels(view).inc(int(request.META.get('CONTENT_LENGTH') or 0))
+            except ValueError:
+                pass
+
+
+class SharedDirCollector:
+    """Suma los archivos de todos los contenedores que comparten ``ROOT``."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def collect(self):
+        files = glob.glob(os.path.join(self.root, '*', '*.db'))
+        return multiprocess.MultiProcessCollector.merge(files, accumulate=True)
+
+
+def metrics_view(request):
+    token = _settings()['TOKEN']
+    if token:
+        expected = f'Bearer {token}'
+        if not hmac.compare_digest(request.META.get('HTTP_AUTHORIZATION', ''), expected):
+            return HttpResponseForbidden()
+    elif request.META.get('REMOTE_ADDR') not in ('127.0.0.1', '::1'):
+        return HttpResponseForbidden()
+
+    registry = CollectorRegistry()
+    registry.register(SharedDirCollector(_settings()['ROOT']))
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,212 @@
+import json
+import logging
+import random
+import re
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework.serializers import BaseSerializer
+
+logger = logging.getLogger('core.requests')
+
+_current = ContextVar('request_stats', default=None)
+
+
+def _settings():
+    defaults = {
+        'ENABLED': True,
+        'SAMPLE_RATE': 0.01,
+        'SLOW_REQUEST_MS': 1000,
+        'SERVER_TIMING_HEADER': True if settings.DEBUG else 'staff',
+        'SQL_MAX_LENGTH': 200,
+    }
+    defaults.update(getattr(settings, 'REQUEST_TIMING', {}))
+    return defaults
+
+
+class RequestStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_sql = ''
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+
+
+def current_stats():
+    return _current.get()
+
+
+def record_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        stats.queries += 1
+        stats.db_time += elapsed
+        if elapsed > stats.slowest_time:
+            stats.slowest_time = elapsed
+            stats.slowest_sql = sql
+
+
+def _install_query_timer(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+connection_created.connect(_install_query_timer)
+
+_COLUMN = r'"\w+"\."\w+"(?: AS "\w+")?'
+_COLUMNS = re.compile(r'SELECT (DISTINCT )?(?:%s, )+%s FROM' % (_COLUMN, _COLUMN))
+_IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+_SPACES = re.compile(r'\s+')
+
+
+def fingerprint(sql, max_length):
+    sql = _COLUMNS.sub(r'SELECT \1... FROM', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    sql = _LITERALS.sub('?', sql)
+    sql = _SPACES.sub(' ', sql).strip()
+    if len(sql) > max_length:
+        sql = sql[:max_length] + '...'
+    return sql
+
+
+_serializer_patched = False
+
+
+def install_serializer_timing():
+    """Mide el tiempo de ``serializer.data`` de la petición en curso.
+
+    Solo se cuenta el serializer más externo (los anidados quedan dentro de su
+    tiempo), e incluye las consultas que dispare la serialización: justo donde
+    aparecen los N+1.
+    """
+    global _serializer_patched
+    if _serializer_patched:
+        return
+    _serializer_patched = True
+
+    original = BaseSerializer.data.fget
+
+    def timed_data(self):
+        stats = _current.get()
+        if stats is None:
+            return original(self)
+
+        stats.serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return original(self)
+        finally:
+            stats.serializer_depth -= 1
+            if stats.serializer_depth == 0:
+                stats.serializer_time += time.perf_counter() - started
+
+    BaseSerializer.data = property(timed_data)
+
+
+class RequestTimingMiddleware:
+    """Mide consultas, tiempo de base de datos, serialización y tiempo total.
+
+    Las respuestas llevan un header ``Server-Timing`` (con
+    ``SERVER_TIMING_HEADER='staff'``, solo las de usuarios staff, porque
+    revela el número de consultas y los tiempos internos); una fracción
+    ``SAMPLE_RATE`` de las peticiones se registra en el logger
+    ``core.requests`` como una línea JSON, y las que superan
+    ``SLOW_REQUEST_MS`` se registran siempre como warning.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        install_serializer_timing()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        options = _settings()
+        if not options['ENABLED']:
+            return self.get_response(request)
+
+        stats, token = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, stats, options)
+
+    async def __acall__(self, request):
+        options = _settings()
+        if not options['ENABLED']:
+            return await self.get_response(request)
+
+        stats, token = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, stats, options)
+
+    def start(self):
+        for connection in connections.all(initialized_only=True):
+            _install_query_timer(connection)
+        stats = RequestStats()
+        return stats, _current.set(stats)
+
+    def show_server_timing(self, request, option):
+        if option == 'staff':
+            user = getattr(request, 'user', None)
+            return bool(user and user.is_staff)
+        return bool(option)
+
+    def finish(self, request, response, stats, options):
+        total_ms = (time.perf_counter() - stats.started) * 1000
+        db_ms = stats.db_time * 1000
+        serializer_ms = stats.serializer_time * 1000
+
+        if self.show_server_timing(request, options['SERVER_TIMING_HEADER']):
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={db_ms:.1f};desc="{stats.queries} queries"',
+                f'serializer;dur={serializer_ms:.1f}',
+                f'total;dur={total_ms:.1f}',
+            ])
+
+        slow = total_ms >= options['SLOW_REQUEST_MS']
+        if not slow and random.random() >= options['SAMPLE_RATE']:
+            return response
+
+        match = getattr(request, 'resolver_match', None)
+        line = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.url_name if match else None,
+            'status': response.status_code,
+            'total_ms': round(total_ms, 1),
+            'db_ms': round(db_ms, 1),
+            'queries': stats.queries,
+            'serializer_ms': round(serializer_ms, 1),
+            'slowest_query_ms': round(stats.slowest_time * 1000, 1),
+            'slowest_query': fingerprint(stats.slowest_sql, options['SQL_MAX_LENGTH']),
+            'slow': slow,
+        }
+        logger.log(logging.WARNING if slow else logging.INFO, json.dumps(line, ensure_ascii=False))
+        return response
@@ -0,0 +1,80 @@
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependencia opcional
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - dependencia opcional
+    msgpack = None
+
+# Lo que orjson/msgpack no serializan por sí mismos (Decimal, textos
+# traducibles, timedelta, QuerySet...) se convierte igual que en DRF.
+_drf_default = encoders.JSONEncoder().default
+
+
+class ORJSONRenderer(JSONRenderer):
+    """``JSONRenderer`` de DRF sobre orjson.
+
+    Produce los mismos bytes que el renderer de DRF: JSON compacto en UTF-8,
+    fechas UTC terminadas en ``Z``, ``Decimal`` como número y U+2028/U+2029
+    escapados. Si se pide indentación (API navegable, ``; indent=4``) o orjson
+    no está instalado, se usa el renderer de DRF.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(
+            data,
+            default=_drf_default,
+            option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+        )
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Respuestas en MessagePack para clientes que envían ``Accept: application/msgpack``.
+
+    Los valores que no son tipos nativos (fechas, ``Decimal``, UUID) se
+    codifican igual que en el JSON, así que el contenido es el mismo.
+    """
+
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if msgpack is None:
+            raise ImproperlyConfigured('MessagePackRenderer requiere el paquete msgpack.')
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_drf_default, use_bin_type=True)
+
+
+def format_event(event_id, name, data):
+    """Un evento en formato ``text/event-stream``; ``data`` va como JSON en una línea."""
+    return b'id: %d\nevent: %s\ndata: %s\n\n' % (event_id, name.encode(), ORJSONRenderer().render(data))
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Negocia ``text/event-stream``; los errores de la vista salen como un evento ``error``."""
+
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return b'event: error\ndata: %s\n\n' % ORJSONRenderer().render(data)
@@ -0,0 +1,127 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+
+PIN_PREFIX = 'db:pin:'
+
+_use_replica = ContextVar('use_replica', default=False)
+
+
+def replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+@contextmanager
+def use_replica(enabled=True):
+    token = _use_replica.set(enabled)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def pin_to_primary(user):
+    cache.set(f'{PIN_PREFIX}{user.pk}', True, settings.READ_REPLICA_PIN_SECONDS)
+
+
+def is_pinned(user):
+    return bool(user and user.is_authenticated and cache.get(f'{PIN_PREFIX}{user.pk}'))
+
+
+class ReadReplicaRouter:
+    """Envía las lecturas a una réplica solo dentro de ``use_replica()``.
+
+    Por defecto todo va a ``default``; las vistas pesadas de solo lectura
+    activan la réplica con ``ReadReplicaMixin``. Las escrituras y las
+    migraciones siempre van a la base principal.
+    """
+
+    def db_for_read(self, model, **hints):
+        aliases = replicas()
+        if aliases and _use_replica.get():
+            return random.choice(aliases)
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replicas():
+            return False
+        return None
+
+
+class ReadReplicaMixin:
+    """Atiende las peticiones GET desde una réplica de lectura.
+
+    Se activa después de autenticar, para poder respetar el pin a la base
+    principal que ``PrimaryPinMiddleware`` deja tras cada escritura del usuario.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and replicas() and not is_pinned(request.user):
+            self._replica_token = _use_replica.set(True)
+
+    def dispatch(self, request, *args, **kwargs):
+        # En try/finally y no en finalize_response: si la vista falla con una
+        # excepción que no es de la API, DRF no llama a finalize_response y el
+        # hilo seguiría leyendo de la réplica en las peticiones siguientes.
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            token = getattr(self, '_replica_token', None)
+            if token is not None:
+                _use_replica.reset(token)
+                self._replica_token = None
+
+
+class PrimaryPinMiddleware:
+    """Fija al usuario a la base principal unos segundos después de escribir.
+
+    Así una lectura inmediatamente posterior (p. ej. la lista tras crear una
+    denuncia) no ve una réplica que todavía no recibió el cambio. Requiere una
+    caché compartida entre procesos para funcionar con varios workers.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        response = self.get_response(request)
+        self.pin_after_write(request, response)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if replicas() and request.method not in SAFE_METHODS:
+            # request.user puede ser perezoso y consultar la sesión.
+            await sync_to_async(self.pin_after_write)(request, response)
+        return response
+
+    def pin_after_write(self, request, response):
+        user = getattr(request, 'user', None)
+        if (
+            replicas()
+            and request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and user is not None
+            and user.is_authenticated
+        ):
+            pin_to_primary(user)
@@ -0,0 +1,45 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.db import connections
+
+
+def _setup_worker():
+    django.setup()
+
+
+def _run_job(func, job):
+    try:
+        return func(**job)
+    finally:
+        connections.close_all()
+
+
+def split_count(count, job_size):
+    """Divide ``count`` filas en trabajos de como máximo ``job_size``.
+
+    Cada trabajo recibe su propia semilla (semilla base + índice), así que los
+    datos generados son los mismos sin importar cuántos procesos se usen.
+    """
+    return [min(job_size, count - start) for start in range(0, count, job_size)]
+
+
+def run_in_workers(func, jobs, workers):
+    """Ejecuta ``func(**job)`` para cada job, en procesos si ``workers > 1``.
+
+    Cada proceso inicializa Django por su cuenta (contexto ``spawn``), así que
+    ``func`` debe ser una función de módulo. Genera los resultados a medida
+    que terminan.
+    """
+    if workers <= 1:
+        for job in jobs:
+            yield func(**job)
+        return
+
+    connections.close_all()
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_setup_worker) as executor:
+        futures = [executor.submit(_run_job, func, job) for job in jobs]
+        for future in as_completed(futures):
+            yield future.result()
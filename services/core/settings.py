@@ -10,6 +10,9 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import importlib.util
+import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -46,9 +49,12 @@ INSTALLED_APPS = [
     'auth_service',
     'denuncias_service',
     'dashboard_service',
+    'outbox_service',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestTimingMiddleware',
+    'core.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -57,6 +63,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.routers.PrimaryPinMiddleware',
 ]
 
 ROOT_URLCONF = 'core.urls'
@@ -89,6 +96,68 @@ DATABASES = {
     }
 }
 
+# Read replicas used by the heavy read endpoints (see core.routers).
+# DATABASE_REPLICAS is a comma separated list of database names, e.g.
+# "db_replica.sqlite3" locally; DATABASE_REPLICA_HOST points them to another
+# server when the default database is not SQLite. Tests read the primary.
+DATABASE_REPLICAS = []
+for index, name in enumerate(filter(None, os.getenv('DATABASE_REPLICAS', '').split(',')), start=1):
+    alias = f'replica{index}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'NAME': name.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+    if os.getenv('DATABASE_REPLICA_HOST'):
+        DATABASES[alias]['HOST'] = os.getenv('DATABASE_REPLICA_HOST')
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['core.routers.ReadReplicaRouter']
+
+# Seconds a user keeps reading from the primary after a write.
+READ_REPLICA_PIN_SECONDS = 5
+
+# Per-request instrumentation (core.middleware.RequestTimingMiddleware). The
+# Server-Timing header exposes query counts and timings, so outside DEBUG it is
+# only sent to staff users ('staff'; True sends it to everyone, False to no
+# one). SAMPLE_RATE of the requests are logged as JSON to core.requests and
+# requests over SLOW_REQUEST_MS are always logged.
+REQUEST_TIMING = {
+    'ENABLED': os.getenv('REQUEST_TIMING_ENABLED', 'true').lower() == 'true',
+    'SAMPLE_RATE': float(os.getenv('REQUEST_TIMING_SAMPLE_RATE', '0.01')),
+    'SLOW_REQUEST_MS': int(os.getenv('REQUEST_TIMING_SLOW_MS', '1000')),
+    'SERVER_TIMING_HEADER': True if DEBUG else 'staff',
+    'SQL_MAX_LENGTH': 200,
+}
+
+# Prometheus metrics served at /metrics/ (core.metrics). Each process writes
+# its samples to mmap files in ROOT/<hostname>/ and the endpoint adds up every
+# subdirectory, so all containers (backends and the notification dispatcher)
+# must share ROOT and have distinct, stable hostnames. Files of dead processes
+# in a container are removed when a new process starts there.
+# With TOKEN set the scraper must send "Authorization: Bearer <TOKEN>";
+# without it only localhost may read the endpoint.
+METRICS = {
+    'ENABLED': os.getenv('METRICS_ENABLED', 'true').lower() == 'true',
+    'ROOT': os.getenv('METRICS_ROOT', os.path.join(tempfile.gettempdir(), 'denuncias-metrics')),
+    'TOKEN': os.getenv('METRICS_TOKEN', ''),
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.requests': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
+# Serve the incident list, detail, heatmap and dashboards with async views.
+# Only worth it under an ASGI server (uvicorn core.asgi:application).
+ASYNC_READ_VIEWS = os.getenv('ASYNC_READ_VIEWS', 'false').lower() == 'true'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -128,6 +197,30 @@ STATIC_URL = 'static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'core//media/'
 
+# Media serving (core.media.MediaServeView)
+# Paths under these prefixes never change content once written, so they are
+# served with an immutable Cache-Control header.
+MEDIA_IMMUTABLE_PREFIXES = [
+    'denuncias/evidencias/',
+    'defaults/',
+]
+# None streams files from Django, 'x-sendfile' (Apache/lighttpd) or
+# 'x-accel-redirect' (nginx) hands the transfer off to the front server.
+MEDIA_SENDFILE_BACKEND = os.getenv('MEDIA_SENDFILE_BACKEND') or None
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+
+# Evidence uploads (DenunciaEvidenciaUploadView)
+EVIDENCE_UPLOAD_MAX_FILES = 10
+EVIDENCE_UPLOAD_MAX_WORKERS = 4
+
+# Image recompression on upload (core.images.optimize_image). Images are
+# downsized to fit MAX_DIMENSION, re-encoded at QUALITY and stripped of
+# EXIF/GPS metadata; the untouched original is kept only if KEEP_ORIGINAL.
+IMAGE_UPLOAD_MAX_DIMENSION = 2560
+IMAGE_UPLOAD_QUALITY = 82
+IMAGE_UPLOAD_KEEP_ORIGINAL = os.getenv('IMAGE_UPLOAD_KEEP_ORIGINAL', 'false').lower() == 'true'
+AVATAR_MAX_DIMENSION = 512
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -166,12 +259,139 @@ CORS_ALLOW_HEADERS = [
 ]
 
 # REST Framework Configuration
+# JSON is rendered and parsed with orjson (core.renderers / core.parsers); the
+# output is byte-compatible with DRF's JSONRenderer. Clients can also ask for
+# MessagePack with `Accept: application/msgpack` when msgpack is installed.
+MSGPACK_ENABLED = importlib.util.find_spec('msgpack') is not None
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'auth_service.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.ORJSONRenderer',
+        *(['core.renderers.MessagePackRenderer'] if MSGPACK_ENABLED else []),
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.ORJSONParser',
+        *(['core.parsers.MessagePackParser'] if MSGPACK_ENABLED else []),
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'core.throttling.CostTierThrottle',
+    ],
 }
 
+# Idempotency-Key handling on incident create, evidence upload and status
+# update (denuncias_service.idempotency). Successful responses are replayed for
+# TTL seconds; a key whose first request has not finished after
+# PENDING_TIMEOUT seconds is considered abandoned. Expired rows are removed by
+# `manage.py purge_idempotency_keys`.
+IDEMPOTENCY = {
+    'TTL': 86400,
+    'PENDING_TIMEOUT': 60,
+    'RETRY_AFTER': 1,
+}
+
+# Incremental change feed for syncing clients (denuncias_service.changes).
+# Only changes older than SETTLE_SECONDS are returned, so a write transaction
+# that commits late cannot slip behind a cursor the client already holds; keep
+# it above the longest write transaction.
+CHANGE_FEED = {
+    'SETTLE_SECONDS': 10,
+    'PAGE_SIZE': 100,
+    'MAX_PAGE_SIZE': 1000,
+}
+
+# Incident events pushed over Server-Sent Events (core.events). BACKEND is
+# 'core.events.LocalBroker' (in-process; each worker only sees its own writes)
+# or 'core.events.CacheBroker' (shared through the Django cache, which must then
+# be a shared backend). Each stream holds a worker thread under WSGI, so serve
+# it from backend_asgi in production. Streams close after MAX_DURATION seconds
+# and browsers reconnect with Last-Event-ID; at most MAX_SUBSCRIBERS streams
+# per process, extra ones get a 503.
+EVENTS = {
+    'BACKEND': os.getenv('EVENTS_BACKEND', 'core.events.LocalBroker'),
+    'KEEPALIVE': 15,
+    'MAX_DURATION': 300,
+    'MAX_SUBSCRIBERS': 100,
+    'RETRY_AFTER': 5,
+    'BUFFER_SIZE': 500,
+    'CACHE_TTL': 300,
+    'POLL_INTERVAL': 1,
+}
+
+# Per-user token buckets for expensive endpoints, grouped by the view's
+# `cost_tier` (core.throttling). Each rate also sets the burst size. STORAGE is
+# 'cache' (shared through the Django cache) or 'local' (per process).
+# CONCURRENCY caps in-flight requests per tier in each process; requests over
+# the cap get a 503 with Retry-After: RETRY_AFTER seconds.
+THROTTLING = {
+    'STORAGE': os.getenv('THROTTLING_STORAGE', 'cache'),
+    'RATES': {
+        'heatmap': '6/min',
+        'stats': '30/min',
+        'export': '2/min',
+        'upload': '20/min',
+    },
+    'CONCURRENCY': {
+        'heatmap': 2,
+        'stats': 4,
+        'export': 1,
+        'upload': 4,
+    },
+    'RETRY_AFTER': 2,
+}
+
+
+# Token -> user resolution cache (auth_service.authentication). Entries live
+# LOCAL_TTL seconds in the per-process LRU and SHARED_TTL seconds in the
+# Django cache, which should be a shared backend when running several workers.
+# A local hit is only trusted while the shared entry exists, so invalidating
+# a token in one worker (logout, password change, deactivation) takes effect
+# in all of them.
+TOKEN_AUTH_CACHE = {
+    'LOCAL_MAXSIZE': 1024,
+    'LOCAL_TTL': 30,
+    'SHARED_TTL': 300,
+}
+
+# Notification delivery (outbox_service). Emails are written to the outbox in
+# the same transaction as the change that triggers them and delivered by
+# `manage.py dispatch_notifications --loop`. Use
+# 'outbox_service.dispatcher.LocmemTransport' as BACKEND in tests, or run
+# `manage.py notification_stub` as a local stand-in for the Node service.
+NOTIFICATION_SERVICE = {
+    'URL': os.getenv('NOTIFICATION_SERVICE_URL', 'http://notification_service:3001'),
+    'BACKEND': os.getenv('NOTIFICATION_BACKEND', 'outbox_service.dispatcher.HTTPTransport'),
+    'CONNECT_TIMEOUT': 3.05,
+    'READ_TIMEOUT': 10,
+    'RETRIES': 2,
+    'POOL_SIZE': 10,
+    'BATCH_SIZE': 50,
+    'USE_BATCH_ENDPOINT': True,
+    'MAX_ATTEMPTS': 5,
+    'RETRY_DELAY': 30,
+    'CLAIM_TIMEOUT': 300,
+}
+NOTIFY_ON_STATUS_CHANGE = True
+
+# RENIEC DNI lookups (auth_service.utils.reniec). Successful lookups are kept
+# in the DniRecord table for CACHE_DAYS. After FAILURE_THRESHOLD consecutive
+# failures the circuit opens and lookups fail fast for RESET_TIMEOUT seconds.
+# Set RENIEC_BACKEND=auth_service.utils.reniec.FakeBackend to work offline.
+RENIEC = {
+    'BACKEND': os.getenv('RENIEC_BACKEND', 'auth_service.utils.reniec.ApisPeruBackend'),
+    'URL': 'https://dniruc.apisperu.com/api/v1/dni/',
+    'CONNECT_TIMEOUT': 2,
+    'READ_TIMEOUT': 4,
+    'POOL_SIZE': 10,
+    'FAILURE_THRESHOLD': 5,
+    'RESET_TIMEOUT': 30,
+    'CACHE_DAYS': 365,
+}
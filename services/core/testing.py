@@ -0,0 +1,211 @@
+import io
+import itertools
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APITestCase
+
+from auth_service.authentication import local_cache
+from core.db import explicit_auto_now_add
+from denuncias_service.archive import archive_chunk
+from denuncias_service.models import Denuncia, DenunciaEvidencia, TYPE_CHOICES
+from users_service.models import User
+
+# Consultas SQL exactas por endpoint (nombre de la URL, o ``nombre:variante``
+# cuando un parámetro cambia el plan) y rol. El número no debe depender del
+# tamaño de la página ni de la cantidad de datos: si un cambio lo sube, hay un
+# N+1 o una consulta nueva que justificar aquí.
+QUERY_BUDGETS = {
+    'register': {'anonymous': 17},
+    'login': {'anonymous': 5},
+    'logout': {'user': 1},
+
+    'user-list': {'user': 0, 'superuser': 2},
+    'user-bulk-update': {'superuser': 6},
+    'user-detail': {'superuser': 1},
+    'user-update': {'superuser': 2},
+    'user-delete': {'superuser': 14},
+    'my-profile': {'user': 1, 'superuser': 1},
+    'update-my-profile': {'user': 1},
+    'change-password': {'user': 1},
+
+    'denuncia-list': {'user': 2, 'superuser': 2},
+    'denuncia-list:include_archived': {'user': 3, 'superuser': 3},
+    'denuncia-create': {'user': 3},
+    'denuncia-create:idempotent': {'user': 8},
+    'denuncia-create:replay': {'user': 1},
+    'denuncia-batch-create': {'user': 4},
+    'denuncia-batch-create:retry': {'user': 3},
+    'denuncia-detail': {'user': 2, 'superuser': 2},
+    'denuncia-batch-detail': {'user': 2, 'superuser': 2},
+    'denuncia-batch-detail:invalid': {'user': 0},
+    'denuncia-update': {'user': 3},
+    'denuncia-delete': {'user': 4},
+    'denuncia-status-update': {'user': 0, 'superuser': 6},
+    'denuncia-status-bulk-update': {'user': 0, 'superuser': 5},
+    'denuncia-status-bulk-update:silent': {'superuser': 4},
+    'evidencia-upload': {'user': 3},
+    'evidencia-delete': {'user': 3},
+    'denuncia-stats': {'user': 4, 'superuser': 4},
+    'denuncia-heatmap': {'user': 1, 'superuser': 1},
+    'denuncia-events': {'user': 0, 'superuser': 0},
+    'denuncia-changes': {'user': 2, 'superuser': 2},
+
+    'dashboard-stats': {'user': 0, 'superuser': 10},
+    'dashboard-user-stats': {'user': 5, 'superuser': 5},
+}
+
+# URLs con nombre que no son parte de la API y no llevan presupuesto.
+UNBUDGETED_URLS = {'media', 'metrics'}
+
+_dni_sequence = itertools.count(70000000)
+
+DESCRIPTION = 'Denuncia de prueba para medir las consultas de la API'
+
+
+def create_user(superuser=False, **extra):
+    dni = str(next(_dni_sequence))
+    create = User.objects.create_superuser if superuser else User.objects.create_user
+    return create(
+        email=f'user{dni}@example.com',
+        dni=dni,
+        first_name='Usuario',
+        last_name='Prueba',
+        password='clave-segura-123',
+        **extra
+    )
+
+
+def image_file(name='evidencia.png'):
+    buffer = io.BytesIO()
+    Image.new('RGB', (32, 32), 'red').save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+def seed_denuncias(user, count=3, evidence=2, archived=1):
+    """Crea denuncias con evidencias para ``user``.
+
+    Las ``archived`` denuncias adicionales se crean resueltas y con dos años
+    de antigüedad, y se mueven a las tablas frías con ``archive_chunk``.
+    """
+    now = timezone.now()
+    old = now - timedelta(days=730)
+    denuncias = [
+        Denuncia(
+            user=user,
+            description=DESCRIPTION,
+            district='Miraflores',
+            region='Lima',
+            lat=Decimal('-12.119180') + Decimal(i) / 1000,
+            lon=Decimal('-77.030114'),
+            _type=TYPE_CHOICES[i % len(TYPE_CHOICES)][0],
+            status='Resolved' if i >= count else 'Pending',
+            created_at=old if i >= count else now - timedelta(minutes=i)
+        )
+        for i in range(count + archived)
+    ]
+    with explicit_auto_now_add(Denuncia, 'created_at'):
+        denuncias = Denuncia.objects.bulk_create(denuncias)
+
+    DenunciaEvidencia.objects.bulk_create([
+        DenunciaEvidencia(
+            incident=denuncia,
+            file=f'denuncias/evidencias/test/{denuncia.pk}-{i}.jpg',
+            file_type='image'
+        )
+        for denuncia in denuncias
+        for i in range(evidence)
+    ])
+
+    if archived:
+        archive_chunk(now - timedelta(days=365), chunk_size=len(denuncias))
+    return denuncias[:count]
+
+
+def seed_dataset(users=2, **options):
+    """Crea ``users`` usuarios regulares, cada uno con sus denuncias."""
+    created = []
+    for _ in range(users):
+        user = create_user()
+        seed_denuncias(user, **options)
+        created.append(user)
+    return created
+
+
+@override_settings(
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    DATABASE_REPLICAS=[],
+    REQUEST_TIMING={'SAMPLE_RATE': 0, 'SLOW_REQUEST_MS': 60 * 1000},
+    RENIEC={'BACKEND': 'auth_service.utils.reniec.FakeBackend'},
+    NOTIFY_ON_STATUS_CHANGE=True,
+)
+class QueryBudgetTestCase(APITestCase):
+    """Base para los tests de presupuesto de consultas de la API.
+
+    Cada test parte de un usuario regular y un superusuario con denuncias,
+    evidencias y denuncias archivadas, y la caché vacía.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.superuser = create_user(superuser=True)
+        cls.user, cls.other_user = seed_dataset(users=2)
+
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media_settings = self.settings(MEDIA_ROOT=media_root)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+
+    def grow_dataset(self):
+        seed_denuncias(self.user, count=60, evidence=3, archived=5)
+        seed_denuncias(self.superuser, count=10)
+        seed_dataset(users=3, count=20)
+
+    def role(self, user):
+        if user is None:
+            return 'anonymous'
+        return 'superuser' if user.is_superuser else 'user'
+
+    def assertQueryBudget(self, name, user, method='get', kwargs=None, data=None,
+                          format=None, status_code=200, grow=False, page_sizes=(), variant=None,
+                          headers=None):
+        """Llama a la URL ``name`` como ``user`` dentro de su presupuesto exacto.
+
+        Con ``page_sizes`` repite un GET con cada ``page_size``; con ``grow``
+        vuelve a medir después de multiplicar los datos. El presupuesto debe
+        ser el mismo en todos los casos.
+        """
+        key = f'{name}:{variant}' if variant else name
+        budget = QUERY_BUDGETS[key][self.role(user)]
+        url = reverse(name, kwargs=kwargs)
+
+        self.client.force_authenticate(user)
+
+        def call(params):
+            with self.assertNumQueries(budget):
+                response = getattr(self.client, method)(url, params, format=format, headers=headers)
+            self.assertEqual(response.status_code, status_code, getattr(response, 'data', None))
+            return response
+
+        response = call(data)
+        for page_size in page_sizes:
+            call({**(data or {}), 'page_size': page_size})
+        if grow:
+            self.grow_dataset()
+            call(data)
+            for page_size in page_sizes:
+                call({**(data or {}), 'page_size': page_size})
+        return response
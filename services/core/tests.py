@@ -0,0 +1,301 @@
+import io
+import json
+import os
+import tempfile
+from collections import OrderedDict
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+from uuid import UUID
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.utils.translation import gettext_lazy
+from PIL import Image
+from prometheus_client.parser import text_string_to_metric_families
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+from rest_framework.permissions import AllowAny
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnList
+from rest_framework.views import APIView
+
+from denuncias_service.models import ArchivedDenunciaEvidencia, DenunciaEvidencia
+from .images import optimize_image
+from .middleware import RequestStats, _current, fingerprint, install_serializer_timing
+from .metrics import clean_stale_files, metrics_view, observe_outbound
+from .parsers import MessagePackParser, ORJSONParser
+from .renderers import MessagePackRenderer, ORJSONRenderer
+from .routers import ReadReplicaMixin, _use_replica
+from .testing import QUERY_BUDGETS, UNBUDGETED_URLS, QueryBudgetTestCase
+
+
+def url_names(patterns, namespace=None):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from url_names(pattern.url_patterns, pattern.namespace or namespace)
+        elif isinstance(pattern, URLPattern) and pattern.name and namespace is None:
+            yield pattern.name
+
+
+class QueryBudgetCoverageTests(SimpleTestCase):
+    def test_every_url_has_a_budget(self):
+        # Las URLs del admin van en su propio namespace y quedan fuera.
+        missing = set(url_names(get_resolver().url_patterns)) - set(QUERY_BUDGETS) - UNBUDGETED_URLS
+        self.assertFalse(missing, f'URLs sin presupuesto de consultas en core.testing: {sorted(missing)}')
+
+
+class RendererCompatibilityTests(SimpleTestCase):
+    data = {
+        'utc': datetime(2026, 3, 1, 12, 30, 15, 123456, tzinfo=dt_timezone.utc),
+        'lima': datetime(2026, 3, 1, 7, 30, tzinfo=ZoneInfo('America/Lima')),
+        'naive': datetime(2026, 3, 1, 7, 30),
+        'day': date(2026, 3, 1),
+        'lat': Decimal('-12.119180'),
+        'id': UUID('12345678-1234-5678-1234-567812345678'),
+        'message': gettext_lazy('Denuncia creada exitosamente'),
+        'text': 'línea párrafo fin',
+        'counts': {1: 'uno', 'dos': 2.5, 'nada': None},
+        'items': ReturnList([OrderedDict(a=1), (1, 2)], serializer=None),
+    }
+
+    def test_orjson_matches_drf_json(self):
+        self.assertEqual(ORJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+
+    def test_orjson_indent_matches_drf_json(self):
+        media_type = 'application/json; indent=4'
+        self.assertEqual(
+            ORJSONRenderer().render(self.data, media_type),
+            JSONRenderer().render(self.data, media_type)
+        )
+
+    def test_orjson_parser(self):
+        parsed = ORJSONParser().parse(io.BytesIO(ORJSONRenderer().render(self.data)))
+        self.assertEqual(parsed, json.loads(JSONRenderer().render(self.data)))
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"lat": NaN}'))
+
+    def test_msgpack_matches_json(self):
+        # A diferencia de JSON, MessagePack conserva las claves numéricas.
+        data = {key: value for key, value in self.data.items() if key != 'counts'}
+        content = MessagePackRenderer().render(data)
+        self.assertEqual(
+            MessagePackParser().parse(io.BytesIO(content)),
+            json.loads(JSONRenderer().render(data))
+        )
+        with self.assertRaises(ParseError):
+            MessagePackParser().parse(io.BytesIO(content[:-3]))
+
+
+def scrape():
+    request = RequestFactory().get('/metrics/', REMOTE_ADDR='127.0.0.1')
+    return metrics_view(request).content.decode()
+
+
+def sample(name, **labels):
+    for family in text_string_to_metric_families(scrape()):
+        for metric in family.samples:
+            if metric.name == name and metric.labels == labels:
+                return metric.value
+    return 0
+
+
+class MetricsTests(QueryBudgetTestCase):
+    def test_middleware_records_requests_and_queries(self):
+        labels = {'view': 'denuncia-heatmap'}
+        requests = sample('http_requests_total', method='GET', status='200', **labels)
+        queries = sample('db_queries_total', **labels)
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get(reverse('denuncia-heatmap')).status_code, 200)
+        self.assertEqual(sample('http_requests_total', method='GET', status='200', **labels), requests + 1)
+        self.assertEqual(sample('db_queries_total', **labels), queries + QUERY_BUDGETS['denuncia-heatmap']['user'])
+
+    def test_observe_outbound(self):
+        ok = sample('outbound_request_duration_seconds_count', service='reniec', outcome='ok')
+        error = sample('outbound_request_duration_seconds_count', service='reniec', outcome='error')
+        with observe_outbound('reniec'):
+            pass
+        with self.assertRaises(ValueError):
+            with observe_outbound('reniec'):
+                raise ValueError
+        self.assertEqual(sample('outbound_request_duration_seconds_count', service='reniec', outcome='ok'), ok + 1)
+        self.assertEqual(sample('outbound_request_duration_seconds_count', service='reniec', outcome='error'), error + 1)
+
+
+class MetricsViewAuthTests(SimpleTestCase):
+    def get(self, **extra):
+        return metrics_view(RequestFactory().get('/metrics/', **extra))
+
+    def test_localhost_without_token(self):
+        self.assertEqual(self.get(REMOTE_ADDR='127.0.0.1').status_code, 200)
+        self.assertEqual(self.get(REMOTE_ADDR='10.0.0.5').status_code, 403)
+
+    @override_settings(METRICS={'TOKEN': 'secreto'})
+    def test_bearer_token(self):
+        self.assertEqual(self.get(REMOTE_ADDR='127.0.0.1').status_code, 403)
+        self.assertEqual(self.get(REMOTE_ADDR='10.0.0.5', HTTP_AUTHORIZATION='Bearer otro').status_code, 403)
+        self.assertEqual(self.get(REMOTE_ADDR='10.0.0.5', HTTP_AUTHORIZATION='Bearer secreto').status_code, 200)
+
+    def test_clean_stale_files(self):
+        with tempfile.TemporaryDirectory() as path:
+            names = [
+                f'counter_{os.getppid()}.db',
+                f'counter_{os.getpid()}.db',
+                'histogram_999999999.db',
+                'notas.txt',
+            ]
+            for name in names:
+                open(os.path.join(path, name), 'w').close()
+            clean_stale_files(path)
+            self.assertEqual(sorted(os.listdir(path)), sorted([names[0], names[3]]))
+
+
+class MediaServeTests(QueryBudgetTestCase):
+    content = bytes(range(256)) * 4
+
+    def setUp(self):
+        super().setUp()
+        self.evidence = DenunciaEvidencia.objects.filter(incident__user=self.user).first()
+        self.archived = ArchivedDenunciaEvidencia.objects.filter(incident__user=self.user).first()
+        for evidence in (self.evidence, self.archived):
+            path = os.path.join(settings.MEDIA_ROOT, evidence.file.name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as handle:
+                handle.write(self.content)
+
+    def get(self, evidence, user=None, **headers):
+        self.client.force_authenticate(user)
+        return self.client.get(reverse('media', kwargs={'path': evidence.file.name}), headers=headers)
+
+    def test_evidence_access(self):
+        for evidence in (self.evidence, self.archived):
+            for user, status_code in ((self.user, 200), (self.superuser, 200), (self.other_user, 403), (None, 401)):
+                with self.subTest(evidence=evidence.file.name, user=user and self.role(user)):
+                    self.assertEqual(self.get(evidence, user).status_code, status_code)
+
+        response = self.get(self.evidence, self.user)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_ranges(self):
+        response = self.get(self.evidence, self.user, Range='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(self.content)}')
+        self.assertEqual(b''.join(response.streaming_content), self.content[10:20])
+
+        response = self.get(self.evidence, self.user, Range='bytes=-5')
+        self.assertEqual(b''.join(response.streaming_content), self.content[-5:])
+
+        response = self.get(self.evidence, self.user, Range=f'bytes={len(self.content)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.content)}')
+
+    def test_not_modified(self):
+        etag = self.get(self.evidence, self.user)['ETag']
+        for header in (etag, f'W/{etag}', f'"otro", {etag}', '*'):
+            with self.subTest(header=header):
+                response = self.get(self.evidence, self.user, If_None_Match=header)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], etag)
+        self.assertEqual(self.get(self.evidence, self.user, If_None_Match='"otro"').status_code, 200)
+
+    def test_unknown_sendfile_backend(self):
+        with self.settings(MEDIA_SENDFILE_BACKEND='x-desconocido'):
+            with self.assertRaises(ImproperlyConfigured):
+                self.get(self.evidence, self.user)
+
+
+def upload(name, image, **options):
+    buffer = io.BytesIO()
+    image.save(buffer, **options)
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+class OptimizeImageTests(SimpleTestCase):
+    def test_keeps_original_when_not_smaller(self):
+        file = upload('a.png', Image.new('RGB', (32, 32), 'red'), format='PNG', optimize=True)
+        self.assertIsNone(optimize_image(file, 1920, 85))
+
+    def test_strips_metadata_even_when_not_smaller(self):
+        exif = Image.Exif()
+        exif[0x010F] = 'Camara'
+        file = upload('a.jpg', Image.effect_noise((64, 64), 64).convert('RGB'), format='JPEG', quality=10, exif=exif)
+
+        content, original_size, stored_size = optimize_image(file, 1920, 95)
+        self.assertGreaterEqual(stored_size, original_size)
+        with Image.open(content) as image:
+            self.assertFalse(image.getexif())
+
+    def test_resizes_large_images(self):
+        file = upload('a.png', Image.effect_noise((400, 300), 64), format='PNG')
+
+        content, original_size, stored_size = optimize_image(file, 100, 85)
+        self.assertLess(stored_size, original_size)
+        with Image.open(content) as image:
+            self.assertEqual(image.size, (100, 75))
+
+
+class RequestTimingTests(QueryBudgetTestCase):
+    def get_list(self, user):
+        self.client.force_authenticate(user)
+        return self.client.get(reverse('denuncia-list'))
+
+    def test_server_timing_only_for_staff(self):
+        with self.settings(REQUEST_TIMING={'SAMPLE_RATE': 0, 'SERVER_TIMING_HEADER': 'staff'}):
+            self.assertNotIn('Server-Timing', self.get_list(self.user))
+            header = self.get_list(self.superuser)['Server-Timing']
+        self.assertRegex(header, r'^db;dur=[\d.]+;desc="\d+ queries", serializer;dur=[\d.]+, total;dur=[\d.]+$')
+
+        with self.settings(REQUEST_TIMING={'SAMPLE_RATE': 0, 'SERVER_TIMING_HEADER': False}):
+            self.assertNotIn('Server-Timing', self.get_list(self.superuser))
+
+    def test_sampled_log_line(self):
+        with self.settings(REQUEST_TIMING={'SAMPLE_RATE': 1, 'SLOW_REQUEST_MS': 60 * 1000}):
+            with self.assertLogs('core.requests', 'INFO') as logs:
+                self.get_list(self.user)
+
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual((line['method'], line['view'], line['status'], line['slow']), ('GET', 'denuncia-list', 200, False))
+        self.assertGreater(line['queries'], 0)
+        self.assertNotRegex(line['slowest_query'], r"\b\d+\b|'")
+
+    def test_serializer_timing(self):
+        install_serializer_timing()
+        stats = RequestStats()
+        token = _current.set(stats)
+        try:
+            serializers.ListSerializer(list(range(3)), child=serializers.IntegerField()).data
+        finally:
+            _current.reset(token)
+        self.assertGreater(stats.serializer_time, 0)
+        self.assertEqual(stats.serializer_depth, 0)
+
+    def test_fingerprint(self):
+        sql = (
+            'SELECT "denuncia"."id", "denuncia"."user_id" AS "owner" FROM "denuncia" '
+            "WHERE \"denuncia\".\"id\" IN (%s, %s, %s) AND \"denuncia\".\"region\" = 'Lima'  LIMIT 21"
+        )
+        self.assertEqual(
+            fingerprint(sql, 200),
+            'SELECT ... FROM "denuncia" WHERE "denuncia"."id" IN (...) AND "denuncia"."region" = ? LIMIT ?'
+        )
+        self.assertEqual(fingerprint('SELECT 1 FROM "tabla"', 10), 'SELECT ? F...')
+
+
+class CrashingReplicaView(ReadReplicaMixin, APIView):
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        raise RuntimeError
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReadReplicaMixinTests(SimpleTestCase):
+    def test_crash_resets_replica_flag(self):
+        with self.assertRaises(RuntimeError):
+            CrashingReplicaView.as_view()(RequestFactory().get('/'))
+        self.assertFalse(_use_replica.get())
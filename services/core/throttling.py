@@ -0,0 +1,182 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.throttling import BaseThrottle
+
+CACHE_PREFIX = 'throttle:'
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def _settings():
+    defaults = {
+        'STORAGE': 'cache',
+        'LOCAL_MAXSIZE': 10000,
+        'RATES': {},
+        'CONCURRENCY': {},
+        'RETRY_AFTER': 2,
+    }
+    defaults.update(getattr(settings, 'THROTTLING', {}))
+    return defaults
+
+
+def parse_rate(rate):
+    """``'6/min'`` -> ``(6, 60)``: capacidad del bucket y segundos para llenarlo."""
+    num, period = rate.split('/')
+    return int(num), PERIODS[period[0]]
+
+
+def take_token(state, capacity, per_second, now):
+    """Intenta sacar un token del bucket ``state = (tokens, actualizado_en)``.
+
+    Devuelve el nuevo estado y los segundos que faltan para el próximo token
+    (``0`` si la petición pasa).
+    """
+    tokens, updated_at = state or (capacity, now)
+    tokens = min(capacity, tokens + (now - updated_at) * per_second)
+    if tokens >= 1:
+        return (tokens - 1, now), 0
+    return (tokens, now), (1 - tokens) / per_second
+
+
+class LocalBuckets:
+    """Buckets en memoria del proceso, con un LRU para acotar su tamaño."""
+
+    def __init__(self):
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, per_second, maxsize):
+        with self._lock:
+            self._data[key], wait = take_token(self._data.get(key), capacity, per_second, time.time())
+            self._data.move_to_end(key)
+            while len(self._data) > maxsize:
+                self._data.popitem(last=False)
+        return wait
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class CacheBuckets:
+    """Buckets en la caché de Django, compartidos entre workers.
+
+    La lectura y la escritura no son atómicas: con peticiones simultáneas del
+    mismo usuario en dos procesos puede pasar alguna de más, lo que basta para
+    frenar refrescos repetidos.
+    """
+
+    def take(self, key, capacity, per_second, maxsize):
+        key = CACHE_PREFIX + key
+        state, wait = take_token(cache.get(key), capacity, per_second, time.time())
+        cache.set(key, state, math.ceil(capacity / per_second))
+        return wait
+
+
+local_buckets = LocalBuckets()
+cache_buckets = CacheBuckets()
+
+
+class CostTierThrottle(BaseThrottle):
+    """Token bucket por usuario para las vistas con ``cost_tier``.
+
+    Cada nivel (``heatmap``, ``stats``, ``export``, ``upload``) tiene su tasa en
+    ``THROTTLING['RATES']``; el usuario puede gastar la tasa completa de una
+    vez y después recupera tokens de forma continua. Las vistas sin
+    ``cost_tier`` no se limitan.
+    """
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        tier = getattr(view, 'cost_tier', None)
+        options = _settings()
+        rate = options['RATES'].get(tier)
+        if rate is None:
+            return True
+
+        capacity, period = parse_rate(rate)
+        if request.user and request.user.is_authenticated:
+            ident = f'user:{request.user.pk}'
+        else:
+            ident = f'ip:{self.get_ident(request)}'
+
+        buckets = local_buckets if options['STORAGE'] == 'local' else cache_buckets
+        wait = buckets.take(f'{tier}:{ident}', capacity, capacity / period, options['LOCAL_MAXSIZE'])
+        if wait:
+            self.wait_seconds = wait
+            return False
+        return True
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class Overloaded(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'El servidor está ocupado. Intenta nuevamente en unos segundos.'
+    default_code = 'overloaded'
+
+    def __init__(self, wait):
+        super().__init__()
+        # El manejador de excepciones de DRF lo convierte en Retry-After.
+        self.wait = wait
+
+
+_slots = {}
+_slots_lock = threading.Lock()
+
+
+def tier_slots(tier, limit):
+    with _slots_lock:
+        slots = _slots.get(tier)
+        if slots is None or slots[0] != limit:
+            slots = _slots[tier] = (limit, threading.BoundedSemaphore(limit))
+        return slots[1]
+
+
+class ConcurrencyLimitMixin:
+    """Limita cuántas peticiones de un ``cost_tier`` se atienden a la vez en el proceso.
+
+    Si no queda lugar, responde 503 con ``Retry-After`` en vez de encolar la
+    petición, para que los workers sigan libres para los endpoints baratos.
+    El lugar se toma después de autenticar y del throttling, y se libera al
+    terminar la respuesta o al fallar la vista: DRF vuelve a lanzar las
+    excepciones que no son de la API y entonces no llama a
+    ``finalize_response``.
+    """
+
+    cost_tier = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        options = _settings()
+        limit = options['CONCURRENCY'].get(self.cost_tier)
+        if not limit:
+            return
+
+        slots = tier_slots(self.cost_tier, limit)
+        if not slots.acquire(blocking=False):
+            raise Overloaded(options['RETRY_AFTER'])
+        self._concurrency_slot = slots
+
+    def release_slot(self):
+        slots = getattr(self, '_concurrency_slot', None)
+        if slots is not None:
+            slots.release()
+            self._concurrency_slot = None
+
+    def handle_exception(self, exc):
+        # Tanto APIView.dispatch como AsyncAPIView.dispatch pasan por aquí.
+        self.release_slot()
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        self.release_slot()
+        return super().finalize_response(request, response, *args, **kwargs)
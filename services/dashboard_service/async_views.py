@@ -0,0 +1,28 @@
+from asgiref.sync import sync_to_async
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from core.async_views import AsyncAPIView
+from core.throttling import ConcurrencyLimitMixin
+from users_service.permissions import IsSuperUser
+from .views import dashboard_stats, user_dashboard_stats
+
+
+# Cada tablero son una decena de agregados seguidos: se calculan en un solo
+# salto al hilo del ORM en vez de pagar un sync_to_async por consulta.
+class DashboardStatsAsyncView(ConcurrencyLimitMixin, AsyncAPIView):
+    permission_classes = [IsAuthenticated, IsSuperUser]
+    use_read_replica = True
+    cost_tier = 'stats'
+
+    async def get(self, request):
+        return Response(await sync_to_async(dashboard_stats)(request))
+
+
+class DashboardUserStatsAsyncView(ConcurrencyLimitMixin, AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+    use_read_replica = True
+    cost_tier = 'stats'
+
+    async def get(self, request):
+        return Response(await sync_to_async(user_dashboard_stats)(request))
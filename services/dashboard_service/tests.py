@@ -1,3 +1,45 @@
-from django.test import TestCase
+from datetime import datetime, timedelta
 
-# Create your tests here.
+from django.urls import reverse
+from django.utils import timezone
+
+from core.db import explicit_auto_now_add
+from core.testing import QueryBudgetTestCase
+from denuncias_service.models import Denuncia
+from .views import chart_start
+
+
+class DashboardQueryBudgetTests(QueryBudgetTestCase):
+    def test_stats(self):
+        self.assertQueryBudget('dashboard-stats', self.user, status_code=403)
+        self.assertQueryBudget('dashboard-stats', self.superuser, grow=True)
+
+    def test_user_stats(self):
+        for user in (self.user, self.superuser):
+            with self.subTest(user=self.role(user)):
+                self.assertQueryBudget('dashboard-user-stats', user, grow=True)
+
+
+class ChartWindowTests(QueryBudgetTestCase):
+    def test_chart_start(self):
+        for today, start in (
+            (datetime(2026, 10, 19, 15, 30), datetime(2025, 11, 1)),
+            (datetime(2026, 1, 5), datetime(2025, 2, 1)),
+            (datetime(2026, 12, 31), datetime(2026, 1, 1)),
+        ):
+            with self.subTest(today=today):
+                self.assertEqual(chart_start(timezone.make_aware(today)), timezone.make_aware(start))
+
+    def test_chart_starts_on_a_month_boundary(self):
+        since = chart_start(timezone.localtime())
+        with explicit_auto_now_add(Denuncia, 'created_at'):
+            for created_at in (since - timedelta(days=1), since):
+                Denuncia.objects.create(
+                    user=self.user, description='Denuncia en el borde del gráfico',
+                    district='Miraflores', region='Lima', _type='theft', created_at=created_at
+                )
+
+        self.client.force_authenticate(self.user)
+        chart = self.client.get(reverse('dashboard-user-stats')).data['chart_data']
+        live = Denuncia.objects.filter(user=self.user, created_at__gte=since).count()
+        self.assertEqual(sum(point['y'] for point in chart), live)
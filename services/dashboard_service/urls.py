@@ -1,5 +1,11 @@
+from django.conf import settings
 from django.urls import path
 from .views import DashboardStatsView, DashboardUserStatsView
+from .async_views import DashboardStatsAsyncView, DashboardUserStatsAsyncView
+
+if settings.ASYNC_READ_VIEWS:
+    DashboardStatsView = DashboardStatsAsyncView
+    DashboardUserStatsView = DashboardUserStatsAsyncView
 
 urlpatterns = [
     path('dashboard/stats/', DashboardStatsView.as_view(), name='dashboard-stats'),
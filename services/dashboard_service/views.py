@@ -1,166 +1,211 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from collections import Counter
 from django.db.models import Count
 from django.db.models.functions import TruncMonth
+from django.utils import timezone
 from datetime import datetime, timedelta
 from denuncias_service.models import Denuncia
+from denuncias_service.archive import archived_counts
 from denuncias_service.serializers import DenunciaListSerializer
 from users_service.models import User
 from users_service.permissions import IsSuperUser
+from core.routers import ReadReplicaMixin
+from core.throttling import ConcurrencyLimitMixin
 
-class DashboardStatsView(APIView):
-    permission_classes = [IsAuthenticated, IsSuperUser]
+def count_by(queryset, field):
+    return Counter(dict(queryset.order_by().values_list(field).annotate(n=Count('id'))))
+
+
+def chart_start(today):
+    """Primer instante del mes de hace 11 meses.
+
+    Las denuncias vivas y las archivadas se cortan en el mismo borde de mes,
+    así el primer mes del gráfico no mezcla un mes archivado completo con uno
+    vivo a medias.
+    """
+    year, month = divmod(today.year * 12 + today.month - 12, 12)
+    return timezone.make_aware(datetime(year, month + 1, 1))
+
+
+def monthly_counts(monthly_data, archived):
+    counts = Counter()
+    for item in monthly_data:
+        counts[(item['month'].year, item['month'].month)] += item['count']
+    for month, count in archived.items():
+        counts[(month.year, month.month)] += count
+    return sorted(counts.items())
+
+
+def dashboard_stats(request):
+    # Las denuncias archivadas se suman desde ArchivedDenunciaStats.
+    status_counts = count_by(Denuncia.objects.all(), 'status') + archived_counts('status')
+    total_incidents = sum(status_counts.values())
+    total_users = User.objects.count()
     
-    def get(self, request):
-        total_incidents = Denuncia.objects.count()
-        total_users = User.objects.count()
-        
-        recent_incidents = Denuncia.objects.select_related('user').order_by('-created_at')[:5]
-        recent_incidents_serializer = DenunciaListSerializer(recent_incidents, many=True, context={'request': request})
+    recent_incidents = (
+        Denuncia.objects
+        .select_related('user')
+        .annotate(evidence_count=Count('evidence'))
+        .order_by('-created_at')[:5]
+    )
+    recent_incidents_serializer = DenunciaListSerializer(recent_incidents, many=True, context={'request': request})
 
-        status_stats = {
-            'pending': Denuncia.objects.filter(status='Pending').count(),
-            'in_progress': Denuncia.objects.filter(status='In Progress').count(),
-            'resolved': Denuncia.objects.filter(status='Resolved').count()
-        }
-        
-        type_stats = list(
-            Denuncia.objects.values('_type')
-            .annotate(count=Count('id'))
-            .order_by('-count')[:5]
-        )
-        
-        formatted_type_stats = [
-            {
-                'type': item['_type'],
-                'type_display': dict(Denuncia._meta.get_field('_type').choices).get(item['_type'], item['_type']),
-                'count': item['count']
-            }
-            for item in type_stats
-        ]
-        
-        region_stats = list(
-            Denuncia.objects.values('region')
-            .annotate(count=Count('id'))
-            .order_by('-count')[:5]
-        )
-        
-        today = datetime.now()
-        twelve_months_ago = today - timedelta(days=365)
-        
-        monthly_data = (
-            Denuncia.objects
-            .filter(created_at__gte=twelve_months_ago)
-            .annotate(month=TruncMonth('created_at'))
-            .values('month')
-            .annotate(count=Count('id'))
-            .order_by('month')
-        )
-        
-        month_names = {
-            1: 'Ene', 2: 'Feb', 3: 'Mar', 4: 'Abr',
-            5: 'May', 6: 'Jun', 7: 'Jul', 8: 'Ago',
-            9: 'Sep', 10: 'Oct', 11: 'Nov', 12: 'Dic'
+    status_stats = {
+        'pending': status_counts['Pending'],
+        'in_progress': status_counts['In Progress'],
+        'resolved': status_counts['Resolved']
+    }
+    
+    type_stats = count_by(Denuncia.objects.all(), '_type') + archived_counts('_type')
+    
+    formatted_type_stats = [
+        {
+            'type': _type,
+            'type_display': dict(Denuncia._meta.get_field('_type').choices).get(_type, _type),
+            'count': count
         }
-        
-        chart_data = []
-        for item in monthly_data:
-            month_num = item['month'].month
-            chart_data.append({
-                'x': month_names[month_num],
-                'y': item['count']
-            })
-        
-        if len(chart_data) < 12:
-            all_months = {}
-            for i in range(12):
-                date = today - timedelta(days=30 * i)
-                month_key = month_names[date.month]
-                all_months[month_key] = 0
-            
-            for item in chart_data:
-                all_months[item['x']] = item['y']
-            
-            chart_data = [
-                {'x': month_names[((today.month - 11 + i) % 12) or 12], 'y': all_months.get(month_names[((today.month - 11 + i) % 12) or 12], 0)}
-                for i in range(12)
-            ]
-        
-        return Response({
-            'total_incidents': total_incidents,
-            'total_users': total_users,
-            'recent_incidents': recent_incidents_serializer.data,
-            'status_stats': status_stats,
-            'type_stats': formatted_type_stats,
-            'region_stats': region_stats,
-            'chart_data': chart_data
+        for _type, count in type_stats.most_common(5)
+    ]
+    
+    region_counts = count_by(Denuncia.objects.all(), 'region') + archived_counts('region')
+    region_stats = [
+        {'region': region, 'count': count}
+        for region, count in region_counts.most_common(5)
+    ]
+    
+    today = timezone.localtime()
+    since = chart_start(today)
+    
+    monthly_data = (
+        Denuncia.objects
+        .filter(created_at__gte=since)
+        .annotate(month=TruncMonth('created_at'))
+        .values('month')
+        .annotate(count=Count('id'))
+        .order_by('month')
+    )
+    
+    month_names = {
+        1: 'Ene', 2: 'Feb', 3: 'Mar', 4: 'Abr',
+        5: 'May', 6: 'Jun', 7: 'Jul', 8: 'Ago',
+        9: 'Sep', 10: 'Oct', 11: 'Nov', 12: 'Dic'
+    }
+    
+    chart_data = []
+    for (year, month_num), count in monthly_counts(monthly_data, archived_counts('month', since=since)):
+        chart_data.append({
+            'x': month_names[month_num],
+            'y': count
         })
+    
+    if len(chart_data) < 12:
+        all_months = {}
+        for i in range(12):
+            date = today - timedelta(days=30 * i)
+            month_key = month_names[date.month]
+            all_months[month_key] = 0
+        
+        for item in chart_data:
+            all_months[item['x']] = item['y']
+        
+        chart_data = [
+            {'x': month_names[((today.month - 11 + i) % 12) or 12], 'y': all_months.get(month_names[((today.month - 11 + i) % 12) or 12], 0)}
+            for i in range(12)
+        ]
+    
+    return {
+        'total_incidents': total_incidents,
+        'total_users': total_users,
+        'recent_incidents': recent_incidents_serializer.data,
+        'status_stats': status_stats,
+        'type_stats': formatted_type_stats,
+        'region_stats': region_stats,
+        'chart_data': chart_data
+    }
 
 
-class DashboardUserStatsView(APIView):
-    permission_classes = [IsAuthenticated]
+class DashboardStatsView(ConcurrencyLimitMixin, ReadReplicaMixin, APIView):
+    permission_classes = [IsAuthenticated, IsSuperUser]
+    cost_tier = 'stats'
     
     def get(self, request):
-        user = request.user
-        
-        total_incidents = Denuncia.objects.filter(user=user).count()
-        
-        recent_incidents = Denuncia.objects.filter(user=user).order_by('-created_at')[:5]
-        recent_incidents_serializer = DenunciaListSerializer(recent_incidents, many=True, context={'request': request})
-        
-        status_stats = {
-            'pending': Denuncia.objects.filter(user=user, status='Pending').count(),
-            'in_progress': Denuncia.objects.filter(user=user, status='In Progress').count(),
-            'resolved': Denuncia.objects.filter(user=user, status='Resolved').count()
-        }
-        
-        today = datetime.now()
-        twelve_months_ago = today - timedelta(days=365)
-        
-        monthly_data = (
-            Denuncia.objects
-            .filter(user=user, created_at__gte=twelve_months_ago)
-            .annotate(month=TruncMonth('created_at'))
-            .values('month')
-            .annotate(count=Count('id'))
-            .order_by('month')
-        )
-        
-        month_names = {
-            1: 'Ene', 2: 'Feb', 3: 'Mar', 4: 'Abr',
-            5: 'May', 6: 'Jun', 7: 'Jul', 8: 'Ago',
-            9: 'Sep', 10: 'Oct', 11: 'Nov', 12: 'Dic'
-        }
-        
-        chart_data = []
-        for item in monthly_data:
-            month_num = item['month'].month
-            chart_data.append({
-                'x': month_names[month_num],
-                'y': item['count']
-            })
-        
-        if len(chart_data) < 12:
-            all_months = {}
-            for i in range(12):
-                date = today - timedelta(days=30 * i)
-                month_key = month_names[date.month]
-                all_months[month_key] = 0
-            
-            for item in chart_data:
-                all_months[item['x']] = item['y']
-            
-            chart_data = [
-                {'x': month_names[((today.month - 11 + i) % 12) or 12], 'y': all_months.get(month_names[((today.month - 11 + i) % 12) or 12], 0)}
-                for i in range(12)
-            ]
-        
-        return Response({
-            'total_incidents': total_incidents,
-            'recent_incidents': recent_incidents_serializer.data,
-            'status_stats': status_stats,
-            'chart_data': chart_data
+        return Response(dashboard_stats(request))
+
+
+def user_dashboard_stats(request):
+    user = request.user
+    
+    status_counts = count_by(Denuncia.objects.filter(user=user), 'status') + archived_counts('status', user)
+    total_incidents = sum(status_counts.values())
+    
+    recent_incidents = (
+        Denuncia.objects
+        .filter(user=user)
+        .select_related('user')
+        .annotate(evidence_count=Count('evidence'))
+        .order_by('-created_at')[:5]
+    )
+    recent_incidents_serializer = DenunciaListSerializer(recent_incidents, many=True, context={'request': request})
+    
+    status_stats = {
+        'pending': status_counts['Pending'],
+        'in_progress': status_counts['In Progress'],
+        'resolved': status_counts['Resolved']
+    }
+    
+    today = timezone.localtime()
+    since = chart_start(today)
+    
+    monthly_data = (
+        Denuncia.objects
+        .filter(user=user, created_at__gte=since)
+        .annotate(month=TruncMonth('created_at'))
+        .values('month')
+        .annotate(count=Count('id'))
+        .order_by('month')
+    )
+    
+    month_names = {
+        1: 'Ene', 2: 'Feb', 3: 'Mar', 4: 'Abr',
+        5: 'May', 6: 'Jun', 7: 'Jul', 8: 'Ago',
+        9: 'Sep', 10: 'Oct', 11: 'Nov', 12: 'Dic'
+    }
+    
+    chart_data = []
+    for (year, month_num), count in monthly_counts(monthly_data, archived_counts('month', user, since)):
+        chart_data.append({
+            'x': month_names[month_num],
+            'y': count
         })
+    
+    if len(chart_data) < 12:
+        all_months = {}
+        for i in range(12):
+            date = today - timedelta(days=30 * i)
+            month_key = month_names[date.month]
+            all_months[month_key] = 0
+        
+        for item in chart_data:
+            all_months[item['x']] = item['y']
+        
+        chart_data = [
+            {'x': month_names[((today.month - 11 + i) % 12) or 12], 'y': all_months.get(month_names[((today.month - 11 + i) % 12) or 12], 0)}
+            for i in range(12)
+        ]
+    
+    return {
+        'total_incidents': total_incidents,
+        'recent_incidents': recent_incidents_serializer.data,
+        'status_stats': status_stats,
+        'chart_data': chart_data
+    }
 
 
+class DashboardUserStatsView(ConcurrencyLimitMixin, ReadReplicaMixin, APIView):
+    permission_classes = [IsAuthenticated]
+    cost_tier = 'stats'
+    
+    def get(self, request):
+        return Response(user_dashboard_stats(request))
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Denuncia, DenunciaEvidencia
+from .models import Denuncia, DenunciaEvidencia, ArchivedDenuncia, ArchivedDenunciaStats
 
 class DenunciaAdmin(admin.ModelAdmin):
     list_display = ('id', 'user', 'get_type_display', 'status', 'region', 'district', 'created_at')
@@ -30,4 +30,19 @@ class DenunciaAdmin(admin.ModelAdmin):
 
 
 admin.site.register(Denuncia, DenunciaAdmin)
-admin.site.register(DenunciaEvidencia)
\ No newline at end of file
+admin.site.register(DenunciaEvidencia)
+
+
+class ArchivedDenunciaAdmin(DenunciaAdmin):
+    list_display = ('id', 'user', 'get_type_display', 'status', 'region', 'district', 'created_at', 'archived_at')
+    readonly_fields = ('created_at', 'archived_at')
+
+
+class ArchivedDenunciaStatsAdmin(admin.ModelAdmin):
+    list_display = ('month', 'status', '_type', 'region', 'count')
+    list_filter = ('status', '_type', 'region')
+    ordering = ('-month',)
+
+
+admin.site.register(ArchivedDenuncia, ArchivedDenunciaAdmin)
+admin.site.register(ArchivedDenunciaStats, ArchivedDenunciaStatsAdmin)
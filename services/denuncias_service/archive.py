@@ -0,0 +1,110 @@
+import calendar
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, DateField, DateTimeField, F, Sum, Value
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from core.db import insert_from_select, raw_cascade_delete
+from .models import (
+    Denuncia,
+    DenunciaEvidencia,
+    ArchivedDenuncia,
+    ArchivedDenunciaEvidencia,
+    ArchivedDenunciaStats
+)
+
+ARCHIVABLE_STATUSES = ['Resolved']
+
+DENUNCIA_FIELDS = [field.attname for field in Denuncia._meta.concrete_fields]
+EVIDENCE_FIELDS = [field.attname for field in DenunciaEvidencia._meta.concrete_fields]
+
+
+def months_ago(now, months):
+    total = now.year * 12 + now.month - 1 - months
+    year, month = divmod(total, 12)
+    day = min(now.day, calendar.monthrange(year, month + 1)[1])
+    return now.replace(year=year, month=month + 1, day=day)
+
+
+def archivable(cutoff):
+    return Denuncia.objects.filter(status__in=ARCHIVABLE_STATUSES, created_at__lt=cutoff)
+
+
+def _add_stats(queryset):
+    rows = (
+        queryset
+        .annotate(month=TruncMonth('created_at', output_field=DateField()))
+        .values('month', 'status', '_type', 'region')
+        .annotate(n=Count('id'))
+        .order_by()
+    )
+    for row in rows:
+        bucket = {key: row[key] for key in ('month', 'status', '_type', 'region')}
+        updated = ArchivedDenunciaStats.objects.filter(**bucket).update(count=F('count') + row['n'])
+        if not updated:
+            ArchivedDenunciaStats.objects.create(count=row['n'], **bucket)
+
+
+def archive_chunk(cutoff, chunk_size):
+    """Mueve un bloque de denuncias archivables y su evidencia a las tablas frías.
+
+    Todo ocurre en una transacción: se actualizan los totales de
+    ``ArchivedDenunciaStats``, se copian las filas con ``INSERT ... SELECT`` y
+    se borran de las tablas principales. Los archivos no se tocan. Devuelve
+    ``(denuncias, evidencias)`` movidas; ``(0, 0)`` cuando no queda nada.
+    """
+    with transaction.atomic():
+        pks = list(
+            archivable(cutoff)
+            .select_for_update()
+            .order_by('pk')
+            .values_list('pk', flat=True)[:chunk_size]
+        )
+        if not pks:
+            return 0, 0
+
+        chunk = Denuncia.objects.filter(pk__in=pks)
+        _add_stats(chunk)
+
+        moved = insert_from_select(
+            ArchivedDenuncia,
+            chunk
+            .annotate(archived_at=Value(timezone.now(), output_field=DateTimeField()))
+            .values_list(*DENUNCIA_FIELDS, 'archived_at'),
+            DENUNCIA_FIELDS + ['archived_at']
+        )
+        evidence = insert_from_select(
+            ArchivedDenunciaEvidencia,
+            DenunciaEvidencia.objects.filter(incident_id__in=pks).values_list(*EVIDENCE_FIELDS),
+            EVIDENCE_FIELDS
+        )
+        # Sin señales: las denuncias archivadas siguen existiendo y no dejan lápida.
+        raw_cascade_delete(chunk, send_signals=False)
+
+    return moved, evidence
+
+
+def archived_counts(field, user=None, since=None):
+    """Conteos de denuncias archivadas agrupados por ``field``.
+
+    Los totales globales salen de ``ArchivedDenunciaStats`` sin tocar la tabla
+    de archivo; los de un usuario se cuentan en ``ArchivedDenuncia`` por su
+    índice de ``user_id``. ``field`` puede ser ``month``, ``status``,
+    ``_type`` o ``region``.
+    """
+    if user is None:
+        queryset = ArchivedDenunciaStats.objects.all()
+        if since is not None:
+            queryset = queryset.filter(month__gte=timezone.localdate(since).replace(day=1))
+        rows = queryset.values(field).annotate(n=Sum('count'))
+    else:
+        queryset = ArchivedDenuncia.objects.filter(user=user)
+        if since is not None:
+            queryset = queryset.filter(created_at__gte=since)
+        if field == 'month':
+            queryset = queryset.annotate(month=TruncMonth('created_at', output_field=DateField()))
+        rows = queryset.values(field).annotate(n=Count('id'))
+
+    return Counter({row[field]: row['n'] for row in rows.order_by()})
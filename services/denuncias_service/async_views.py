@@ -0,0 +1,95 @@
+from asgiref.sync import sync_to_async
+from django.http import Http404
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from auth_service.authentication import CachedTokenAuthentication, QueryParamTokenAuthentication
+from core.async_views import AsyncAPIView
+from core.events import open_stream
+from core.pagination import AsyncPageNumberPagination
+from core.renderers import EventStreamRenderer, ORJSONRenderer
+from core.throttling import ConcurrencyLimitMixin
+from users_service.models import User
+from .models import Denuncia
+from .permissions import IsOwnerOrSuperUser
+from .serializers import DenunciaListSerializer, DenunciaSerializer
+from .views import (
+    batch_ids,
+    denuncia_batch_queryset,
+    denuncia_batch_response,
+    denuncia_event_filter,
+    denuncia_from_row,
+    denuncia_list_queryset,
+    heatmap_data,
+    heatmap_queryset,
+    include_archived
+)
+
+
+class DenunciaListAsyncView(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+    use_read_replica = True
+
+    async def get(self, request):
+        paginator = AsyncPageNumberPagination()
+        page = await paginator.apaginate_queryset(denuncia_list_queryset(request), request, self)
+
+        if include_archived(request):
+            page = [denuncia_from_row(row) for row in page]
+            users = User.objects.filter(pk__in={denuncia.user_id for denuncia in page})
+            users_by_id = {user.pk: user async for user in users}
+            for denuncia in page:
+                denuncia.user = users_by_id[denuncia.user_id]
+
+        serializer = DenunciaListSerializer(page, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
+
+
+class DenunciaDetailAsyncView(AsyncAPIView):
+    permission_classes = [IsAuthenticated, IsOwnerOrSuperUser]
+    use_read_replica = True
+
+    async def get(self, request, pk):
+        try:
+            denuncia = await (
+                Denuncia.objects
+                .select_related('user')
+                .prefetch_related('evidence')
+                .aget(pk=pk)
+            )
+        except Denuncia.DoesNotExist:
+            raise Http404('No Denuncia matches the given query.')
+
+        self.check_object_permissions(request, denuncia)
+        serializer = DenunciaSerializer(denuncia, context={'request': request})
+        return Response(serializer.data)
+
+
+class DenunciaBatchDetailAsyncView(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+    use_read_replica = True
+
+    async def get(self, request):
+        ids = batch_ids(request)
+        denuncias = [denuncia async for denuncia in denuncia_batch_queryset(request, ids)]
+        return denuncia_batch_response(request, ids, denuncias)
+
+
+class DenunciaHeatmapAsyncView(ConcurrencyLimitMixin, AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+    use_read_replica = True
+    cost_tier = 'heatmap'
+
+    async def get(self, request):
+        denuncias = [denuncia async for denuncia in heatmap_queryset(request)]
+        # La agrupación es CPU pura: fuera del loop para no frenar al resto del worker.
+        return Response(await sync_to_async(heatmap_data)(denuncias))
+
+
+class DenunciaEventsAsyncView(AsyncAPIView):
+    authentication_classes = [CachedTokenAuthentication, QueryParamTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [EventStreamRenderer, ORJSONRenderer]
+
+    async def get(self, request):
+        return open_stream(request, denuncia_event_filter(request.user), asynchronous=True)
@@ -0,0 +1,97 @@
+import base64
+import heapq
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Count, Q
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .models import Denuncia, DenunciaTombstone
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def _settings():
+    defaults = {
+        'SETTLE_SECONDS': 10,
+        'PAGE_SIZE': 100,
+        'MAX_PAGE_SIZE': 1000,
+    }
+    defaults.update(getattr(settings, 'CHANGE_FEED', {}))
+    return defaults
+
+
+def touch(*pks):
+    """Marca denuncias como modificadas cuando cambia algo que no pasa por ``save()``."""
+    return Denuncia.objects.filter(pk__in=pks).update(updated_at=timezone.now())
+
+
+def encode_cursor(changed_at, pk):
+    delta = changed_at - EPOCH
+    micros = (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+    return base64.urlsafe_b64encode(f'{micros}.{pk}'.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        micros, pk = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode().split('.')
+        return EPOCH + timedelta(microseconds=int(micros)), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        raise ValidationError({'since': 'Cursor inválido.'})
+
+
+def _after(field, id_field, position):
+    if position is None:
+        return Q()
+    changed_at, pk = position
+    return Q(**{f'{field}__gt': changed_at}) | Q(**{field: changed_at, f'{id_field}__gt': pk})
+
+
+def change_feed(user, since=None, page_size=None):
+    """Denuncias creadas, modificadas o borradas después del cursor ``since``.
+
+    Recorre ``Denuncia.updated_at`` y las lápidas en orden de ``(fecha, id)``.
+    Solo entran cambios con más de ``SETTLE_SECONDS`` de antigüedad: una
+    transacción que aún no confirmó puede escribir una fecha anterior a la
+    última que vio el cliente, y así no se la salta. Devuelve
+    ``(denuncias, ids_borrados, cursor, has_more)``.
+    """
+    options = _settings()
+    page_size = max(1, min(page_size or options['PAGE_SIZE'], options['MAX_PAGE_SIZE']))
+    position = decode_cursor(since) if since else None
+    settled = timezone.now() - timedelta(seconds=options['SETTLE_SECONDS'])
+
+    denuncias = Denuncia.objects.all()
+    tombstones = DenunciaTombstone.objects.all()
+    if not user.is_superuser:
+        denuncias = denuncias.filter(user=user)
+        tombstones = tombstones.filter(user_id=user.pk)
+
+    denuncias = list(
+        denuncias
+        .filter(_after('updated_at', 'id', position), updated_at__lte=settled)
+        .select_related('user')
+        .annotate(evidence_count=Count('evidence'))
+        .order_by('updated_at', 'id')[:page_size + 1]
+    )
+    tombstones = list(
+        tombstones
+        .filter(_after('deleted_at', 'denuncia_id', position), deleted_at__lte=settled)
+        .order_by('deleted_at', 'denuncia_id')
+        .values_list('deleted_at', 'denuncia_id')[:page_size + 1]
+    )
+
+    changes = heapq.merge(
+        ((denuncia.updated_at, denuncia.pk, denuncia) for denuncia in denuncias),
+        ((deleted_at, pk, None) for deleted_at, pk in tombstones),
+        key=lambda change: change[:2]
+    )
+    page = list(changes)
+    has_more = len(page) > page_size
+    page = page[:page_size]
+
+    cursor = encode_cursor(*page[-1][:2]) if page else since
+    updated = [denuncia for _, _, denuncia in page if denuncia is not None]
+    deleted = [pk for _, pk, denuncia in page if denuncia is None]
+    return updated, deleted, cursor, has_more
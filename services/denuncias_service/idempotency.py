@@ -0,0 +1,139 @@
+import functools
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+
+from .models import IdempotencyRecord
+
+HEADER = 'Idempotency-Key'
+
+
+def _settings():
+    defaults = {
+        'TTL': 86400,
+        'PENDING_TIMEOUT': 60,
+        'RETRY_AFTER': 1,
+    }
+    defaults.update(getattr(settings, 'IDEMPOTENCY', {}))
+    return defaults
+
+
+class IdempotencyInProgress(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'Ya se está procesando una solicitud con esta clave de idempotencia.'
+    default_code = 'idempotency_in_progress'
+
+    def __init__(self, wait):
+        super().__init__()
+        self.wait = wait
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = 'La clave de idempotencia ya se usó con una solicitud distinta.'
+    default_code = 'idempotency_key_reused'
+
+
+def request_fingerprint(request):
+    """Hash del método, la ruta y el contenido ya parseado de la solicitud.
+
+    Se usa el contenido y no el cuerpo crudo porque los clientes generan un
+    boundary multipart nuevo en cada reintento. Los archivos entran por su
+    contenido.
+    """
+    digest = hashlib.sha256(f'{request.method} {request.path}\n'.encode())
+    data = request.data
+    if not hasattr(data, 'lists'):
+        digest.update(json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder).encode())
+        return digest.hexdigest()
+
+    for key, values in sorted(data.lists(), key=lambda item: item[0]):
+        for value in values:
+            digest.update(f'\n{key}\n'.encode())
+            if isinstance(value, UploadedFile):
+                for chunk in value.chunks():
+                    digest.update(chunk)
+                value.seek(0)
+            else:
+                digest.update(str(value).encode())
+    return digest.hexdigest()
+
+
+def _claim(user, key, fingerprint, options):
+    """Reserva la clave o devuelve el registro ya guardado para ella."""
+    now = timezone.now()
+    record = IdempotencyRecord.objects.filter(user=user, key=key).first()
+    if record is not None:
+        abandoned = (
+            record.status_code is None
+            and record.created_at < now - timedelta(seconds=options['PENDING_TIMEOUT'])
+        )
+        if record.expires_at > now and not abandoned:
+            if record.status_code is None:
+                raise IdempotencyInProgress(options['RETRY_AFTER'])
+            if record.fingerprint != fingerprint:
+                raise IdempotencyKeyReused()
+            return record
+        record.delete()
+
+    try:
+        with transaction.atomic():
+            IdempotencyRecord.objects.create(
+                user=user,
+                key=key,
+                fingerprint=fingerprint,
+                expires_at=now + timedelta(seconds=options['TTL'])
+            )
+    except IntegrityError:
+        raise IdempotencyInProgress(options['RETRY_AFTER'])
+    return None
+
+
+def idempotent(handler):
+    """Hace idempotente un método de vista con el header ``Idempotency-Key``.
+
+    La primera solicitud con una clave se procesa y, si responde 2xx, su
+    respuesta queda guardada ``TTL`` segundos: los reintentos con la misma
+    clave y el mismo contenido la reciben tal cual, sin repetir las escrituras
+    ni el procesamiento de archivos. Mientras la primera sigue en curso se responde 409, y si
+    la clave llega con otro contenido, 422. Las respuestas de error no se
+    guardan, así el cliente puede reintentar. Sin el header no cambia nada.
+    """
+
+    @functools.wraps(handler)
+    def wrapper(view, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return handler(view, request, *args, **kwargs)
+        if len(key) > 255:
+            raise ValidationError({HEADER: 'La clave no puede superar los 255 caracteres.'})
+
+        options = _settings()
+        user = request.user
+        record = _claim(user, key, request_fingerprint(request), options)
+        if record is not None:
+            return Response(record.body, status=record.status_code, headers={'Idempotent-Replayed': 'true'})
+
+        completed = IdempotencyRecord.objects.filter(user=user, key=key)
+        try:
+            response = handler(view, request, *args, **kwargs)
+        except BaseException:
+            completed.delete()
+            raise
+
+        if status.is_success(response.status_code):
+            completed.update(status_code=response.status_code, body=response.data)
+        else:
+            completed.delete()
+        return response
+
+    return wrapper
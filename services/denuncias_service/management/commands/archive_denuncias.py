@@ -0,0 +1,65 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from denuncias_service.archive import archivable, archive_chunk, months_ago
+
+
+class Command(BaseCommand):
+    help = 'Mueve las denuncias resueltas antiguas y su evidencia a las tablas de archivo'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months',
+            type=int,
+            default=12,
+            help='Archivar denuncias resueltas con más de N meses de antigüedad (por defecto: 12)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Denuncias movidas por transacción (por defecto: 1000)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Solo muestra cuántas denuncias se archivarían'
+        )
+
+    def handle(self, *args, **options):
+        if options['months'] < 1:
+            raise CommandError('--months debe ser al menos 1')
+
+        cutoff = months_ago(timezone.now(), options['months'])
+        total = archivable(cutoff).count()
+
+        self.stdout.write(self.style.WARNING(
+            f'\nDenuncias resueltas anteriores a {cutoff:%Y-%m-%d}: {total}'
+        ))
+        if options['dry_run'] or total == 0:
+            return
+
+        moved = 0
+        evidence = 0
+        started = time.monotonic()
+
+        # Cada bloque se confirma por separado: si el comando se interrumpe,
+        # basta con volver a ejecutarlo para continuar donde quedó.
+        while True:
+            chunk_moved, chunk_evidence = archive_chunk(cutoff, options['chunk_size'])
+            if not chunk_moved:
+                break
+            moved += chunk_moved
+            evidence += chunk_evidence
+
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f'  denuncias: {moved}/{total} ({moved / max(elapsed, 0.001):.0f} filas/s, '
+                f'{evidence} evidencias)'
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\nSe archivaron {moved} denuncias y {evidence} evidencias'
+        ))
@@ -0,0 +1,180 @@
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.media import PROTECTED_PREFIXES
+
+REFERENCED_FIELDS = [
+    ('denuncias_service.DenunciaEvidencia', 'file'),
+    ('denuncias_service.DenunciaEvidencia', 'original_file'),
+    ('denuncias_service.ArchivedDenunciaEvidencia', 'file'),
+    ('denuncias_service.ArchivedDenunciaEvidencia', 'original_file'),
+    ('users_service.User', 'avatar'),
+]
+
+
+def iter_media_files(root):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            full_path = os.path.join(dirpath, filename)
+            name = os.path.relpath(full_path, root).replace(os.sep, '/')
+            yield name, full_path
+
+
+def chunked(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def referenced_names(names):
+    found = set()
+    for model_label, field_name in REFERENCED_FIELDS:
+        model = apps.get_model(model_label)
+        found.update(
+            model._base_manager
+            .filter(**{f'{field_name}__in': names})
+            .values_list(field_name, flat=True)
+        )
+    return found
+
+
+class Command(BaseCommand):
+    help = 'Elimina o pone en cuarentena los archivos de MEDIA_ROOT que ya no están referenciados'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Solo muestra el reporte, sin tocar ningún archivo'
+        )
+        parser.add_argument(
+            '--quarantine',
+            metavar='DIR',
+            help='Mueve los huérfanos a DIR en lugar de eliminarlos'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Nombres comparados por consulta (por defecto: 500)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='Hilos usados para eliminar o mover archivos (por defecto: 8)'
+        )
+        parser.add_argument(
+            '--min-age',
+            type=int,
+            default=3600,
+            help='Ignora archivos modificados hace menos de N segundos (por defecto: 3600)'
+        )
+
+    def handle(self, *args, **options):
+        root = os.path.abspath(settings.MEDIA_ROOT)
+        dry_run = options['dry_run']
+        quarantine = options['quarantine']
+        if quarantine:
+            quarantine = os.path.abspath(quarantine)
+            if quarantine == root or quarantine.startswith(root + os.sep):
+                raise CommandError('El directorio de cuarentena no puede estar dentro de MEDIA_ROOT.')
+
+        cutoff = time.time() - options['min_age']
+        scanned = 0
+        orphans = []
+        orphan_bytes = 0
+
+        self.stdout.write(self.style.WARNING(f'Analizando {root}...'))
+        started = time.monotonic()
+
+        for batch in chunked(iter_media_files(root), options['batch_size']):
+            scanned += len(batch)
+            candidates = {}
+            for name, full_path in batch:
+                if any(name.startswith(prefix) for prefix in PROTECTED_PREFIXES):
+                    continue
+                try:
+                    stat = os.stat(full_path)
+                except OSError:
+                    continue
+                if stat.st_mtime > cutoff:
+                    continue
+                candidates[name] = (full_path, stat.st_size)
+
+            if not candidates:
+                continue
+
+            referenced = referenced_names(list(candidates))
+            for name, (full_path, size) in candidates.items():
+                if name not in referenced:
+                    orphans.append((name, full_path))
+                    orphan_bytes += size
+                    if options['verbosity'] >= 2:
+                        self.stdout.write(f'  {name} ({size} bytes)')
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(f'Archivos analizados: {scanned} en {elapsed:.1f}s')
+        self.stdout.write(f'Archivos huérfanos: {len(orphans)} ({orphan_bytes / (1024 * 1024):.2f} MB)')
+
+        if dry_run or not orphans:
+            if dry_run:
+                self.stdout.write(self.style.WARNING('Modo simulación: no se modificó ningún archivo.'))
+            return
+
+        if quarantine:
+            def process(item):
+                name, full_path = item
+                target = os.path.join(quarantine, name)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.move(full_path, target)
+        else:
+            def process(item):
+                os.remove(item[1])
+
+        failed = 0
+        with ThreadPoolExecutor(max_workers=max(options['workers'], 1)) as executor:
+            for item, error in zip(orphans, executor.map(self._safe(process), orphans)):
+                if error:
+                    failed += 1
+                    self.stdout.write(self.style.ERROR(f'  Error procesando {item[0]}: {error}'))
+
+        removed_dirs = self._prune_empty_dirs(root)
+
+        action = f'movidos a {quarantine}' if quarantine else 'eliminados'
+        self.stdout.write(self.style.SUCCESS(
+            f'\n{len(orphans) - failed} archivos {action}, {removed_dirs} directorios vacíos eliminados'
+        ))
+
+    def _safe(self, func):
+        def wrapper(item):
+            try:
+                func(item)
+            except OSError as e:
+                return str(e)
+            return None
+        return wrapper
+
+    def _prune_empty_dirs(self, root):
+        removed = 0
+        for dirpath, dirnames, filenames in os.walk(root, topdown=False):
+            if dirpath == root or filenames:
+                continue
+            try:
+                os.rmdir(dirpath)
+                removed += 1
+            except OSError:
+                pass
+        return removed
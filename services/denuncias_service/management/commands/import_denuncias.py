@@ -0,0 +1,259 @@
+import csv
+import io
+import json
+import os
+import time
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from core.db import explicit_auto_now_add
+from denuncias_service.models import Denuncia, STATUS_CHOICES, TYPE_CHOICES
+from users_service.models import User
+
+FIELDS = ['description', 'district', 'region', 'lat', 'lon', '_type', 'status']
+
+TYPE_ALIASES = {label.lower(): value for value, label in TYPE_CHOICES}
+STATUS_ALIASES = {label.lower(): value for value, label in STATUS_CHOICES}
+
+
+def read_rows(path, fmt):
+    with open(path, encoding='utf-8-sig', newline='') as handle:
+        if fmt == 'csv':
+            for line_number, row in enumerate(csv.DictReader(handle), start=2):
+                yield line_number, row
+        else:
+            for line_number, line in enumerate(handle, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    yield line_number, {'__raw__': line, '__error__': f'JSON inválido: {e}'}
+                    continue
+                if not isinstance(row, dict):
+                    yield line_number, {'__raw__': line, '__error__': 'Cada línea debe ser un objeto JSON.'}
+                    continue
+                yield line_number, row
+
+
+def clean_value(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    return value
+
+
+def clean_dni(value):
+    # En NDJSON el DNI puede venir como número y perder los ceros a la izquierda.
+    value = clean_value(value)
+    if value is None:
+        return None
+    return str(value).strip().zfill(8)
+
+
+def parse_created_at(value):
+    if value is None:
+        return None
+    parsed = parse_datetime(str(value))
+    if parsed is None:
+        date = parse_date(str(value))
+        if date is None:
+            raise ValidationError('Fecha inválida, use ISO 8601 (AAAA-MM-DD o AAAA-MM-DDTHH:MM:SS).')
+        parsed = datetime(date.year, date.month, date.day)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, timezone.get_default_timezone())
+    return parsed
+
+
+def build_denuncia(row, now):
+    if '__error__' in row:
+        return None, {'row': [row['__error__']]}
+
+    values = {field: clean_value(row.get(field)) for field in FIELDS}
+    if values['_type'] is None:
+        values['_type'] = clean_value(row.get('type'))
+    if values['_type']:
+        values['_type'] = TYPE_ALIASES.get(str(values['_type']).lower(), values['_type'])
+    if values['status']:
+        values['status'] = STATUS_ALIASES.get(str(values['status']).lower(), values['status'])
+    else:
+        values['status'] = 'Pending'
+
+    errors = {}
+    try:
+        created_at = parse_created_at(clean_value(row.get('created_at')))
+    except ValidationError as e:
+        errors['created_at'] = e.messages
+        created_at = None
+
+    denuncia = Denuncia(created_at=created_at or now, **values)
+    try:
+        denuncia.clean_fields(exclude=['user', 'created_at', 'updated_at'])
+        denuncia.clean()
+    except ValidationError as e:
+        for field, messages in e.message_dict.items():
+            errors.setdefault(field, []).extend(messages)
+
+    return denuncia, errors
+
+
+class Command(BaseCommand):
+    help = 'Importa denuncias históricas desde un archivo CSV o NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Archivo .csv o .ndjson a importar')
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'ndjson'],
+            default=None,
+            help='Formato del archivo (por defecto se deduce de la extensión)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Filas validadas e insertadas por lote (por defecto: 2000)'
+        )
+        parser.add_argument(
+            '--rejects',
+            default=None,
+            help='Archivo NDJSON para las filas rechazadas (por defecto: <archivo>.rejects.ndjson)'
+        )
+        parser.add_argument(
+            '--no-copy',
+            action='store_true',
+            help='Usar bulk_create incluso en PostgreSQL'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'No existe el archivo {path}')
+
+        fmt = options['format']
+        if fmt is None:
+            fmt = 'csv' if path.lower().endswith('.csv') else 'ndjson'
+
+        rejects_path = options['rejects'] or f'{path}.rejects.ndjson'
+        use_copy = connection.vendor == 'postgresql' and not options['no_copy']
+
+        self.stdout.write(self.style.WARNING(
+            f'Importando {path} ({fmt}, {"COPY" if use_copy else "bulk_create"})...'
+        ))
+
+        started = time.monotonic()
+        imported = 0
+        rejected = 0
+        batch = []
+
+        with open(rejects_path, 'w', encoding='utf-8') as rejects:
+            def flush():
+                nonlocal imported, rejected
+                ok, bad = self.import_batch(batch, use_copy)
+                imported += ok
+                rejected += len(bad)
+                for line_number, row, errors in bad:
+                    rejects.write(json.dumps(
+                        {'line': line_number, 'errors': errors, 'row': row},
+                        ensure_ascii=False,
+                        default=str
+                    ) + '\n')
+                batch.clear()
+
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f'  {imported} importadas, {rejected} rechazadas '
+                    f'({(imported + rejected) / max(elapsed, 0.001):.0f} filas/s)'
+                )
+
+            for line_number, row in read_rows(path, fmt):
+                batch.append((line_number, row))
+                if len(batch) >= options['batch_size']:
+                    flush()
+            if batch:
+                flush()
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'\nSe importaron {imported} denuncias en {elapsed:.1f}s '
+            f'({imported / max(elapsed, 0.001):.0f} filas/s)'
+        ))
+        if rejected:
+            self.stdout.write(self.style.ERROR(f'{rejected} filas rechazadas, ver {rejects_path}'))
+        else:
+            os.remove(rejects_path)
+
+    def import_batch(self, batch, use_copy):
+        now = timezone.now()
+        dnis = {clean_dni(row.get('user_dni')) for _, row in batch} - {None}
+        emails = {str(clean_value(row.get('user_email'))).lower() for _, row in batch if clean_value(row.get('user_email'))}
+
+        by_dni = {}
+        by_email = {}
+        if dnis or emails:
+            users = User.objects.filter(Q(dni__in=dnis) | Q(email__in=emails)).values_list('id', 'dni', 'email')
+            for user_id, dni, email in users:
+                by_dni[dni] = user_id
+                by_email[email.lower()] = user_id
+
+        valid = []
+        rejected = []
+        for line_number, row in batch:
+            denuncia, errors = build_denuncia(row, now)
+
+            dni = clean_dni(row.get('user_dni'))
+            email = clean_value(row.get('user_email'))
+            user_id = by_dni.get(dni) if dni else None
+            if user_id is None and email:
+                user_id = by_email.get(str(email).lower())
+            if user_id is None and '__error__' not in row:
+                errors['user'] = ['No se encontró un usuario con ese DNI o correo.']
+
+            if errors:
+                rejected.append((line_number, row, errors))
+                continue
+
+            denuncia.user_id = user_id
+            valid.append(denuncia)
+
+        if valid:
+            with transaction.atomic(), explicit_auto_now_add(Denuncia, 'created_at'):
+                if use_copy:
+                    self.copy_insert(valid)
+                else:
+                    Denuncia.objects.bulk_create(valid)
+
+        return len(valid), rejected
+
+    def copy_insert(self, objs):
+        fields = [field for field in Denuncia._meta.concrete_fields if not field.primary_key]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for obj in objs:
+            row = []
+            for field in fields:
+                value = field.get_db_prep_save(field.pre_save(obj, True), connection)
+                row.append('' if value is None else value)
+            writer.writerow(row)
+        buffer.seek(0)
+
+        table = connection.ops.quote_name(Denuncia._meta.db_table)
+        columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+        sql = f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)"
+
+        with connection.cursor() as cursor:
+            raw_cursor = cursor.cursor
+            if hasattr(raw_cursor, 'copy'):
+                with raw_cursor.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+            else:
+                raw_cursor.copy_expert(sql, buffer)
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from denuncias_service.models import IdempotencyRecord
+
+
+class Command(BaseCommand):
+    help = 'Borra las respuestas guardadas por Idempotency-Key que ya vencieron'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=5000,
+            help='Registros borrados por consulta (por defecto: 5000)'
+        )
+
+    def handle(self, *args, **options):
+        expired = IdempotencyRecord.objects.filter(expires_at__lte=timezone.now())
+        deleted = 0
+
+        # Por bloques, para no bloquear la tabla mientras las vistas escriben.
+        while True:
+            pks = list(expired.order_by('pk').values_list('pk', flat=True)[:options['chunk_size']])
+            if not pks:
+                break
+            deleted += IdempotencyRecord.objects.filter(pk__in=pks)._raw_delete(IdempotencyRecord.objects.db)
+
+        self.stdout.write(self.style.SUCCESS(f'Se borraron {deleted} claves de idempotencia vencidas'))
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('denuncias_service', '0005_alter_denuncia_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='denunciaevidencia',
+            name='original_file',
+            field=models.FileField(blank=True, max_length=255, null=True, upload_to='denuncias/originales/%Y/%m/%d/'),
+        ),
+        migrations.AddField(
+            model_name='denunciaevidencia',
+            name='original_size',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='denunciaevidencia',
+            name='stored_size',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+    ]
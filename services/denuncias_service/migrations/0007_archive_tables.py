@@ -0,0 +1,75 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:38
+
+import denuncias_service.models
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('denuncias_service', '0006_evidence_original_file_and_sizes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedDenuncia',
+            fields=[
+                ('description', models.TextField(validators=[django.core.validators.RegexValidator(message='La descripción contiene caracteres no permitidos.', regex='^[a-zA-Z0-9áéíóúÁÉÍÓÚñÑüÜ\\s,.;:()\\-¿?¡!""\\\']+$'), django.core.validators.MinLengthValidator(20, message='La descripción debe tener al menos 20 caracteres.'), django.core.validators.MaxLengthValidator(2000, message='La descripción no puede superar los 2000 caracteres.')])),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('district', models.CharField(max_length=100, validators=[django.core.validators.RegexValidator(message='El distrito solo puede contener letras, espacios y guiones.', regex='^[a-zA-ZáéíóúÁÉÍÓÚñÑüÜ\\s\\-]+$'), django.core.validators.MinLengthValidator(2, message='El distrito debe tener al menos 2 caracteres.'), django.core.validators.MaxLengthValidator(100)])),
+                ('region', models.CharField(choices=[('Amazonas', 'Amazonas'), ('Áncash', 'Áncash'), ('Apurímac', 'Apurímac'), ('Arequipa', 'Arequipa'), ('Ayacucho', 'Ayacucho'), ('Cajamarca', 'Cajamarca'), ('Callao', 'Callao'), ('Cusco', 'Cusco'), ('Huancavelica', 'Huancavelica'), ('Huánuco', 'Huánuco'), ('Ica', 'Ica'), ('Junín', 'Junín'), ('La Libertad', 'La Libertad'), ('Lambayeque', 'Lambayeque'), ('Lima', 'Lima'), ('Loreto', 'Loreto'), ('Madre de Dios', 'Madre de Dios'), ('Moquegua', 'Moquegua'), ('Pasco', 'Pasco'), ('Piura', 'Piura'), ('Puno', 'Puno'), ('San Martín', 'San Martín'), ('Tacna', 'Tacna'), ('Tumbes', 'Tumbes'), ('Ucayali', 'Ucayali')], max_length=100)),
+                ('lat', models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True, validators=[denuncias_service.models.validate_latitude])),
+                ('_type', models.CharField(choices=[('accident', 'Accidente de tránsito'), ('theft', 'Robo o hurto'), ('assault', 'Agresión o violencia física'), ('domestic_violence', 'Violencia familiar o de pareja'), ('fraud', 'Estafa o fraude'), ('missing_person', 'Persona desaparecida'), ('vandalism', 'Vandalismo o daños a la propiedad'), ('drug_trafficking', 'Tráfico o consumo de drogas'), ('homicide', 'Homicidio o intento de homicidio'), ('harassment', 'Acoso o amenazas'), ('cybercrime', 'Delito informático'), ('sexual_abuse', 'Abuso o acoso sexual'), ('weapon_possession', 'Tenencia ilegal de armas'), ('public_disturbance', 'Alteración del orden público'), ('child_abuse', 'Maltrato infantil'), ('animal_abuse', 'Maltrato animal'), ('property_dispute', 'Conflicto por propiedad'), ('corruption', 'Corrupción o soborno'), ('kidnapping', 'Secuestro o tentativa'), ('other', 'Otro tipo de denuncia')], max_length=50)),
+                ('lon', models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True, validators=[denuncias_service.models.validate_longitude])),
+                ('status', models.CharField(choices=[('Pending', 'Pending'), ('In Progress', 'In Progress'), ('Resolved', 'Resolved')], default='Pending', max_length=50)),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Denuncia archivada',
+                'verbose_name_plural': 'Denuncias archivadas',
+                'ordering': ['-created_at'],
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedDenunciaEvidencia',
+            fields=[
+                ('file', models.FileField(upload_to='denuncias/evidencias/%Y/%m/%d/', validators=[denuncias_service.models.validate_file_size, denuncias_service.models.validate_file_extension])),
+                ('file_type', models.CharField(choices=[('image', 'Image'), ('video', 'Video')], max_length=10)),
+                ('original_file', models.FileField(blank=True, max_length=255, null=True, upload_to='denuncias/originales/%Y/%m/%d/')),
+                ('original_size', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('stored_size', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('uploaded_at', models.DateTimeField(auto_now_add=True)),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('incident', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='evidence', to='denuncias_service.archiveddenuncia')),
+            ],
+            options={
+                'verbose_name': 'Archived evidence',
+                'verbose_name_plural': 'Archived evidence',
+                'ordering': ['-uploaded_at'],
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedDenunciaStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('status', models.CharField(choices=[('Pending', 'Pending'), ('In Progress', 'In Progress'), ('Resolved', 'Resolved')], max_length=50)),
+                ('_type', models.CharField(choices=[('accident', 'Accidente de tránsito'), ('theft', 'Robo o hurto'), ('assault', 'Agresión o violencia física'), ('domestic_violence', 'Violencia familiar o de pareja'), ('fraud', 'Estafa o fraude'), ('missing_person', 'Persona desaparecida'), ('vandalism', 'Vandalismo o daños a la propiedad'), ('drug_trafficking', 'Tráfico o consumo de drogas'), ('homicide', 'Homicidio o intento de homicidio'), ('harassment', 'Acoso o amenazas'), ('cybercrime', 'Delito informático'), ('sexual_abuse', 'Abuso o acoso sexual'), ('weapon_possession', 'Tenencia ilegal de armas'), ('public_disturbance', 'Alteración del orden público'), ('child_abuse', 'Maltrato infantil'), ('animal_abuse', 'Maltrato animal'), ('property_dispute', 'Conflicto por propiedad'), ('corruption', 'Corrupción o soborno'), ('kidnapping', 'Secuestro o tentativa'), ('other', 'Otro tipo de denuncia')], max_length=50)),
+                ('region', models.CharField(choices=[('Amazonas', 'Amazonas'), ('Áncash', 'Áncash'), ('Apurímac', 'Apurímac'), ('Arequipa', 'Arequipa'), ('Ayacucho', 'Ayacucho'), ('Cajamarca', 'Cajamarca'), ('Callao', 'Callao'), ('Cusco', 'Cusco'), ('Huancavelica', 'Huancavelica'), ('Huánuco', 'Huánuco'), ('Ica', 'Ica'), ('Junín', 'Junín'), ('La Libertad', 'La Libertad'), ('Lambayeque', 'Lambayeque'), ('Lima', 'Lima'), ('Loreto', 'Loreto'), ('Madre de Dios', 'Madre de Dios'), ('Moquegua', 'Moquegua'), ('Pasco', 'Pasco'), ('Piura', 'Piura'), ('Puno', 'Puno'), ('San Martín', 'San Martín'), ('Tacna', 'Tacna'), ('Tumbes', 'Tumbes'), ('Ucayali', 'Ucayali')], max_length=100)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Estadística de archivo',
+                'verbose_name_plural': 'Estadísticas de archivo',
+                'constraints': [models.UniqueConstraint(fields=('month', 'status', '_type', 'region'), name='unique_archived_stats_bucket')],
+            },
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:01
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_updated_at(apps, schema_editor):
+    for name in ('Denuncia', 'ArchivedDenuncia'):
+        apps.get_model('denuncias_service', name).objects.update(updated_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('denuncias_service', '0007_archive_tables'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DenunciaTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('denuncia_id', models.BigIntegerField()),
+                ('user_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Denuncia borrada',
+                'verbose_name_plural': 'Denuncias borradas',
+            },
+        ),
+        migrations.AddField(
+            model_name='archiveddenuncia',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='denuncia',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='denuncia',
+            index=models.Index(fields=['updated_at', 'id'], name='denuncia_changes_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='denuncia',
+            index=models.Index(fields=['user', 'updated_at', 'id'], name='denuncia_user_changes_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='denunciatombstone',
+            index=models.Index(fields=['deleted_at', 'denuncia_id'], name='tombstone_changes_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='denunciatombstone',
+            index=models.Index(fields=['user_id', 'deleted_at', 'denuncia_id'], name='tombstone_user_changes_idx'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.core.validators import RegexValidator, MinLengthValidator, MaxLengthValidator, MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 from core.regions import REGION_CHOICES
 
 STATUS_CHOICES = [
@@ -62,7 +63,7 @@ def validate_file_extension(value):
     if ext not in valid_extensions:
         raise ValidationError(f'Extensión de archivo no permitida. Use: {", ".join(valid_extensions)}')
 
-class Denuncia(models.Model):
+class DenunciaBase(models.Model):
     user = models.ForeignKey('users_service.User', on_delete=models.CASCADE)
     description = models.TextField(
         validators=[
@@ -72,6 +73,7 @@ class Denuncia(models.Model):
         ]
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     district = models.CharField(
         max_length=100,
         validators=[
@@ -107,6 +109,9 @@ class Denuncia(models.Model):
         default='Pending', 
         choices=STATUS_CHOICES
     )
+    # Clave que genera el cliente offline para cada denuncia en cola; evita
+    # duplicados cuando reenvía un lote.
+    client_key = models.CharField(max_length=64, null=True, blank=True)
 
     def __str__(self):
         return self.description[:50]
@@ -123,13 +128,47 @@ class Denuncia(models.Model):
                 raise ValidationError('La descripción contiene palabras demasiado largas. Verifique el texto.')
     
     class Meta:
+        abstract = True
+        ordering = ['-created_at']
+
+
+class Denuncia(DenunciaBase):
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Estado leído de la base: al guardar se compara para publicar el cambio.
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+    
+    class Meta(DenunciaBase.Meta):
         verbose_name = 'Denuncia'
         verbose_name_plural = 'Denuncias'
-        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'client_key'], name='unique_denuncia_client_key')
+        ]
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='denuncia_changes_idx'),
+            models.Index(fields=['user', 'updated_at', 'id'], name='denuncia_user_changes_idx'),
+        ]
 
 
-class DenunciaEvidencia(models.Model):
-    incident = models.ForeignKey(Denuncia, on_delete=models.CASCADE, related_name='evidence')
+# Denuncias borradas, para que el feed de cambios pueda avisar a los clientes
+# que sincronizan. No tiene FK: sobrevive al borrado de la denuncia y del usuario.
+class DenunciaTombstone(models.Model):
+    denuncia_id = models.BigIntegerField()
+    user_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Denuncia borrada'
+        verbose_name_plural = 'Denuncias borradas'
+        indexes = [
+            models.Index(fields=['deleted_at', 'denuncia_id'], name='tombstone_changes_idx'),
+            models.Index(fields=['user_id', 'deleted_at', 'denuncia_id'], name='tombstone_user_changes_idx'),
+        ]
+
+
+class DenunciaEvidenciaBase(models.Model):
     file = models.FileField(
         upload_to='denuncias/evidencias/%Y/%m/%d/',
         validators=[validate_file_size, validate_file_extension]
@@ -138,6 +177,14 @@ class DenunciaEvidencia(models.Model):
         max_length=10, 
         choices=[('image', 'Image'), ('video', 'Video')]
     )
+    original_file = models.FileField(
+        upload_to='denuncias/originales/%Y/%m/%d/',
+        max_length=255,
+        blank=True,
+        null=True
+    )
+    original_size = models.PositiveBigIntegerField(null=True, blank=True)
+    stored_size = models.PositiveBigIntegerField(null=True, blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -158,6 +205,72 @@ class DenunciaEvidencia(models.Model):
                 raise ValidationError(f'El archivo no es un video válido. Use: {", ".join(video_extensions)}')
 
     class Meta:
+        abstract = True
+        ordering = ['-uploaded_at']
+
+
+class DenunciaEvidencia(DenunciaEvidenciaBase):
+    incident = models.ForeignKey(Denuncia, on_delete=models.CASCADE, related_name='evidence')
+
+    class Meta(DenunciaEvidenciaBase.Meta):
         verbose_name = 'Evidence'
         verbose_name_plural = 'Evidence'
-        ordering = ['-uploaded_at']
\ No newline at end of file
+
+
+# Tablas frías: denuncias resueltas antiguas movidas por el comando
+# archive_denuncias. Conservan el mismo id que tenían en la tabla principal.
+class ArchivedDenuncia(DenunciaBase):
+    id = models.BigIntegerField(primary_key=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta(DenunciaBase.Meta):
+        verbose_name = 'Denuncia archivada'
+        verbose_name_plural = 'Denuncias archivadas'
+
+
+class ArchivedDenunciaEvidencia(DenunciaEvidenciaBase):
+    id = models.BigIntegerField(primary_key=True)
+    incident = models.ForeignKey(ArchivedDenuncia, on_delete=models.CASCADE, related_name='evidence')
+
+    class Meta(DenunciaEvidenciaBase.Meta):
+        verbose_name = 'Archived evidence'
+        verbose_name_plural = 'Archived evidence'
+
+
+class ArchivedDenunciaStats(models.Model):
+    month = models.DateField()
+    status = models.CharField(max_length=50, choices=STATUS_CHOICES)
+    _type = models.CharField(max_length=50, choices=TYPE_CHOICES)
+    region = models.CharField(max_length=100, choices=REGION_CHOICES)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Estadística de archivo'
+        verbose_name_plural = 'Estadísticas de archivo'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['month', 'status', '_type', 'region'],
+                name='unique_archived_stats_bucket'
+            )
+        ]
+
+# Respuestas guardadas por Idempotency-Key (denuncias_service.idempotency).
+# Se borran al vencer con el comando purge_idempotency_keys.
+class IdempotencyRecord(models.Model):
+    user = models.ForeignKey('users_service.User', on_delete=models.CASCADE)
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    body = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = 'Clave de idempotencia'
+        verbose_name_plural = 'Claves de idempotencia'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='unique_idempotency_key')
+        ]
+        indexes = [
+            models.Index(fields=['expires_at'], name='idempotency_expires_idx'),
+        ]
@@ -5,7 +5,7 @@ class IsOwnerOrSuperUser(permissions.BasePermission):
         if request.user.is_superuser:
             return True
         
-        return obj.user == request.user
+        return obj.user_id == request.user.id
 
 
 class IsSuperUserOrReadOnly(permissions.BasePermission):
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Denuncia, DenunciaEvidencia
+from .models import Denuncia, DenunciaEvidencia, STATUS_CHOICES
 from users_service.serializers import UserProfileSerializer
 
 
@@ -28,10 +28,10 @@ class DenunciaSerializer(serializers.ModelSerializer):
     class Meta:
         model = Denuncia
         fields = [
-            'id', 'user', 'user_id', 'description', 'created_at',
+            'id', 'user', 'user_id', 'description', 'created_at', 'updated_at',
             'district', 'region', 'lat', 'lon', '_type', 'status', 'evidence'
         ]
-        read_only_fields = ['id', 'created_at', 'user']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'user']
     
     def create(self, validated_data):
         validated_data['user'] = self.context['request'].user
@@ -54,6 +54,21 @@ class DenunciaCreateUpdateSerializer(serializers.ModelSerializer):
         return value
 
 
+class DenunciaBatchItemSerializer(DenunciaCreateUpdateSerializer):
+    client_key = serializers.CharField(max_length=64)
+    
+    class Meta(DenunciaCreateUpdateSerializer.Meta):
+        fields = DenunciaCreateUpdateSerializer.Meta.fields + ['client_key']
+
+
+class DenunciaBatchCreateSerializer(serializers.Serializer):
+    items = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=100
+    )
+
+
 class DenunciaListSerializer(serializers.ModelSerializer):
     avatar = serializers.SerializerMethodField()
     user_email = serializers.EmailField(source='user.email', read_only=True)
@@ -61,20 +76,26 @@ class DenunciaListSerializer(serializers.ModelSerializer):
     user_id = serializers.IntegerField(source='user.id', read_only=True)
     _type_display = serializers.CharField(source='get__type_display', read_only=True)
     evidence_count = serializers.SerializerMethodField()
+    archived = serializers.SerializerMethodField()
     
     class Meta:
         model = Denuncia
         fields = [
-            'id', 'user_email', 'full_name', 'user_id', 'description', 'created_at',
-            'district', 'region', 'lat', 'lon', '_type', '_type_display', 'status', 'evidence_count', 'avatar'
+            'id', 'user_email', 'full_name', 'user_id', 'description', 'created_at', 'updated_at',
+            'district', 'region', 'lat', 'lon', '_type', '_type_display', 'status', 'evidence_count', 'archived', 'avatar'
         ]
     
     def get_full_name(self, obj):
         return obj.user.full_name
     
     def get_evidence_count(self, obj):
+        if hasattr(obj, 'evidence_count'):
+            return obj.evidence_count
         return obj.evidence.count()
     
+    def get_archived(self, obj):
+        return getattr(obj, 'archived', False)
+    
     def get_avatar(self, obj):
         request = self.context.get('request')
         if obj.user.avatar and hasattr(obj.user.avatar, 'url'):
@@ -87,3 +108,30 @@ class DenunciaStatusUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Denuncia
         fields = ['status']
+
+
+class DenunciaBulkStatusSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        max_length=5000
+    )
+    filter = serializers.DictField(required=False)
+    status = serializers.ChoiceField(choices=STATUS_CHOICES)
+    
+    def validate_filter(self, value):
+        allowed = {'status', 'type', 'region', 'search'}
+        unknown = set(value) - allowed
+        if unknown:
+            raise serializers.ValidationError(
+                f"Filtros no soportados: {', '.join(sorted(unknown))}. Use: {', '.join(sorted(allowed))}."
+            )
+        if not value:
+            raise serializers.ValidationError("El filtro no puede estar vacío.")
+        return value
+    
+    def validate(self, data):
+        if ('ids' in data) == ('filter' in data):
+            raise serializers.ValidationError("Debe indicar 'ids' o 'filter', pero no ambos.")
+        return data
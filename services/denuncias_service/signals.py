@@ -0,0 +1,73 @@
+from django.db import transaction
+from django.db.models.signals import post_save, pre_delete
+from django.dispatch import Signal, receiver
+
+from core.events import publish
+from .models import Denuncia, DenunciaTombstone
+
+# Enviada por las vistas que cambian el estado con un UPDATE masivo, que no
+# dispara post_save. Argumentos: ``changes`` (lista de
+# ``(id, user_id, estado_anterior)``) y ``status``.
+denuncias_status_changed = Signal()
+
+# Enviada tras crear denuncias con bulk_create, que tampoco dispara
+# post_save. Argumento: ``denuncias``.
+denuncias_created = Signal()
+
+
+def created_event(denuncia):
+    return {
+        'id': denuncia.id,
+        'user_id': denuncia.user_id,
+        'status': denuncia.status,
+        '_type': denuncia._type,
+        'region': denuncia.region,
+        'district': denuncia.district,
+        'created_at': denuncia.created_at
+    }
+
+
+def status_event(denuncia_id, user_id, status, previous_status):
+    return {
+        'id': denuncia_id,
+        'user_id': user_id,
+        'status': status,
+        'previous_status': previous_status
+    }
+
+
+def publish_on_commit(name, data):
+    transaction.on_commit(lambda: publish(name, data))
+
+
+@receiver(post_save, sender=Denuncia)
+def publish_denuncia_saved(sender, instance, created, **kwargs):
+    if created:
+        publish_on_commit('created', created_event(instance))
+    else:
+        previous_status = getattr(instance, '_loaded_status', None)
+        if previous_status is not None and previous_status != instance.status:
+            publish_on_commit(
+                'status_changed',
+                status_event(instance.id, instance.user_id, instance.status, previous_status)
+            )
+    instance._loaded_status = instance.status
+
+
+@receiver(pre_delete, sender=Denuncia)
+def record_tombstone(sender, instance, **kwargs):
+    # Cubre cualquier borrado por el ORM (API, admin, cascada del usuario);
+    # el archivado no dispara señales porque la denuncia sigue existiendo.
+    DenunciaTombstone.objects.create(denuncia_id=instance.pk, user_id=instance.user_id)
+
+
+@receiver(denuncias_created)
+def publish_bulk_created(sender, denuncias, **kwargs):
+    for denuncia in denuncias:
+        publish_on_commit('created', created_event(denuncia))
+
+
+@receiver(denuncias_status_changed)
+def publish_bulk_status(sender, changes, status, **kwargs):
+    for denuncia_id, user_id, previous_status in changes:
+        publish_on_commit('status_changed', status_event(denuncia_id, user_id, status, previous_status))
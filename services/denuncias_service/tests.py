@@ -1,3 +1,479 @@
-from django.test import TestCase
+import io
+import json
+import os
+import tempfile
+from datetime import timedelta
+from unittest.mock import patch
 
-# Create your tests here.
+import msgpack
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from core.events import get_broker, publish
+from core.testing import QueryBudgetTestCase, image_file
+from core.throttling import local_buckets, tier_slots
+from outbox_service.models import NotificationOutbox
+from users_service.models import User
+from .models import Denuncia, DenunciaEvidencia, DenunciaTombstone, ArchivedDenuncia, IdempotencyRecord
+
+
+class DenunciaQueryBudgetTests(QueryBudgetTestCase):
+    def setUp(self):
+        super().setUp()
+        self.denuncia = Denuncia.objects.filter(user=self.user).first()
+
+    def test_list(self):
+        for user in (self.user, self.superuser):
+            with self.subTest(user=self.role(user)):
+                self.assertQueryBudget('denuncia-list', user, grow=True, page_sizes=[50])
+
+    def test_list_include_archived(self):
+        for user in (self.user, self.superuser):
+            with self.subTest(user=self.role(user)):
+                owned = {} if user.is_superuser else {'user': user}
+                total = Denuncia.objects.filter(**owned).count() + ArchivedDenuncia.objects.filter(**owned).count()
+                response = self.assertQueryBudget(
+                    'denuncia-list', user, data={'include_archived': 'true'},
+                    grow=True, page_sizes=[50], variant='include_archived'
+                )
+                self.assertEqual(response.data['count'], total)
+
+    def test_detail(self):
+        for user in (self.user, self.superuser):
+            with self.subTest(user=self.role(user)):
+                response = self.assertQueryBudget('denuncia-detail', user, kwargs={'pk': self.denuncia.pk})
+                self.assertEqual(len(response.data['evidence']), 2)
+
+    def test_detail_of_other_user_is_forbidden(self):
+        other = Denuncia.objects.filter(user=self.other_user).first()
+        self.assertQueryBudget('denuncia-detail', self.user, kwargs={'pk': other.pk}, status_code=403)
+
+    def test_batch_detail(self):
+        owned = list(Denuncia.objects.filter(user=self.user).values_list('pk', flat=True)[:2])
+        other = Denuncia.objects.filter(user=self.other_user).values_list('pk', flat=True).first()
+        ids = ','.join(str(pk) for pk in owned + [other, 999999])
+        for user in (self.user, self.superuser):
+            with self.subTest(user=self.role(user)):
+                response = self.assertQueryBudget('denuncia-batch-detail', user, data={'ids': ids}, grow=True)
+                visible = owned + [other] if user.is_superuser else owned
+                self.assertEqual(sorted(response.data['results']), sorted(visible))
+                self.assertEqual(len(response.data['results'][owned[0]]['evidence']), 2)
+                self.assertEqual(response.data['not_found'], [pk for pk in owned + [other, 999999] if pk not in visible])
+
+    def test_batch_detail_invalid_ids(self):
+        self.assertQueryBudget(
+            'denuncia-batch-detail', self.user, data={'ids': '1,a'}, status_code=400,
+            variant='invalid'
+        )
+
+    def test_create(self):
+        self.assertQueryBudget('denuncia-create', self.user, method='post', data={
+            'description': 'Robo de celular en la avenida principal',
+            'district': 'Miraflores',
+            'region': 'Lima',
+            'lat': '-12.119180',
+            'lon': '-77.030114',
+            '_type': 'theft',
+        }, format='json', status_code=201)
+
+    def test_batch_create(self):
+        item = {
+            'description': 'Robo de celular en la avenida principal',
+            'district': 'Belén',
+            'region': 'Loreto',
+            '_type': 'theft',
+        }
+        items = [
+            dict(item, client_key='a'),
+            dict(item, client_key='b'),
+            dict(item, client_key='a'),
+            dict(item, client_key='c', _type='desconocido'),
+        ]
+        subscription = get_broker().subscribe()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.assertQueryBudget(
+                'denuncia-batch-create', self.user, method='post', data={'items': items},
+                format='json', status_code=201
+            )
+        self.assertEqual(len(subscription.get(0)), 2)
+        subscription.close()
+        results = response.data['results']
+        self.assertEqual([result['status'] for result in results], ['created', 'created', 'duplicate', 'error'])
+        self.assertEqual(results[2]['id'], results[0]['id'])
+        self.assertIn('_type', results[3]['errors'])
+
+        retry = self.assertQueryBudget(
+            'denuncia-batch-create', self.user, method='post', data={'items': items[:2]},
+            format='json', variant='retry'
+        )
+        self.assertEqual(retry.data['created'], 0)
+        self.assertEqual([result['id'] for result in retry.data['results']], [results[0]['id'], results[1]['id']])
+        self.assertEqual(Denuncia.objects.filter(user=self.user, client_key__isnull=False).count(), 2)
+
+    def test_update(self):
+        self.assertQueryBudget(
+            'denuncia-update', self.user, method='patch', kwargs={'pk': self.denuncia.pk},
+            data={'district': 'San Isidro'}, format='json'
+        )
+
+    def test_delete(self):
+        self.assertQueryBudget('denuncia-delete', self.user, method='delete', kwargs={'pk': self.denuncia.pk})
+        self.assertFalse(Denuncia.objects.filter(pk=self.denuncia.pk).exists())
+
+    def test_status_update(self):
+        self.assertQueryBudget(
+            'denuncia-status-update', self.user, method='patch', kwargs={'pk': self.denuncia.pk},
+            data={'status': 'Resolved'}, format='json', status_code=403
+        )
+        self.assertQueryBudget(
+            'denuncia-status-update', self.superuser, method='patch', kwargs={'pk': self.denuncia.pk},
+            data={'status': 'Resolved'}, format='json'
+        )
+        self.assertEqual(NotificationOutbox.objects.count(), 1)
+
+    def test_bulk_status_update(self):
+        pending = list(Denuncia.objects.filter(status='Pending').values_list('pk', flat=True)[:3])
+        Denuncia.objects.filter(pk=pending[0]).update(status='Resolved')
+        self.assertQueryBudget(
+            'denuncia-status-bulk-update', self.user, method='patch',
+            data={'ids': pending, 'status': 'Resolved'}, format='json', status_code=403
+        )
+        response = self.assertQueryBudget(
+            'denuncia-status-bulk-update', self.superuser, method='patch',
+            data={'ids': pending + [999999], 'status': 'Resolved'}, format='json'
+        )
+        self.assertEqual(response.data['updated'], pending[1:])
+        self.assertEqual(response.data['unchanged'], pending[:1])
+        self.assertEqual(response.data['not_found'], [999999])
+        self.assertEqual(NotificationOutbox.objects.count(), 2)
+
+    def test_bulk_status_update_by_filter(self):
+        # Sin correos: en SQLite bulk_create parte el INSERT del outbox en lotes.
+        with self.settings(NOTIFY_ON_STATUS_CHANGE=False):
+            self.assertQueryBudget(
+                'denuncia-status-bulk-update', self.superuser, method='patch',
+                data={'filter': {'status': 'Pending'}, 'status': 'In Progress'}, format='json',
+                grow=True, variant='silent'
+            )
+        self.assertFalse(Denuncia.objects.filter(status='Pending').exists())
+
+    def test_evidence_upload(self):
+        self.assertQueryBudget(
+            'evidencia-upload', self.user, method='post', kwargs={'pk': self.denuncia.pk},
+            data={'files': [image_file('a.png'), image_file('b.png'), image_file('c.png')]},
+            format='multipart', status_code=201
+        )
+        self.assertEqual(self.denuncia.evidence.count(), 5)
+
+    def test_evidence_delete(self):
+        evidence = DenunciaEvidencia.objects.filter(incident=self.denuncia).first()
+        self.assertQueryBudget('evidencia-delete', self.user, method='delete', kwargs={'pk': evidence.pk})
+
+    def test_stats(self):
+        for user in (self.user, self.superuser):
+            with self.subTest(user=self.role(user)):
+                self.assertQueryBudget('denuncia-stats', user, grow=True)
+
+    def test_heatmap(self):
+        for user in (self.user, self.superuser):
+            with self.subTest(user=self.role(user)):
+                self.assertQueryBudget('denuncia-heatmap', user, grow=True)
+
+    def test_heatmap_msgpack(self):
+        response = self.assertQueryBudget('denuncia-heatmap', self.user)
+        self.client.force_authenticate(self.user)
+        packed = self.client.get(reverse('denuncia-heatmap'), HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(packed['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(packed.content), response.json())
+
+
+class ThrottlingTests(QueryBudgetTestCase):
+    def get_heatmap(self, user):
+        self.client.force_authenticate(user)
+        return self.client.get(reverse('denuncia-heatmap'))
+
+    def assertBucketPerUser(self):
+        self.assertEqual(self.get_heatmap(self.user).status_code, 200)
+        self.assertEqual(self.get_heatmap(self.user).status_code, 200)
+        response = self.get_heatmap(self.user)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '30')
+        self.assertEqual(self.get_heatmap(self.other_user).status_code, 200)
+
+    def test_heatmap_token_bucket(self):
+        with self.settings(THROTTLING={'RATES': {'heatmap': '2/min'}}):
+            self.assertBucketPerUser()
+
+    def test_heatmap_token_bucket_in_memory(self):
+        local_buckets.clear()
+        with self.settings(THROTTLING={'STORAGE': 'local', 'RATES': {'heatmap': '2/min'}}):
+            self.assertBucketPerUser()
+
+    def test_concurrency_limit(self):
+        with self.settings(THROTTLING={'CONCURRENCY': {'heatmap': 1}, 'RETRY_AFTER': 5}):
+            slots = tier_slots('heatmap', 1)
+            self.assertTrue(slots.acquire(blocking=False))
+            try:
+                response = self.get_heatmap(self.user)
+                self.assertEqual(response.status_code, 503)
+                self.assertEqual(response['Retry-After'], '5')
+                self.client.force_authenticate(self.user)
+                self.assertEqual(self.client.get(reverse('denuncia-stats')).status_code, 200)
+            finally:
+                slots.release()
+            self.assertEqual(self.get_heatmap(self.user).status_code, 200)
+            self.assertEqual(self.get_heatmap(self.user).status_code, 200)
+
+    def test_crashing_view_releases_slot(self):
+        with self.settings(THROTTLING={'CONCURRENCY': {'heatmap': 1}}):
+            with patch('denuncias_service.views.heatmap_data', side_effect=RuntimeError), \
+                    patch('denuncias_service.async_views.heatmap_data', side_effect=RuntimeError):
+                for _ in range(2):
+                    with self.assertRaises(RuntimeError):
+                        self.get_heatmap(self.user)
+            self.assertEqual(self.get_heatmap(self.user).status_code, 200)
+
+
+@override_settings(EVENTS={'KEEPALIVE': 0.01, 'MAX_DURATION': 0.05, 'MAX_SUBSCRIBERS': 2})
+class EventStreamTests(QueryBudgetTestCase):
+    def read_stream(self, response):
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        if not response.is_async:
+            return b''.join(response.streaming_content).decode()
+
+        # La vista async (ASYNC_READ_VIEWS) se consume como lo hace el servidor ASGI.
+        async def consume():
+            return b''.join([chunk async for chunk in response.streaming_content])
+        return async_to_sync(consume)().decode()
+
+    def test_stream_is_scoped_to_owner(self):
+        for user in (self.user, self.superuser):
+            with self.subTest(user=self.role(user)):
+                response = self.assertQueryBudget('denuncia-events', user)
+                publish('created', {'id': 1, 'user_id': self.user.pk})
+                publish('created', {'id': 2, 'user_id': self.other_user.pk})
+                content = self.read_stream(response)
+                self.assertIn('"id":1,', content)
+                self.assertEqual('"id":2,' in content, user.is_superuser)
+
+    def test_signals_publish_after_commit(self):
+        subscription = get_broker().subscribe()
+        denuncia = Denuncia.objects.filter(user=self.user, status='Pending').first()
+        self.client.force_authenticate(self.superuser)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(
+                reverse('denuncia-status-update', kwargs={'pk': denuncia.pk}),
+                {'status': 'In Progress'}, format='json'
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(
+                reverse('denuncia-status-bulk-update'),
+                {'ids': [denuncia.pk], 'status': 'Resolved'}, format='json'
+            )
+        events = [(name, data['status'], data['previous_status']) for _, name, data in subscription.get(0)]
+        subscription.close()
+        self.assertEqual(events, [
+            ('status_changed', 'In Progress', 'Pending'),
+            ('status_changed', 'Resolved', 'In Progress'),
+        ])
+
+    def test_last_event_id_replays_missed_events(self):
+        subscription = get_broker().subscribe()
+        for pk in (1, 2, 3):
+            publish('created', {'id': pk, 'user_id': self.user.pk})
+        seen = subscription.get(0)[0][0]
+        subscription.close()
+        response = self.client.get(
+            reverse('denuncia-events'), {'token': Token.objects.create(user=self.user).key},
+            HTTP_LAST_EVENT_ID=str(seen)
+        )
+        content = self.read_stream(response)
+        self.assertNotIn('"id":1,', content)
+        self.assertIn('"id":2,', content)
+        self.assertIn('"id":3,', content)
+
+    def test_subscriber_limit(self):
+        broker = get_broker()
+        subscriptions = [broker.subscribe(), broker.subscribe()]
+        try:
+            self.client.force_authenticate(self.user)
+            response = self.client.get(reverse('denuncia-events'))
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response['Retry-After'], '5')
+        finally:
+            for subscription in subscriptions:
+                subscription.close()
+
+    def test_unstarted_streams_release_subscription(self):
+        broker = get_broker()
+        self.client.force_authenticate(self.user)
+        for _ in range(3):
+            response = self.client.head(reverse('denuncia-events'))
+            self.assertEqual(response.status_code, 200)
+            response.close()
+        self.assertEqual(len(broker._subscribers), 0)
+
+        response = self.client.get(reverse('denuncia-events'))
+        response.close()
+        self.assertEqual(len(broker._subscribers), 0)
+
+
+@override_settings(CHANGE_FEED={'SETTLE_SECONDS': 0, 'PAGE_SIZE': 2})
+class ChangeFeedTests(QueryBudgetTestCase):
+    def sync(self, user, since=None):
+        self.client.force_authenticate(user)
+        updated, deleted = [], []
+        while True:
+            params = {'since': since} if since else {}
+            data = self.client.get(reverse('denuncia-changes'), params).data
+            updated += [denuncia['id'] for denuncia in data['results']]
+            deleted += data['deleted']
+            since = data['next']
+            if not data['has_more']:
+                return updated, deleted, since
+
+    def test_budget(self):
+        for user in (self.user, self.superuser):
+            with self.subTest(user=self.role(user)):
+                self.assertQueryBudget('denuncia-changes', user, grow=True)
+
+    def test_sync_returns_only_deltas(self):
+        owned = list(Denuncia.objects.filter(user=self.user).order_by('pk').values_list('pk', flat=True))
+        updated, deleted, cursor = self.sync(self.user)
+        self.assertEqual(sorted(updated), owned)
+        self.assertEqual(deleted, [])
+        self.assertEqual(self.sync(self.user, cursor)[:2], ([], []))
+        admin_cursor = self.sync(self.superuser)[2]
+
+        self.client.patch(reverse('denuncia-update', kwargs={'pk': owned[0]}), {'district': 'Surco'}, format='json')
+        self.client.delete(reverse('denuncia-delete', kwargs={'pk': owned[1]}))
+        other = Denuncia.objects.filter(user=self.other_user).first()
+        self.client.force_authenticate(self.other_user)
+        self.client.delete(reverse('denuncia-delete', kwargs={'pk': other.pk}))
+
+        self.assertEqual(self.sync(self.user, cursor)[:2], ([owned[0]], [owned[1]]))
+        self.assertEqual(self.sync(self.superuser, admin_cursor)[:2], ([owned[0]], [owned[1], other.pk]))
+
+    def test_orm_deletes_leave_tombstones(self):
+        cursor = self.sync(self.user)[2]
+        pk = Denuncia.objects.filter(user=self.user).order_by('pk').first().pk
+        Denuncia.objects.get(pk=pk).delete()
+        self.assertEqual(self.sync(self.user, cursor)[1], [pk])
+
+        admin_cursor = self.sync(self.superuser)[2]
+        owned = sorted(Denuncia.objects.filter(user=self.other_user).values_list('pk', flat=True))
+        self.other_user.delete()
+        self.assertEqual(sorted(self.sync(self.superuser, admin_cursor)[1]), owned)
+
+    def test_archiving_leaves_no_tombstones(self):
+        self.assertTrue(ArchivedDenuncia.objects.exists())
+        self.assertFalse(DenunciaTombstone.objects.exists())
+
+    def test_recent_changes_wait_to_settle(self):
+        with self.settings(CHANGE_FEED={'SETTLE_SECONDS': 60}):
+            self.assertEqual(self.sync(self.user), ([], [], None))
+
+    def test_negative_page_size(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get(reverse('denuncia-changes'), {'page_size': -5})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_invalid_cursor(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get(reverse('denuncia-changes'), {'since': 'no-es-un-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+
+class IdempotencyTests(QueryBudgetTestCase):
+    payload = {
+        'description': 'Robo de celular en la avenida principal',
+        'district': 'Miraflores',
+        'region': 'Lima',
+        '_type': 'theft',
+    }
+
+    def test_create_replays_stored_response(self):
+        before = Denuncia.objects.count()
+        created = self.assertQueryBudget(
+            'denuncia-create', self.user, method='post', data=self.payload, format='json',
+            status_code=201, variant='idempotent', headers={'Idempotency-Key': 'retry-1'}
+        )
+        replayed = self.assertQueryBudget(
+            'denuncia-create', self.user, method='post', data=self.payload, format='json',
+            status_code=201, variant='replay', headers={'Idempotency-Key': 'retry-1'}
+        )
+        self.assertEqual(replayed['Idempotent-Replayed'], 'true')
+        self.assertEqual(replayed.json(), created.json())
+        self.assertEqual(Denuncia.objects.count(), before + 1)
+
+    def test_key_reused_with_other_payload(self):
+        self.client.force_authenticate(self.user)
+        url = reverse('denuncia-create')
+        self.client.post(url, self.payload, format='json', headers={'Idempotency-Key': 'retry-1'})
+        response = self.client.post(url, dict(self.payload, district='Surco'), format='json', headers={'Idempotency-Key': 'retry-1'})
+        self.assertEqual(response.status_code, 422)
+
+    def test_errors_are_not_stored(self):
+        self.client.force_authenticate(self.user)
+        url = reverse('denuncia-create')
+        response = self.client.post(url, dict(self.payload, _type='x'), format='json', headers={'Idempotency-Key': 'retry-1'})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(IdempotencyRecord.objects.exists())
+
+    def test_request_in_progress(self):
+        IdempotencyRecord.objects.create(
+            user=self.user, key='retry-1', fingerprint='', expires_at=timezone.now() + timedelta(days=1)
+        )
+        self.client.force_authenticate(self.user)
+        response = self.client.post(reverse('denuncia-create'), self.payload, format='json', headers={'Idempotency-Key': 'retry-1'})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response['Retry-After'], '1')
+
+    def test_upload_replay_skips_file_work(self):
+        denuncia = Denuncia.objects.filter(user=self.user).first()
+        url = reverse('evidencia-upload', kwargs={'pk': denuncia.pk})
+        self.client.force_authenticate(self.user)
+        for _ in range(2):
+            response = self.client.post(
+                url, {'files': [image_file('a.png'), image_file('b.png')]},
+                format='multipart', headers={'Idempotency-Key': 'upload-1'}
+            )
+            self.assertEqual(response.status_code, 201)
+        self.assertEqual(response['Idempotent-Replayed'], 'true')
+        self.assertEqual(denuncia.evidence.count(), 4)
+
+    def test_purge_expired_keys(self):
+        now = timezone.now()
+        for key, expires_at in (('old', now - timedelta(seconds=1)), ('new', now + timedelta(days=1))):
+            IdempotencyRecord.objects.create(user=self.user, key=key, fingerprint='', expires_at=expires_at)
+        call_command('purge_idempotency_keys', stdout=io.StringIO())
+        self.assertEqual(list(IdempotencyRecord.objects.values_list('key', flat=True)), ['new'])
+
+
+class ImportTests(QueryBudgetTestCase):
+    def test_numeric_dni_keeps_leading_zeros(self):
+        user = User.objects.create_user(
+            email='cero@example.com', dni='01234567', first_name='Usuario',
+            last_name='Prueba', password='clave-segura-123'
+        )
+        row = {
+            'user_dni': 1234567,
+            'description': 'Robo de celular en el paradero',
+            'district': 'Miraflores',
+            'region': 'Lima',
+            'type': 'theft',
+            'created_at': '2023-05-01',
+        }
+        with tempfile.TemporaryDirectory() as path:
+            source = os.path.join(path, 'denuncias.ndjson')
+            with open(source, 'w', encoding='utf-8') as handle:
+                handle.write(json.dumps(row) + '\n')
+            call_command('import_denuncias', source, stdout=io.StringIO())
+
+        denuncia = Denuncia.objects.get(user=user)
+        self.assertEqual(timezone.localtime(denuncia.created_at).date().isoformat(), '2023-05-01')
@@ -0,0 +1,111 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+
+from core.images import optimize_image
+from .changes import touch
+from .models import DenunciaEvidencia, validate_file_extension, validate_file_size
+
+IMAGE_EXTENSIONS = ['jpg', 'jpeg', 'png', 'gif', 'webp']
+VIDEO_EXTENSIONS = ['mp4', 'avi', 'mov', 'wmv', 'flv', 'webm']
+
+
+def get_file_type(file):
+    file_extension = file.name.split('.')[-1].lower()
+    if file_extension in IMAGE_EXTENSIONS:
+        return 'image'
+    if file_extension in VIDEO_EXTENSIONS:
+        return 'video'
+    return None
+
+
+def validate_evidence_file(file):
+    errors = []
+    for validator in (validate_file_size, validate_file_extension):
+        try:
+            validator(file)
+        except ValidationError as e:
+            errors.extend(e.messages)
+
+    file_type = get_file_type(file)
+    if file_type is None and not errors:
+        errors.append('Formato de archivo no soportado')
+
+    return file_type, errors
+
+
+def _save_to_field(field_name, file):
+    field = DenunciaEvidencia._meta.get_field(field_name)
+    name = field.generate_filename(None, os.path.basename(file.name))
+    return default_storage.save(name, file, max_length=field.max_length)
+
+
+def _store_file(file, file_type):
+    stored = {'original_size': file.size, 'stored_size': file.size, 'original_file': None}
+
+    optimized = None
+    if file_type == 'image':
+        optimized = optimize_image(
+            file,
+            settings.IMAGE_UPLOAD_MAX_DIMENSION,
+            settings.IMAGE_UPLOAD_QUALITY
+        )
+
+    if optimized is None:
+        stored['file'] = _save_to_field('file', file)
+        return stored
+
+    content, stored['original_size'], stored['stored_size'] = optimized
+    stored['file'] = _save_to_field('file', content)
+    if settings.IMAGE_UPLOAD_KEEP_ORIGINAL:
+        try:
+            stored['original_file'] = _save_to_field('original_file', file)
+        except Exception:
+            delete_stored_files([stored['file']])
+            raise
+    return stored
+
+
+def stored_names(stored):
+    return [name for name in (stored['file'], stored['original_file']) if name]
+
+
+def save_evidence_files(denuncia, files):
+    max_workers = min(getattr(settings, 'EVIDENCE_UPLOAD_MAX_WORKERS', 4), len(files)) or 1
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_store_file, file, file_type) for file, file_type in files]
+
+    results = []
+    errors = []
+    for future in futures:
+        try:
+            results.append(future.result())
+        except Exception as e:
+            errors.append(e)
+
+    if errors:
+        delete_stored_files(name for stored in results for name in stored_names(stored))
+        raise errors[0]
+
+    evidences = [
+        DenunciaEvidencia(incident=denuncia, file_type=file_type, **stored)
+        for stored, (_, file_type) in zip(results, files)
+    ]
+    try:
+        evidences = DenunciaEvidencia.objects.bulk_create(evidences)
+        touch(denuncia.pk)
+        return evidences
+    except Exception:
+        delete_stored_files(name for stored in results for name in stored_names(stored))
+        raise
+
+
+def delete_stored_files(names):
+    for name in names:
+        try:
+            default_storage.delete(name)
+        except OSError:
+            pass
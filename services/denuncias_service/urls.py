@@ -1,28 +1,53 @@
+from django.conf import settings
 from django.urls import path
 from .views import (
     DenunciaCreateView,
+    DenunciaBatchCreateView,
     DenunciaListView,
     DenunciaDetailView,
+    DenunciaBatchDetailView,
     DenunciaUpdateView,
     DenunciaDeleteView,
     DenunciaStatusUpdateView,
+    DenunciaBulkStatusUpdateView,
     MyDenunciasStatsView,
+    DenunciaEventsView,
+    DenunciaChangesView,
     DenunciaHeatmapView,
     DenunciaEvidenciaUploadView,
     DenunciaEvidenciaDeleteView
 )
+from .async_views import (
+    DenunciaListAsyncView,
+    DenunciaDetailAsyncView,
+    DenunciaBatchDetailAsyncView,
+    DenunciaHeatmapAsyncView,
+    DenunciaEventsAsyncView
+)
+
+if settings.ASYNC_READ_VIEWS:
+    DenunciaListView = DenunciaListAsyncView
+    DenunciaDetailView = DenunciaDetailAsyncView
+    DenunciaBatchDetailView = DenunciaBatchDetailAsyncView
+    DenunciaHeatmapView = DenunciaHeatmapAsyncView
+    DenunciaEventsView = DenunciaEventsAsyncView
 
 urlpatterns = [
     path('incidents/', DenunciaListView.as_view(), name='denuncia-list'),
     path('incidents/create/', DenunciaCreateView.as_view(), name='denuncia-create'),
+    path('incidents/create/batch/', DenunciaBatchCreateView.as_view(), name='denuncia-batch-create'),
     path('incidents/<int:pk>/', DenunciaDetailView.as_view(), name='denuncia-detail'),
+    path('incidents/batch/', DenunciaBatchDetailView.as_view(), name='denuncia-batch-detail'),
     path('incidents/<int:pk>/update/', DenunciaUpdateView.as_view(), name='denuncia-update'),
     path('incidents/<int:pk>/delete/', DenunciaDeleteView.as_view(), name='denuncia-delete'),
     path('incidents/<int:pk>/status/', DenunciaStatusUpdateView.as_view(), name='denuncia-status-update'),
+    path('incidents/status/bulk/', DenunciaBulkStatusUpdateView.as_view(), name='denuncia-status-bulk-update'),
 
     path('incidents/<int:pk>/evidences/upload/', DenunciaEvidenciaUploadView.as_view(), name='evidencia-upload'),
     path('incidents/evidence/<int:pk>/delete/', DenunciaEvidenciaDeleteView.as_view(), name='evidencia-delete'),
 
     path('incidents/stats/', MyDenunciasStatsView.as_view(), name='denuncia-stats'),
     path('incidents/heatmap/', DenunciaHeatmapView.as_view(), name='denuncia-heatmap'),
+    path('incidents/changes/', DenunciaChangesView.as_view(), name='denuncia-changes'),
+    path('incidents/events/', DenunciaEventsView.as_view(), name='denuncia-events'),
 ]
@@ -1,20 +1,39 @@
+from collections import Counter
 from rest_framework import generics, status
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser
-from django.db.models import Q
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Q, Value, prefetch_related_objects
+from django.utils import timezone
+from auth_service.authentication import CachedTokenAuthentication, QueryParamTokenAuthentication
+from core.events import open_stream
 from core.pagination import CustomPageNumberPagination
-from .models import Denuncia, DenunciaEvidencia
+from core.renderers import EventStreamRenderer, ORJSONRenderer
+from core.routers import ReadReplicaMixin
+from core.throttling import ConcurrencyLimitMixin
+from .signals import denuncias_created, denuncias_status_changed
+from .models import Denuncia, DenunciaEvidencia, ArchivedDenuncia
 from .serializers import (
     DenunciaSerializer,
     DenunciaCreateUpdateSerializer,
     DenunciaListSerializer,
     DenunciaStatusUpdateSerializer,
+    DenunciaBulkStatusSerializer,
+    DenunciaBatchItemSerializer,
+    DenunciaBatchCreateSerializer,
     DenunciaEvidenciaSerializer
 )
 from .permissions import IsOwnerOrSuperUser, IsSuperUserOrReadOnly
+from .uploads import validate_evidence_file, save_evidence_files
+from .archive import archived_counts
+from .changes import change_feed, touch
+from .idempotency import idempotent
 from users_service.permissions import IsSuperUser
+from outbox_service.outbox import enqueue_email, enqueue_emails
 
 class DenunciaCreateView(generics.CreateAPIView):
     serializer_class = DenunciaCreateUpdateSerializer
@@ -23,12 +42,13 @@ class DenunciaCreateView(generics.CreateAPIView):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
     
+    @idempotent
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         self.perform_create(serializer)
         
-        denuncia = Denuncia.objects.get(id=serializer.instance.id)
+        denuncia = Denuncia.objects.select_related('user').prefetch_related('evidence').get(id=serializer.instance.id)
         response_serializer = DenunciaSerializer(denuncia, context={'request': request})
         
         return Response({
@@ -36,53 +56,221 @@ class DenunciaCreateView(generics.CreateAPIView):
             'denuncia': response_serializer.data
         }, status=status.HTTP_201_CREATED)
 
-class DenunciaListView(generics.ListAPIView):
+def create_denuncia_batch(user, items):
+    """Valida cada denuncia del lote y crea las válidas con un solo ``bulk_create``.
+
+    Las claves que el usuario ya envió antes, o que se repiten en el lote,
+    no se vuelven a crear: se informan como ``duplicate`` con el id existente.
+    Devuelve un resultado por item, en el mismo orden.
+    """
+    results = []
+    valid = {}
+    for item in items:
+        serializer = DenunciaBatchItemSerializer(data=item)
+        if not serializer.is_valid():
+            results.append({'client_key': item.get('client_key'), 'status': 'error', 'errors': serializer.errors})
+            continue
+        key = serializer.validated_data['client_key']
+        results.append({'client_key': key, 'status': 'duplicate' if key in valid else 'created'})
+        valid.setdefault(key, serializer.validated_data)
+    
+    with transaction.atomic():
+        ids = dict(
+            Denuncia.objects.filter(user=user, client_key__in=list(valid)).values_list('client_key', 'id')
+        ) if valid else {}
+        denuncias = Denuncia.objects.bulk_create([
+            Denuncia(user=user, **data) for key, data in valid.items() if key not in ids
+        ])
+        if denuncias:
+            denuncias_created.send(sender=Denuncia, denuncias=denuncias)
+    
+    created = {denuncia.client_key: denuncia.pk for denuncia in denuncias}
+    for result in results:
+        key = result['client_key']
+        if result['status'] == 'error':
+            continue
+        if key not in created:
+            result['status'] = 'duplicate'
+        result['id'] = created.get(key) or ids[key]
+    return results, len(denuncias)
+
+
+class DenunciaBatchCreateView(APIView):
+    """Crea varias denuncias en un solo request, para clientes que envían su cola offline.
+
+    Cada item lleva un ``client_key``; reenviar el mismo lote no crea
+    duplicados. Los items inválidos no impiden crear los demás.
+    """
+    
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request):
+        serializer = DenunciaBatchCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data['items']
+        
+        try:
+            results, created = create_denuncia_batch(request.user, items)
+        except IntegrityError:
+            # Otro envío con las mismas claves se confirmó primero; al
+            # repetir, esas denuncias aparecen como duplicadas.
+            results, created = create_denuncia_batch(request.user, items)
+        
+        return Response({
+            'message': f'{created} denuncias creadas',
+            'created': created,
+            'results': results
+        }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+LIST_FIELDS = [
+    'id', 'user_id', 'description', 'created_at', 'updated_at', 'district', 'region',
+    'lat', 'lon', '_type', 'status', 'evidence_count', 'archived'
+]
+
+
+def filter_denuncias(queryset, params):
+    search = params.get('search', None)
+    if search:
+        queryset = queryset.filter(
+            Q(description__icontains=search) |
+            Q(district__icontains=search) |
+            Q(user__first_name__icontains=search) |
+            Q(user__last_name__icontains=search) |
+            Q(user__email__icontains=search)
+        )
+    
+    status_filter = params.get('status', None)
+    if status_filter:
+        queryset = queryset.filter(status=status_filter)
+    
+    type_filter = params.get('type', None)
+    if type_filter:
+        queryset = queryset.filter(_type=type_filter)
+    
+    region_filter = params.get('region', None)
+    if region_filter:
+        queryset = queryset.filter(region__icontains=region_filter)
+    
+    return queryset
+
+
+def denuncia_from_row(row):
+    row = dict(row)
+    evidence_count = row.pop('evidence_count')
+    archived = row.pop('archived')
+    denuncia = Denuncia(**row)
+    denuncia.evidence_count = evidence_count
+    denuncia.archived = archived
+    return denuncia
+
+
+def include_archived(request):
+    return request.query_params.get('include_archived', '').lower() in ('true', '1')
+
+
+def denuncia_list_queryset(request):
+    user = request.user
+    
+    if user.is_superuser:
+        queryset = Denuncia.objects.all()
+    else:
+        queryset = Denuncia.objects.filter(user=user)
+    
+    queryset = filter_denuncias(queryset, request.query_params).annotate(
+        evidence_count=Count('evidence'),
+        archived=Value(False)
+    )
+    
+    if not include_archived(request):
+        return queryset.select_related('user').order_by('-created_at')
+    
+    if user.is_superuser:
+        archived = ArchivedDenuncia.objects.all()
+    else:
+        archived = ArchivedDenuncia.objects.filter(user=user)
+    
+    archived = filter_denuncias(archived, request.query_params).annotate(
+        evidence_count=Count('evidence'),
+        archived=Value(True)
+    )
+    
+    # Ambas tablas comparten ids, así que basta con unir las filas; los
+    # usuarios de la página se cargan después en una sola consulta.
+    return (
+        queryset.order_by().values(*LIST_FIELDS)
+        .union(archived.order_by().values(*LIST_FIELDS), all=True)
+        .order_by('-created_at', '-id')
+    )
+
+
+class DenunciaListView(ReadReplicaMixin, generics.ListAPIView):
     serializer_class = DenunciaListSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = CustomPageNumberPagination
     
     def get_queryset(self):
-        user = self.request.user
-        
-        if user.is_superuser:
-            queryset = Denuncia.objects.all()
-        else:
-            queryset = Denuncia.objects.filter(user=user)
-        
-        queryset = queryset.select_related('user').order_by('-created_at')
-        
-        search = self.request.query_params.get('search', None)
-        if search:
-            queryset = queryset.filter(
-                Q(description__icontains=search) |
-                Q(district__icontains=search) |
-                Q(user__first_name__icontains=search) |
-                Q(user__last_name__icontains=search) |
-                Q(user__email__icontains=search)
-            )
-        
-        status_filter = self.request.query_params.get('status', None)
-        if status_filter:
-            queryset = queryset.filter(status=status_filter)
-        
-        type_filter = self.request.query_params.get('type', None)
-        if type_filter:
-            queryset = queryset.filter(_type=type_filter)
-        
-        region_filter = self.request.query_params.get('region', None)
-        if region_filter:
-            queryset = queryset.filter(region__icontains=region_filter)
-        
-        return queryset
+        return denuncia_list_queryset(self.request)
+    
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is not None and include_archived(self.request):
+            page = [denuncia_from_row(row) for row in page]
+            prefetch_related_objects(page, 'user')
+        return page
 
 class DenunciaDetailView(generics.RetrieveAPIView):
-    queryset = Denuncia.objects.all()
+    queryset = Denuncia.objects.select_related('user').prefetch_related('evidence')
     serializer_class = DenunciaSerializer
     permission_classes = [IsAuthenticated, IsOwnerOrSuperUser]
     lookup_field = 'pk'
 
+BATCH_DETAIL_MAX = 100
+
+
+def batch_ids(request):
+    try:
+        ids = list(dict.fromkeys(int(pk) for pk in request.query_params.get('ids', '').split(',') if pk.strip()))
+    except ValueError:
+        raise ValidationError({'ids': 'Use ids numéricos separados por comas, por ejemplo ?ids=1,2,3.'})
+    if not ids:
+        raise ValidationError({'ids': 'Debe indicar al menos un id.'})
+    if len(ids) > BATCH_DETAIL_MAX:
+        raise ValidationError({'ids': f'No se pueden pedir más de {BATCH_DETAIL_MAX} denuncias a la vez.'})
+    return ids
+
+
+def denuncia_batch_queryset(request, ids):
+    """Las denuncias pedidas que el usuario puede ver, con usuario y evidencia en dos consultas."""
+    queryset = Denuncia.objects.filter(pk__in=ids)
+    if not request.user.is_superuser:
+        queryset = queryset.filter(user=request.user)
+    return queryset.select_related('user').prefetch_related('evidence')
+
+
+def denuncia_batch_response(request, ids, denuncias):
+    data = DenunciaSerializer(denuncias, many=True, context={'request': request}).data
+    results = {denuncia['id']: denuncia for denuncia in data}
+    # Las ajenas se informan igual que las inexistentes para no revelar cuáles existen.
+    return Response({
+        'results': results,
+        'not_found': [pk for pk in ids if pk not in results]
+    })
+
+
+class DenunciaBatchDetailView(ReadReplicaMixin, APIView):
+    """Detalle de varias denuncias por id (``?ids=1,2,3``), indexado por id.
+
+    El permiso de dueño se aplica en la consulta en vez de objeto por objeto.
+    """
+    
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        ids = batch_ids(request)
+        return denuncia_batch_response(request, ids, list(denuncia_batch_queryset(request, ids)))
+
 class DenunciaUpdateView(generics.UpdateAPIView):
-    queryset = Denuncia.objects.all()
+    queryset = Denuncia.objects.select_related('user')
     serializer_class = DenunciaCreateUpdateSerializer
     permission_classes = [IsAuthenticated, IsOwnerOrSuperUser]
     lookup_field = 'pk'
@@ -122,12 +310,29 @@ class DenunciaDeleteView(generics.DestroyAPIView):
             'message': f'Denuncia #{denuncia_id} de tipo "{denuncia_type}" eliminada exitosamente.'
         }, status=status.HTTP_200_OK)
 
+def status_change_email(denuncia):
+    return (
+        denuncia.user.email,
+        f'Tu denuncia #{denuncia.id} cambió de estado',
+        f'Hola {denuncia.user.first_name.title()}, tu denuncia #{denuncia.id} '
+        f'de tipo "{denuncia.get__type_display()}" ahora se encuentra en estado "{denuncia.get_status_display()}".'
+    )
+
+
 class DenunciaStatusUpdateView(generics.UpdateAPIView):
-    queryset = Denuncia.objects.all()
+    queryset = Denuncia.objects.select_related('user')
     serializer_class = DenunciaStatusUpdateSerializer
     permission_classes = [IsAuthenticated, IsSuperUser]
     lookup_field = 'pk'
     
+    def perform_update(self, serializer):
+        previous_status = serializer.instance.status
+        with transaction.atomic():
+            instance = serializer.save()
+            if settings.NOTIFY_ON_STATUS_CHANGE and instance.status != previous_status:
+                enqueue_email(*status_change_email(instance))
+    
+    @idempotent
     def update(self, request, *args, **kwargs):
         instance = self.get_object()
         serializer = self.get_serializer(instance, data=request.data, partial=True)
@@ -141,150 +346,286 @@ class DenunciaStatusUpdateView(generics.UpdateAPIView):
             'denuncia': response_serializer.data
         })
 
-class MyDenunciasStatsView(APIView):
-    permission_classes = [IsAuthenticated]
+BULK_STATUS_MAX = 5000
+
+
+class DenunciaBulkStatusUpdateView(APIView):
+    permission_classes = [IsAuthenticated, IsSuperUser]
     
-    def get(self, request):
-        user = request.user
+    def patch(self, request):
+        serializer = DenunciaBulkStatusSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
         
-        if user.is_superuser:
-            queryset = Denuncia.objects.all()
+        data = serializer.validated_data
+        new_status = data['status']
+        if 'ids' in data:
+            queryset = Denuncia.objects.filter(pk__in=data['ids'])
         else:
-            queryset = Denuncia.objects.filter(user=user)
+            queryset = filter_denuncias(Denuncia.objects.all(), data['filter'])
         
-        total = queryset.count()
-        pending = queryset.filter(status='Pending').count()
-        in_progress = queryset.filter(status='In Progress').count()
-        resolved = queryset.filter(status='Resolved').count()
+        with transaction.atomic():
+            # Una sola lectura trae el estado actual y lo necesario para los
+            # correos; la actualización es un único UPDATE sobre los ids que cambian.
+            denuncias = list(
+                queryset
+                .select_for_update(of=('self',))
+                .select_related('user')
+                .only('id', 'status', '_type', 'user__email', 'user__first_name')
+                .order_by('pk')[:BULK_STATUS_MAX + 1]
+            )
+            if len(denuncias) > BULK_STATUS_MAX:
+                return Response({
+                    'error': f'El filtro abarca más de {BULK_STATUS_MAX} denuncias. Use un filtro más específico.'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            changed = [denuncia for denuncia in denuncias if denuncia.status != new_status]
+            updated = [denuncia.pk for denuncia in changed]
+            unchanged = [denuncia.pk for denuncia in denuncias if denuncia.status == new_status]
+            if changed:
+                Denuncia.objects.filter(pk__in=updated).update(status=new_status, updated_at=timezone.now())
+                denuncias_status_changed.send(
+                    sender=Denuncia,
+                    changes=[(denuncia.pk, denuncia.user_id, denuncia.status) for denuncia in changed],
+                    status=new_status
+                )
+                if settings.NOTIFY_ON_STATUS_CHANGE:
+                    for denuncia in changed:
+                        denuncia.status = new_status
+                    enqueue_emails(status_change_email(denuncia) for denuncia in changed)
         
-        types_count = {}
-        for choice in queryset.values_list('_type', flat=True).distinct():
-            types_count[choice] = queryset.filter(_type=choice).count()
+        found = {denuncia.pk for denuncia in denuncias}
+        not_found = [pk for pk in dict.fromkeys(data.get('ids', [])) if pk not in found]
         
         return Response({
-            'total_denuncias': total,
-            'por_estado': {
-                'pending': pending,
-                'in_progress': in_progress,
-                'resolved': resolved
-            },
-            'por_tipo': types_count
+            'message': f'{len(updated)} denuncias actualizadas a "{new_status}"',
+            'status': new_status,
+            'updated': updated,
+            'unchanged': unchanged,
+            'not_found': not_found
+        }, status=status.HTTP_200_OK)
+
+class DenunciaChangesView(APIView):
+    """Feed de cambios para clientes que sincronizan sin conexión.
+
+    Devuelve las denuncias creadas o modificadas y los ids borrados después
+    del cursor ``since``, en orden de confirmación. El cliente guarda ``next``
+    y lo manda en la siguiente llamada; sin ``since`` empieza desde el principio.
+    """
+    
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        try:
+            page_size = int(request.query_params.get('page_size', 0)) or None
+        except ValueError:
+            page_size = None
+        
+        updated, deleted, cursor, has_more = change_feed(
+            request.user, request.query_params.get('since'), page_size
+        )
+        
+        return Response({
+            'results': DenunciaListSerializer(updated, many=True, context={'request': request}).data,
+            'deleted': deleted,
+            'next': cursor,
+            'has_more': has_more
         })
 
-class DenunciaHeatmapView(APIView):
+def denuncia_event_filter(user):
+    if user.is_superuser:
+        return lambda data: True
+    return lambda data: data['user_id'] == user.pk
+
+
+class DenunciaEventsView(APIView):
+    """Stream SSE de denuncias creadas y cambios de estado.
+
+    Reemplaza el sondeo de la lista y del tablero: cada usuario recibe solo
+    los eventos de sus denuncias y los superusuarios, todos. Acepta el token
+    en ``?token=`` porque ``EventSource`` no puede enviar headers.
+    """
+    
+    authentication_classes = [CachedTokenAuthentication, QueryParamTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    renderer_classes = [EventStreamRenderer, ORJSONRenderer]
+    
+    def get(self, request):
+        return open_stream(request, denuncia_event_filter(request.user))
+
+class MyDenunciasStatsView(ConcurrencyLimitMixin, ReadReplicaMixin, APIView):
+    permission_classes = [IsAuthenticated]
+    cost_tier = 'stats'
     
     def get(self, request):
         user = request.user
+        
         if user.is_superuser:
             queryset = Denuncia.objects.all()
         else:
             queryset = Denuncia.objects.filter(user=user)
         
-        queryset = queryset.filter(
-            lat__isnull=False,
-            lon__isnull=False
-        ).exclude(
-            lat=0,
-            lon=0
-        )
-        
-        status_filter = self.request.query_params.get('status', None)
-        if status_filter:
-            queryset = queryset.filter(status=status_filter)
-        
-        type_filter = self.request.query_params.get('type', None)
-        if type_filter:
-            queryset = queryset.filter(_type=type_filter)
-        
-        region_filter = self.request.query_params.get('region', None)
-        if region_filter:
-            queryset = queryset.filter(region__icontains=region_filter)
+        # Las denuncias archivadas siguen contando en los totales históricos.
+        archive_user = None if user.is_superuser else user
+        status_counts = Counter(dict(queryset.order_by().values_list('status').annotate(n=Count('id'))))
+        status_counts.update(archived_counts('status', archive_user))
+        types_count = Counter(dict(queryset.order_by().values_list('_type').annotate(n=Count('id'))))
+        types_count.update(archived_counts('_type', archive_user))
         
-        all_denuncias = list(queryset)
-        denuncias = []
-        
-        proximity_radius = 0.01
+        return Response({
+            'total_denuncias': sum(status_counts.values()),
+            'por_estado': {
+                'pending': status_counts['Pending'],
+                'in_progress': status_counts['In Progress'],
+                'resolved': status_counts['Resolved']
+            },
+            'por_tipo': dict(types_count)
+        })
+
+def heatmap_queryset(request):
+    user = request.user
+    if user.is_superuser:
+        queryset = Denuncia.objects.all()
+    else:
+        queryset = Denuncia.objects.filter(user=user)
+    
+    queryset = queryset.filter(
+        lat__isnull=False,
+        lon__isnull=False
+    ).exclude(
+        lat=0,
+        lon=0
+    )
+    
+    status_filter = request.query_params.get('status', None)
+    if status_filter:
+        queryset = queryset.filter(status=status_filter)
+    
+    type_filter = request.query_params.get('type', None)
+    if type_filter:
+        queryset = queryset.filter(_type=type_filter)
+    
+    region_filter = request.query_params.get('region', None)
+    if region_filter:
+        queryset = queryset.filter(region__icontains=region_filter)
+    
+    return queryset
+
+
+def heatmap_data(all_denuncias):
+    denuncias = []
+    
+    proximity_radius = 0.01
+    
+    for denuncia in all_denuncias:
+        lon = float(denuncia.lon)
+        lat = float(denuncia.lat)
         
-        for denuncia in all_denuncias:
-            lon = float(denuncia.lon)
-            lat = float(denuncia.lat)
+        peso = 1.0
+        for other in all_denuncias:
+            if other.id != denuncia.id:
+                other_lon = float(other.lon)
+                other_lat = float(other.lat)
             
-            peso = 1.0
-            for other in all_denuncias:
-                if other.id != denuncia.id:
-                    other_lon = float(other.lon)
-                    other_lat = float(other.lat)
+                dist_lon = abs(lon - other_lon)
+                dist_lat = abs(lat - other_lat)
                 
-                    dist_lon = abs(lon - other_lon)
-                    dist_lat = abs(lat - other_lat)
-                    
-                    if dist_lon <= proximity_radius and dist_lat <= proximity_radius:
-                        distance = (dist_lon ** 2 + dist_lat ** 2) ** 0.5
-                        if distance < proximity_radius:
-                            peso += (1 - (distance / proximity_radius)) * 0.5
-            
-            denuncias.append({
-                'lon': lon,
-                'lat': lat,
-                'peso': round(peso, 2),
-                'id': denuncia.id,
-                'type': denuncia._type,
-                'type_display': denuncia.get__type_display(),
-                'status': denuncia.status,
-                'region': denuncia.region,
-                'district': denuncia.district,
-                'created_at': denuncia.created_at.isoformat()
-            })
+                if dist_lon <= proximity_radius and dist_lat <= proximity_radius:
+                    distance = (dist_lon ** 2 + dist_lat ** 2) ** 0.5
+                    if distance < proximity_radius:
+                        peso += (1 - (distance / proximity_radius)) * 0.5
         
-        if denuncias:
-            avg_lon = sum(d['lon'] for d in denuncias) / len(denuncias)
-            avg_lat = sum(d['lat'] for d in denuncias) / len(denuncias)
-            center = {'lon': avg_lon, 'lat': avg_lat}
-        else:
-            center = {'lon': -75.0152, 'lat': -9.1899}
-        
-        return Response({
-            'denuncias': denuncias,
-            'total': len(denuncias),
-            'center': center
+        denuncias.append({
+            'lon': lon,
+            'lat': lat,
+            'peso': round(peso, 2),
+            'id': denuncia.id,
+            'type': denuncia._type,
+            'type_display': denuncia.get__type_display(),
+            'status': denuncia.status,
+            'region': denuncia.region,
+            'district': denuncia.district,
+            'created_at': denuncia.created_at.isoformat()
         })
+    
+    if denuncias:
+        avg_lon = sum(d['lon'] for d in denuncias) / len(denuncias)
+        avg_lat = sum(d['lat'] for d in denuncias) / len(denuncias)
+        center = {'lon': avg_lon, 'lat': avg_lat}
+    else:
+        center = {'lon': -75.0152, 'lat': -9.1899}
+    
+    return {
+        'denuncias': denuncias,
+        'total': len(denuncias),
+        'center': center
+    }
 
 
-class DenunciaEvidenciaUploadView(APIView):
+class DenunciaHeatmapView(ConcurrencyLimitMixin, ReadReplicaMixin, APIView):
+    permission_classes = [IsAuthenticated]
+    cost_tier = 'heatmap'
+    
+    def get(self, request):
+        return Response(heatmap_data(list(heatmap_queryset(request))))
+
+
+class DenunciaEvidenciaUploadView(ConcurrencyLimitMixin, APIView):
     permission_classes = [IsAuthenticated, IsOwnerOrSuperUser]
     parser_classes = [MultiPartParser, FormParser]
+    cost_tier = 'upload'
     
+    @idempotent
     def post(self, request, pk):
         try:
             denuncia = Denuncia.objects.get(pk=pk)
             self.check_object_permissions(request, denuncia)
             
-            file = request.FILES.get('file')
-            if not file:
+            files = request.FILES.getlist('files')
+            single = not files
+            if single:
+                files = request.FILES.getlist('file')[:1]
+            if not files:
                 return Response({'error': 'No se proporcionó ningún archivo'}, status=status.HTTP_400_BAD_REQUEST)
             
-            file_extension = file.name.split('.')[-1].lower()
-            image_extensions = ['jpg', 'jpeg', 'png', 'gif', 'webp']
-            video_extensions = ['mp4', 'avi', 'mov', 'wmv', 'flv', 'webm']
+            max_files = settings.EVIDENCE_UPLOAD_MAX_FILES
+            if len(files) > max_files:
+                return Response({
+                    'error': f'No se pueden subir más de {max_files} archivos por solicitud'
+                }, status=status.HTTP_400_BAD_REQUEST)
             
-            if file_extension in image_extensions:
-                file_type = 'image'
-            elif file_extension in video_extensions:
-                file_type = 'video'
-            else:
-                return Response({'error': 'Formato de archivo no soportado'}, status=status.HTTP_400_BAD_REQUEST)
+            validated = []
+            results = []
+            for file in files:
+                file_type, errors = validate_evidence_file(file)
+                validated.append((file, file_type))
+                results.append({'name': file.name, 'status': 'error' if errors else 'valid', 'errors': errors})
             
-            evidence = DenunciaEvidencia.objects.create(
-                incident=denuncia,
-                file=file,
-                file_type=file_type
-            )
+            if any(result['errors'] for result in results):
+                if single:
+                    return Response({'error': results[0]['errors'][0]}, status=status.HTTP_400_BAD_REQUEST)
+                for result in results:
+                    if result['status'] == 'valid':
+                        result['status'] = 'skipped'
+                return Response({
+                    'error': 'Uno o más archivos no son válidos. No se subió ninguna evidencia.',
+                    'results': results
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            evidences = save_evidence_files(denuncia, validated)
+            serializer = DenunciaEvidenciaSerializer(evidences, many=True, context={'request': request})
+            
+            if single:
+                return Response({
+                    'message': 'Evidencia subida exitosamente',
+                    'evidence': serializer.data[0]
+                }, status=status.HTTP_201_CREATED)
             
-            serializer = DenunciaEvidenciaSerializer(evidence, context={'request': request})
             return Response({
-                'message': 'Evidencia subida exitosamente',
-                'evidence': serializer.data
+                'message': f'{len(evidences)} evidencias subidas exitosamente',
+                'results': [
+                    {'name': file.name, 'status': 'created', 'evidence': data}
+                    for (file, _), data in zip(validated, serializer.data)
+                ]
             }, status=status.HTTP_201_CREATED)
             
         except Denuncia.DoesNotExist:
@@ -303,8 +644,11 @@ class DenunciaEvidenciaDeleteView(generics.DestroyAPIView):
     
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
-        instance.file.delete() 
+        instance.file.delete(save=False)
+        if instance.original_file:
+            instance.original_file.delete(save=False)
         self.perform_destroy(instance)
+        touch(instance.incident_id)
         
         return Response({
             'message': 'Evidencia eliminada exitosamente'
@@ -1,6 +1,7 @@
 import { Controller, Get, Post, Body } from '@nestjs/common';
 import { AppService } from './app.service';
 import { SendEmailDto } from './dto/send-email.dto';
+import { SendEmailBatchDto } from './dto/send-email-batch.dto';
 
 @Controller()
 export class AppController {
@@ -10,4 +11,9 @@ export class AppController {
   async sendEmail(@Body() sendEmailDto: SendEmailDto) {
     return await this.appService.sendEmail(sendEmailDto);
   }
+
+  @Post('send-email/batch')
+  async sendEmailBatch(@Body() sendEmailBatchDto: SendEmailBatchDto) {
+    return await this.appService.sendEmailBatch(sendEmailBatchDto);
+  }
 }
@@ -1,6 +1,7 @@
 import { Injectable } from '@nestjs/common';
 import * as nodemailer from 'nodemailer';
 import { SendEmailDto } from './dto/send-email.dto';
+import { SendEmailBatchDto } from './dto/send-email-batch.dto';
 import 'dotenv/config';
 
 @Injectable()
@@ -36,4 +37,20 @@ export class AppService {
       messageId: info.messageId,
     };
   }
+
+  async sendEmailBatch(sendEmailBatchDto: SendEmailBatchDto) {
+    const results = await Promise.all(
+      (sendEmailBatchDto.messages || []).map(async (message) => {
+        try {
+          return await this.sendEmail(message);
+        } catch (error) {
+          return {
+            success: false,
+            error: error instanceof Error ? error.message : String(error),
+          };
+        }
+      }),
+    );
+    return { results };
+  }
 }
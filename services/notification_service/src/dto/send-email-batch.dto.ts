@@ -0,0 +1,5 @@
+import { SendEmailDto } from './send-email.dto';
+
+export class SendEmailBatchDto {
+  messages: SendEmailDto[];
+}
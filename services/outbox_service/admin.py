@@ -0,0 +1,11 @@
+from django.contrib import admin
+from .models import NotificationOutbox
+
+
+class NotificationOutboxAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'attempts', 'created_at', 'sent_at')
+    list_filter = ('status', 'kind')
+    readonly_fields = ('created_at', 'sent_at', 'claimed_at')
+
+
+admin.site.register(NotificationOutbox, NotificationOutboxAdmin)
@@ -0,0 +1,249 @@
+import asyncio
+import logging
+import uuid
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from core.metrics import observe_outbound
+from .models import NotificationOutbox
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+# Mensajes entregados por LocmemTransport, al estilo de django.core.mail.outbox.
+outbox = []
+
+
+def _settings():
+    defaults = {
+        'URL': 'http://notification_service:3001',
+        'BACKEND': 'outbox_service.dispatcher.HTTPTransport',
+        'CONNECT_TIMEOUT': 3.05,
+        'READ_TIMEOUT': 10,
+        'RETRIES': 2,
+        'POOL_SIZE': 10,
+        'BATCH_SIZE': 50,
+        'USE_BATCH_ENDPOINT': True,
+        'MAX_ATTEMPTS': 5,
+        'RETRY_DELAY': 30,
+        'CLAIM_TIMEOUT': 300,
+    }
+    defaults.update(getattr(settings, 'NOTIFICATION_SERVICE', {}))
+    return defaults
+
+
+def batch_errors(data, expected):
+    if len(data['results']) != expected:
+        raise ValueError(
+            f'El endpoint de lote devolvió {len(data["results"])} resultados para {expected} mensajes.'
+        )
+    return [
+        None if result.get('success') else result.get('error', 'Error desconocido')
+        for result in data['results']
+    ]
+
+
+class HTTPTransport:
+    """Envía los mensajes al notification_service reutilizando conexiones."""
+
+    def __init__(self, options):
+        self.base_url = options['URL'].rstrip('/')
+        self.timeout = (options['CONNECT_TIMEOUT'], options['READ_TIMEOUT'])
+        self.use_batch_endpoint = options['USE_BATCH_ENDPOINT']
+
+        # Solo se reintentan fallos de conexión: un POST con respuesta 5xx pudo
+        # haber enviado el correo, y los reintentos los maneja el outbox.
+        retry = Retry(
+            total=options['RETRIES'],
+            backoff_factor=0.5,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=options['POOL_SIZE'],
+            max_retries=retry
+        )
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def send(self, payloads):
+        if self.use_batch_endpoint and len(payloads) > 1:
+            with observe_outbound('notification'):
+                response = self.session.post(
+                    f'{self.base_url}/send-email/batch',
+                    json={'messages': payloads},
+                    timeout=self.timeout
+                )
+                response.raise_for_status()
+            return batch_errors(response.json(), len(payloads))
+
+        errors = []
+        for payload in payloads:
+            try:
+                with observe_outbound('notification'):
+                    response = self.session.post(
+                        f'{self.base_url}/send-email',
+                        json=payload,
+                        timeout=self.timeout
+                    )
+                    response.raise_for_status()
+                errors.append(None)
+            except requests.RequestException as e:
+                errors.append(str(e))
+        return errors
+
+
+class AsyncHTTPTransport:
+    """Como HTTPTransport, pero con httpx: sin endpoint de lote, los mensajes
+    se envían en paralelo (hasta POOL_SIZE conexiones) en lugar de uno a uno."""
+
+    def __init__(self, options):
+        if httpx is None:
+            raise ImproperlyConfigured('AsyncHTTPTransport requiere el paquete httpx.')
+        self.base_url = options['URL'].rstrip('/')
+        self.timeout = httpx.Timeout(options['READ_TIMEOUT'], connect=options['CONNECT_TIMEOUT'])
+        self.pool_size = options['POOL_SIZE']
+        self.retries = options['RETRIES']
+        self.use_batch_endpoint = options['USE_BATCH_ENDPOINT']
+
+    def send(self, payloads):
+        return asyncio.run(self.asend(payloads))
+
+    async def asend(self, payloads):
+        transport = httpx.AsyncHTTPTransport(
+            retries=self.retries,
+            limits=httpx.Limits(max_connections=self.pool_size)
+        )
+        async with httpx.AsyncClient(timeout=self.timeout, transport=transport) as client:
+            if self.use_batch_endpoint and len(payloads) > 1:
+                with observe_outbound('notification'):
+                    response = await client.post(f'{self.base_url}/send-email/batch', json={'messages': payloads})
+                    response.raise_for_status()
+                return batch_errors(response.json(), len(payloads))
+
+            return await asyncio.gather(*(self.post(client, payload) for payload in payloads))
+
+    async def post(self, client, payload):
+        try:
+            with observe_outbound('notification'):
+                response = await client.post(f'{self.base_url}/send-email', json=payload)
+                response.raise_for_status()
+        except httpx.HTTPError as e:
+            return str(e)
+        return None
+
+
+class LocmemTransport:
+    """Stub del notification_service para pruebas: guarda los mensajes en ``outbox``."""
+
+    def __init__(self, options):
+        pass
+
+    def send(self, payloads):
+        outbox.extend(payloads)
+        return [None] * len(payloads)
+
+
+_transport = None
+_transport_options = None
+
+
+def get_transport():
+    global _transport, _transport_options
+    options = _settings()
+    if _transport is None or options != _transport_options:
+        _transport = import_string(options['BACKEND'])(options)
+        _transport_options = options
+    return _transport
+
+
+def claim_batch(batch_size, options):
+    now = timezone.now()
+    stale = now - timedelta(seconds=options['CLAIM_TIMEOUT'])
+    claimable = (
+        Q(status='pending', available_at__lte=now) |
+        Q(status='sending', claimed_at__lt=stale)
+    )
+
+    ids = list(
+        NotificationOutbox.objects
+        .filter(claimable)
+        .order_by('id')
+        .values_list('id', flat=True)[:batch_size]
+    )
+    if not ids:
+        return []
+
+    # Otro dispatcher puede haber tomado parte de las filas entre el SELECT y
+    # el UPDATE; el claim_token identifica las que son nuestras.
+    claim_token = uuid.uuid4()
+    NotificationOutbox.objects.filter(claimable, id__in=ids).update(
+        status='sending',
+        claimed_at=now,
+        claim_token=claim_token
+    )
+    return list(NotificationOutbox.objects.filter(claim_token=claim_token, status='sending'))
+
+
+def dispatch_pending(batch_size=None):
+    options = _settings()
+    batch = claim_batch(batch_size or options['BATCH_SIZE'], options)
+    if not batch:
+        return 0, 0
+
+    transport = get_transport()
+    payloads = [item.payload for item in batch]
+    try:
+        errors = transport.send(payloads)
+    except Exception as e:
+        logger.warning('Error enviando %d notificaciones: %s', len(batch), e)
+        errors = [str(e)] * len(batch)
+    if len(errors) != len(batch):
+        logger.warning('El transporte devolvió %d resultados para %d notificaciones', len(errors), len(batch))
+        errors = ['Respuesta incompleta del transporte'] * len(batch)
+
+    now = timezone.now()
+    sent_ids = []
+    failed = []
+    for item, error in zip(batch, errors):
+        if error is None:
+            sent_ids.append(item.id)
+            continue
+        item.attempts += 1
+        item.last_error = error[:1000]
+        item.claimed_at = None
+        item.claim_token = None
+        if item.attempts >= options['MAX_ATTEMPTS']:
+            item.status = 'failed'
+        else:
+            item.status = 'pending'
+            item.available_at = now + timedelta(seconds=options['RETRY_DELAY'] * 2 ** (item.attempts - 1))
+        failed.append(item)
+
+    if sent_ids:
+        NotificationOutbox.objects.filter(id__in=sent_ids).update(
+            status='sent',
+            sent_at=now,
+            claimed_at=None,
+            claim_token=None,
+            last_error=''
+        )
+    if failed:
+        NotificationOutbox.objects.bulk_update(
+            failed,
+            ['attempts', 'last_error', 'claimed_at', 'claim_token', 'status', 'available_at']
+        )
+
+    return len(sent_ids), len(failed)
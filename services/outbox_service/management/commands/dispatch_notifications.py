@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from outbox_service.dispatcher import dispatch_pending
+
+
+class Command(BaseCommand):
+    help = 'Envía las notificaciones pendientes del outbox al notification_service'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Notificaciones por lote (por defecto: NOTIFICATION_SERVICE["BATCH_SIZE"])'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Sigue drenando el outbox indefinidamente'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2.0,
+            help='Segundos de espera cuando el outbox está vacío (por defecto: 2)'
+        )
+
+    def handle(self, *args, **options):
+        total_sent = 0
+        total_failed = 0
+
+        while True:
+            sent, failed = dispatch_pending(options['batch_size'])
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                self.stdout.write(f'Enviadas {sent}, fallidas {failed}')
+                continue
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\nNotificaciones enviadas: {total_sent}, con error: {total_failed}'
+        ))
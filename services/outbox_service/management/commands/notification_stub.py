@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from outbox_service.stub import make_stub_server
+
+
+class Command(BaseCommand):
+    help = 'Levanta un stub local del notification_service que acepta y descarta los correos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=3001)
+
+    def handle(self, *args, **options):
+        server = make_stub_server(options['host'], options['port'], verbose=True)
+        self.stdout.write(self.style.SUCCESS(
+            f'Stub del notification_service escuchando en http://{options["host"]}:{options["port"]}'
+        ))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,37 @@
+from django.db import models
+from django.utils import timezone
+
+OUTBOX_STATUS_CHOICES = [
+    ('pending', 'Pendiente'),
+    ('sending', 'Enviando'),
+    ('sent', 'Enviado'),
+    ('failed', 'Fallido'),
+]
+
+OUTBOX_KIND_CHOICES = [
+    ('email', 'Correo electrónico'),
+]
+
+
+class NotificationOutbox(models.Model):
+    kind = models.CharField(max_length=20, choices=OUTBOX_KIND_CHOICES, default='email')
+    payload = models.JSONField()
+    status = models.CharField(max_length=10, choices=OUTBOX_STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    claim_token = models.UUIDField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default='')
+
+    def __str__(self):
+        return f"{self.kind} #{self.id} ({self.status})"
+
+    class Meta:
+        verbose_name = 'Notificación pendiente'
+        verbose_name_plural = 'Notificaciones pendientes'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='outbox_status_available_idx'),
+        ]
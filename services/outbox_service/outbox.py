@@ -0,0 +1,19 @@
+from .models import NotificationOutbox
+
+
+def email_payload(email, subject, message):
+    return {'email': email, 'subject': subject, 'message': message}
+
+
+def enqueue_email(email, subject, message):
+    return NotificationOutbox.objects.create(
+        kind='email',
+        payload=email_payload(email, subject, message)
+    )
+
+
+def enqueue_emails(messages):
+    return NotificationOutbox.objects.bulk_create([
+        NotificationOutbox(kind='email', payload=email_payload(*message))
+        for message in messages
+    ])
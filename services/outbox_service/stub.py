@@ -0,0 +1,51 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class NotificationStubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            return self._reply(400, {'success': False, 'error': 'JSON inválido'})
+
+        if self.path == '/send-email':
+            self.server.messages.append(body)
+            return self._reply(201, {'success': True, 'messageId': f'stub-{len(self.server.messages)}'})
+
+        if self.path == '/send-email/batch':
+            results = []
+            for message in body.get('messages', []):
+                self.server.messages.append(message)
+                results.append({'success': True, 'messageId': f'stub-{len(self.server.messages)}'})
+            return self._reply(201, {'results': results})
+
+        return self._reply(404, {'success': False, 'error': 'Ruta no encontrada'})
+
+    def _reply(self, status, data):
+        payload = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def make_stub_server(host='127.0.0.1', port=0, verbose=False):
+    server = ThreadingHTTPServer((host, port), NotificationStubHandler)
+    server.messages = []
+    server.verbose = verbose
+    return server
+
+
+def start_stub_server(host='127.0.0.1', port=0):
+    server = make_stub_server(host, port)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
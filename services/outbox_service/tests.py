@@ -0,0 +1,30 @@
+from django.test import TestCase, override_settings
+
+from .dispatcher import batch_errors, dispatch_pending
+from .models import NotificationOutbox
+
+
+class ShortTransport:
+    """Transporte que pierde el último resultado del lote."""
+
+    def __init__(self, options):
+        pass
+
+    def send(self, payloads):
+        return [None] * (len(payloads) - 1)
+
+
+class DispatchTests(TestCase):
+    def test_batch_errors_rejects_missing_results(self):
+        with self.assertRaises(ValueError):
+            batch_errors({'results': [{'success': True}]}, 2)
+
+    @override_settings(NOTIFICATION_SERVICE={'BACKEND': 'outbox_service.tests.ShortTransport'})
+    def test_incomplete_result_fails_whole_batch(self):
+        NotificationOutbox.objects.bulk_create([
+            NotificationOutbox(payload={'to': f'u{i}@example.com'}) for i in range(3)
+        ])
+
+        self.assertEqual(dispatch_pending(), (0, 3))
+        self.assertFalse(NotificationOutbox.objects.exclude(status='pending').exists())
+        self.assertFalse(NotificationOutbox.objects.filter(attempts=0).exists())
@@ -1,6 +1,10 @@
 from django.core.management.base import BaseCommand
-from denuncias_service.models import Denuncia
+from django.db import transaction
+from denuncias_service.models import Denuncia, ArchivedDenuncia, ArchivedDenunciaStats
 from users_service.models import User
+from core.db import raw_cascade_delete
+from core.media import delete_media_files
+import time
 
 class Command(BaseCommand):
     help = 'Elimina todos los usuarios de prueba y sus denuncias (excepto superusuarios)'
@@ -11,16 +15,29 @@ class Command(BaseCommand):
             action='store_true',
             help='Confirmar la eliminación sin preguntar'
         )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Filas eliminadas por transacción, en orden de id (por defecto: 1000)'
+        )
+        parser.add_argument(
+            '--keep-files',
+            action='store_true',
+            help='No eliminar los archivos de evidencias y avatares'
+        )
 
     def handle(self, *args, **options):
         total_users = User.objects.filter(is_superuser=False).count()
         total_denuncias = Denuncia.objects.count()
-        
+        total_archived = ArchivedDenuncia.objects.count()
+
         self.stdout.write(self.style.WARNING(f'\nDatos actuales:'))
         self.stdout.write(f'  Usuarios (no admin): {total_users}')
         self.stdout.write(f'  Denuncias: {total_denuncias}')
-        
-        if total_users == 0 and total_denuncias == 0:
+        self.stdout.write(f'  Denuncias archivadas: {total_archived}')
+
+        if total_users == 0 and total_denuncias == 0 and total_archived == 0:
             self.stdout.write(self.style.SUCCESS('\nNo hay datos para eliminar.'))
             return
 
@@ -30,11 +47,51 @@ class Command(BaseCommand):
             if confirm.lower() != 'yes':
                 self.stdout.write(self.style.ERROR('Operación cancelada.'))
                 return
-        
-        deleted_denuncias = Denuncia.objects.all().delete()[0]
+
+        # Cada bloque se confirma por separado: si el comando se interrumpe,
+        # basta con volver a ejecutarlo para continuar donde quedó.
+        deleted_denuncias = self.purge(Denuncia.objects.all(), total_denuncias, 'denuncias', options)
         self.stdout.write(self.style.SUCCESS(f'Eliminadas {deleted_denuncias} denuncias'))
-        
-        deleted_users = User.objects.filter(is_superuser=False).delete()[0]
+
+        deleted_archived = self.purge(ArchivedDenuncia.objects.all(), total_archived, 'archivadas', options)
+        ArchivedDenunciaStats.objects.all().delete()
+        self.stdout.write(self.style.SUCCESS(f'Eliminadas {deleted_archived} denuncias archivadas'))
+
+        deleted_users = self.purge(User.objects.filter(is_superuser=False), total_users, 'usuarios', options)
         self.stdout.write(self.style.SUCCESS(f'Eliminados {deleted_users} usuarios'))
-        
+
         self.stdout.write(self.style.SUCCESS(f'\nBase de datos limpiada exitosamente'))
+
+    def purge(self, queryset, total, label, options):
+        chunk_size = options['chunk_size']
+        deleted = 0
+        files_deleted = 0
+        last_pk = None
+        started = time.monotonic()
+
+        while True:
+            chunk = queryset.order_by('pk')
+            if last_pk is not None:
+                chunk = chunk.filter(pk__gt=last_pk)
+            pks = list(chunk.values_list('pk', flat=True)[:chunk_size])
+            if not pks:
+                break
+
+            files = None if options['keep_files'] else []
+            with transaction.atomic():
+                deleted += raw_cascade_delete(queryset.model._base_manager.filter(pk__in=pks), files)
+            last_pk = pks[-1]
+
+            if files:
+                removed, failed = delete_media_files(files)
+                files_deleted += removed
+                if failed:
+                    self.stdout.write(self.style.ERROR(f'  No se pudieron eliminar {failed} archivos'))
+
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f'  {label}: {deleted}/{total} (último id {last_pk}, '
+                f'{deleted / max(elapsed, 0.001):.0f} filas/s, {files_deleted} archivos)'
+            )
+
+        return deleted
@@ -1,12 +1,18 @@
-from django.core.management.base import BaseCommand
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max
 from users_service.models import User
-from faker import Faker
+from users_service.seeding import generate_users
+from core.seeding import run_in_workers, split_count
 import random
+import time
 
-fake = Faker('es_ES')
+JOB_SIZE = 50000
+FIRST_DNI = 10000000
+LAST_DNI = 99999999
 
 class Command(BaseCommand):
-    help = 'Genera 100 usuarios de prueba con datos aleatorios'
+    help = 'Genera usuarios de prueba con datos aleatorios (por defecto 100)'
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -15,61 +21,63 @@ class Command(BaseCommand):
             default=100,
             help='Número de usuarios a crear (por defecto: 100)'
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Usuarios insertados por bulk_create (por defecto: 5000)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Procesos generadores en paralelo; usar >1 solo con PostgreSQL (por defecto: 1)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=None,
+            help='Semilla para obtener siempre los mismos datos'
+        )
 
     def handle(self, *args, **options):
         count = options['count']
+        workers = max(1, min(options['workers'], count or 1))
+        seed = options['seed'] if options['seed'] is not None else random.randrange(2 ** 32)
+        
+        max_dni = User.objects.filter(dni__regex=r'^\d{8}$').aggregate(max_dni=Max('dni'))['max_dni']
+        dni_start = max(int(max_dni) + 1 if max_dni else FIRST_DNI, FIRST_DNI)
+        if dni_start + count - 1 > LAST_DNI:
+            raise CommandError('No quedan suficientes DNI de 8 dígitos disponibles para tantos usuarios.')
         
-        regiones = [
-            'Amazonas', 'Ancash', 'Apurimac', 'Arequipa', 'Ayacucho',
-            'Cajamarca', 'Callao', 'Cusco', 'Huancavelica', 'Huanuco',
-            'Ica', 'Junin', 'La Libertad', 'Lambayeque', 'Lima',
-            'Loreto', 'Madre de Dios', 'Moquegua', 'Pasco', 'Piura',
-            'Puno', 'San Martin', 'Tacna', 'Tumbes', 'Ucayali'
-        ]
+        # PBKDF2 es deliberadamente lento: se calcula una sola vez para todos.
+        password_hash = make_password('password123')
         
-        distritos_por_region = {
-            'Lima': ['Miraflores', 'San Isidro', 'Surco', 'La Molina', 'San Borja', 'Jesus Maria', 'Lince', 'Magdalena', 'Pueblo Libre', 'Barranco', 'Chorrillos', 'San Miguel'],
-            'Arequipa': ['Cercado', 'Cayma', 'Yanahuara', 'Cerro Colorado', 'Paucarpata'],
-            'Cusco': ['Cusco', 'Wanchaq', 'San Sebastian', 'San Jeronimo'],
-            'Piura': ['Piura', 'Castilla', 'Catacaos', 'La Union'],
-            'La Libertad': ['Trujillo', 'Victor Larco', 'La Esperanza', 'Huanchaco'],
-        }
+        self.stdout.write(self.style.WARNING(
+            f'Creando {count} usuarios con {workers} proceso(s) (semilla {seed})...'
+        ))
         
-        self.stdout.write(self.style.WARNING(f'Creando {count} usuarios...'))
+        jobs = []
+        offset = 0
+        for i, job_count in enumerate(split_count(count, JOB_SIZE)):
+            jobs.append({
+                'count': job_count,
+                'seed': seed + i,
+                'dni_start': dni_start + offset,
+                'password_hash': password_hash,
+                'batch_size': options['batch_size'],
+            })
+            offset += job_count
         
+        started = time.monotonic()
         created_users = 0
-        for i in range(count):
-            try:
-                dni = fake.unique.random_number(digits=8, fix_len=True)
-                email = f"user{i}_{fake.random_number(digits=4)}@example.com"
-                
-                region = random.choice(regiones)
-                if region in distritos_por_region:
-                    distrito = random.choice(distritos_por_region[region])
-                else:
-                    distrito = fake.city()
-                
-                user = User.objects.create_user(
-                    email=email,
-                    dni=str(dni),
-                    first_name=fake.first_name(),
-                    last_name=fake.last_name(),
-                    password='password123', 
-                    phone=fake.phone_number()[:15],
-                    region=region,
-                    distrito=distrito,
-                    address=fake.street_address(),
-                    gender=random.choice(['male', 'female'])
-                )
-                
-                created_users += 1
-                
-                if (i + 1) % 10 == 0:
-                    self.stdout.write(self.style.SUCCESS(f'Creados {i + 1}/{count} usuarios...'))
-                    
-            except Exception as e:
-                self.stdout.write(self.style.ERROR(f'  Error creando usuario {i + 1}: {str(e)}'))
-                continue
+        for created in run_in_workers(generate_users, jobs, workers):
+            created_users += created
+            self.stdout.write(self.style.SUCCESS(f'Creados {created_users}/{count} usuarios...'))
+        elapsed = time.monotonic() - started
         
-        self.stdout.write(self.style.SUCCESS(f'\nSe crearon exitosamente {created_users} usuarios'))
+        self.stdout.write(self.style.SUCCESS(
+            f'\nSe crearon exitosamente {created_users} usuarios en {elapsed:.1f}s '
+            f'({created_users / max(elapsed, 0.001):.0f} filas/s)'
+        ))
         self.stdout.write(self.style.WARNING(f'  Contraseña para todos: password123'))
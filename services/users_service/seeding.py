@@ -0,0 +1,64 @@
+import random
+
+from django.db import transaction
+from faker import Faker
+
+from .models import User
+
+NAME_POOL_SIZE = 1000
+
+REGIONES = [
+    'Amazonas', 'Ancash', 'Apurimac', 'Arequipa', 'Ayacucho',
+    'Cajamarca', 'Callao', 'Cusco', 'Huancavelica', 'Huanuco',
+    'Ica', 'Junin', 'La Libertad', 'Lambayeque', 'Lima',
+    'Loreto', 'Madre de Dios', 'Moquegua', 'Pasco', 'Piura',
+    'Puno', 'San Martin', 'Tacna', 'Tumbes', 'Ucayali'
+]
+
+DISTRITOS_POR_REGION = {
+    'Lima': ['Miraflores', 'San Isidro', 'Surco', 'La Molina', 'San Borja', 'Jesus Maria', 'Lince', 'Magdalena', 'Pueblo Libre', 'Barranco', 'Chorrillos', 'San Miguel'],
+    'Arequipa': ['Cercado', 'Cayma', 'Yanahuara', 'Cerro Colorado', 'Paucarpata'],
+    'Cusco': ['Cusco', 'Wanchaq', 'San Sebastian', 'San Jeronimo'],
+    'Piura': ['Piura', 'Castilla', 'Catacaos', 'La Union'],
+    'La Libertad': ['Trujillo', 'Victor Larco', 'La Esperanza', 'Huanchaco'],
+}
+
+
+def generate_users(count, seed, dni_start, password_hash, batch_size=5000):
+    rng = random.Random(seed)
+    fake = Faker('es_ES')
+    fake.seed_instance(seed)
+    first_names = [fake.first_name() for _ in range(NAME_POOL_SIZE)]
+    last_names = [fake.last_name() for _ in range(NAME_POOL_SIZE)]
+    cities = [fake.city() for _ in range(NAME_POOL_SIZE)]
+    addresses = [fake.street_address() for _ in range(NAME_POOL_SIZE)]
+
+    created = 0
+    while created < count:
+        size = min(batch_size, count - created)
+        batch = []
+        for offset in range(created, created + size):
+            dni = f'{dni_start + offset:08d}'
+            region = rng.choice(REGIONES)
+            if region in DISTRITOS_POR_REGION:
+                distrito = rng.choice(DISTRITOS_POR_REGION[region])
+            else:
+                distrito = rng.choice(cities)
+
+            batch.append(User(
+                email=f'user{dni}@example.com',
+                dni=dni,
+                first_name=rng.choice(first_names),
+                last_name=rng.choice(last_names),
+                password=password_hash,
+                phone=f'9{rng.randrange(10 ** 8):08d}',
+                region=region,
+                distrito=distrito,
+                address=rng.choice(addresses),
+                gender=rng.choice(['male', 'female']),
+            ))
+
+        with transaction.atomic():
+            User.objects.bulk_create(batch, batch_size=batch_size)
+        created += size
+    return created
@@ -1,6 +1,9 @@
 from rest_framework import serializers
 from .models import User
+from django.conf import settings
 from django.contrib.auth.password_validation import validate_password
+from core.images import optimize_image
+from core.regions import REGION_CHOICES
 
 class UserSerializer(serializers.ModelSerializer):
     avatar = serializers.SerializerMethodField()
@@ -71,6 +74,14 @@ class UserProfileUpdateSerializer(serializers.ModelSerializer):
         if User.objects.exclude(pk=user.pk).filter(email=value).exists():
             raise serializers.ValidationError("Este correo electrónico ya está en uso.")
         return value
+    
+    def validate_avatar(self, value):
+        if not value:
+            return value
+        optimized = optimize_image(value, settings.AVATAR_MAX_DIMENSION, settings.IMAGE_UPLOAD_QUALITY)
+        if optimized is None:
+            return value
+        return optimized[0]
 
 class ChangePasswordSerializer(serializers.Serializer):
     old_password = serializers.CharField(required=True, write_only=True)
@@ -100,3 +111,40 @@ class ChangePasswordSerializer(serializers.Serializer):
         user.save()
         return user
 
+
+class UserBulkPatchSerializer(serializers.Serializer):
+    is_active = serializers.BooleanField(required=False)
+    is_staff = serializers.BooleanField(required=False)
+    is_superuser = serializers.BooleanField(required=False)
+    region = serializers.ChoiceField(choices=REGION_CHOICES, required=False, allow_null=True)
+    
+    def validate(self, data):
+        if not data:
+            raise serializers.ValidationError("Debe indicar al menos un campo a modificar.")
+        return data
+
+class UserBulkUpdateSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        max_length=5000
+    )
+    filter = serializers.DictField(required=False)
+    patch = UserBulkPatchSerializer()
+    
+    def validate_filter(self, value):
+        allowed = {'is_active', 'is_staff', 'is_superuser', 'region', 'search'}
+        unknown = set(value) - allowed
+        if unknown:
+            raise serializers.ValidationError(
+                f"Filtros no soportados: {', '.join(sorted(unknown))}. Use: {', '.join(sorted(allowed))}."
+            )
+        if not value:
+            raise serializers.ValidationError("El filtro no puede estar vacío.")
+        return value
+    
+    def validate(self, data):
+        if ('ids' in data) == ('filter' in data):
+            raise serializers.ValidationError("Debe indicar 'ids' o 'filter', pero no ambos.")
+        return data
@@ -1,3 +1,47 @@
-from django.test import TestCase
+from core.testing import QueryBudgetTestCase, create_user
+from .models import User
 
-# Create your tests here.
+
+class UserQueryBudgetTests(QueryBudgetTestCase):
+    def test_list(self):
+        self.assertQueryBudget('user-list', self.user, status_code=403)
+        self.assertQueryBudget('user-list', self.superuser, grow=True, page_sizes=[50])
+
+    def test_bulk_update(self):
+        ids = [create_user().pk, self.other_user.pk]
+        self.assertQueryBudget(
+            'user-bulk-update', self.superuser, method='patch',
+            data={'ids': ids, 'patch': {'is_active': False}}, format='json'
+        )
+        self.assertFalse(User.objects.filter(pk__in=ids, is_active=True).exists())
+
+    def test_detail(self):
+        self.assertQueryBudget('user-detail', self.superuser, kwargs={'pk': self.user.pk})
+
+    def test_update(self):
+        self.assertQueryBudget(
+            'user-update', self.superuser, method='patch', kwargs={'pk': self.user.pk},
+            data={'first_name': 'Rosa'}, format='json'
+        )
+
+    def test_delete(self):
+        self.assertQueryBudget('user-delete', self.superuser, method='delete', kwargs={'pk': self.other_user.pk})
+        self.assertFalse(User.objects.filter(pk=self.other_user.pk).exists())
+
+    def test_my_profile(self):
+        for user in (self.user, self.superuser):
+            with self.subTest(user=self.role(user)):
+                self.assertQueryBudget('my-profile', user, grow=True)
+
+    def test_update_my_profile(self):
+        self.assertQueryBudget(
+            'update-my-profile', self.user, method='patch',
+            data={'first_name': 'Lucia'}, format='multipart'
+        )
+
+    def test_change_password(self):
+        self.assertQueryBudget('change-password', self.user, method='post', data={
+            'old_password': 'clave-segura-123',
+            'new_password': 'otra-clave-segura-456',
+            'confirm_password': 'otra-clave-segura-456',
+        }, format='json')
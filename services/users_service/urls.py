@@ -4,6 +4,7 @@ from .views import (
     UserDetailView,
     UserUpdateView,
     UserDeleteView,
+    UserBulkUpdateView,
 
     MyProfileView,
     UpdateMyProfileView,
@@ -12,6 +13,7 @@ from .views import (
 
 urlpatterns = [
     path('users/', UserListView.as_view(), name='user-list'),
+    path('users/bulk/', UserBulkUpdateView.as_view(), name='user-bulk-update'),
     path('users/<int:pk>/', UserDetailView.as_view(), name='user-detail'),
     path('users/<int:pk>/update/', UserUpdateView.as_view(), name='user-update'),
     path('users/<int:pk>/delete/', UserDeleteView.as_view(), name='user-delete'),
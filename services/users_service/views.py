@@ -3,7 +3,9 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Count, Q
+from rest_framework.authtoken.models import Token
 from core.pagination import CustomPageNumberPagination
 from .models import User
 from .serializers import (
@@ -11,9 +13,40 @@ from .serializers import (
     UserUpdateSerializer,
     UserProfileSerializer,
     UserProfileUpdateSerializer,
-    ChangePasswordSerializer
+    ChangePasswordSerializer,
+    UserBulkUpdateSerializer
 )
 from .permissions import IsSuperUser
+from auth_service.authentication import invalidate_tokens
+
+def filter_users(queryset, params):
+    is_active = params.get('is_active', None)
+    if is_active is not None:
+        queryset = queryset.filter(is_active=str(is_active).lower() == 'true')
+
+    region = params.get('region', None)
+    if region:
+        queryset = queryset.filter(region=region)
+    
+    is_staff = params.get('is_staff', None)
+    if is_staff is not None:
+        queryset = queryset.filter(is_staff=str(is_staff).lower() == 'true')
+
+    is_superuser = params.get('is_superuser', None)
+    if is_superuser is not None:
+        queryset = queryset.filter(is_superuser=str(is_superuser).lower() == 'true')
+        
+    search  = params.get('search', None)
+    if search:
+        queryset = queryset.filter(
+            Q(first_name__icontains=search) |
+            Q(last_name__icontains=search) |
+            Q(email__icontains=search) |
+            Q(dni__icontains=search) |
+            Q(phone__icontains=search)
+        )
+    
+    return queryset
 
 class UserListView(generics.ListAPIView):
     queryset = User.objects.all()
@@ -23,30 +56,7 @@ class UserListView(generics.ListAPIView):
     
     def get_queryset(self):
         queryset = User.objects.all().order_by('-date_joined')
-        
-        is_active = self.request.query_params.get('is_active', None)
-        if is_active is not None:
-            queryset = queryset.filter(is_active=is_active.lower() == 'true')
-
-        region = self.request.query_params.get('region', None)
-        if region:
-            queryset = queryset.filter(region=region)
-        
-        is_staff = self.request.query_params.get('is_staff', None)
-        if is_staff is not None:
-            queryset = queryset.filter(is_staff=is_staff.lower() == 'true')
-            
-        search  = self.request.query_params.get('search', None)
-        if search:
-            queryset = queryset.filter(
-                Q(first_name__icontains=search) |
-                Q(last_name__icontains=search) |
-                Q(email__icontains=search) |
-                Q(dni__icontains=search) |
-                Q(phone__icontains=search)
-            )
-        
-        return queryset
+        return filter_users(queryset, self.request.query_params)
 
 class UserDetailView(generics.RetrieveAPIView):
     queryset = User.objects.all()
@@ -106,6 +116,50 @@ class UserDeleteView(generics.DestroyAPIView):
             'message': f'Usuario con DNI {dni} eliminado exitosamente.'
         }, status=status.HTTP_200_OK)
 
+class UserBulkUpdateView(APIView):
+    permission_classes = [IsAuthenticated, IsSuperUser]
+    
+    def patch(self, request):
+        serializer = UserBulkUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        data = serializer.validated_data
+        patch = data['patch']
+        if 'ids' in data:
+            queryset = User.objects.filter(pk__in=data['ids'])
+        else:
+            queryset = filter_users(User.objects.all(), data['filter'])
+        
+        with transaction.atomic():
+            if patch.get('is_superuser') is False or patch.get('is_active') is False:
+                if queryset.filter(pk=request.user.pk).exists():
+                    return Response({
+                        'error': 'No puedes desactivar ni quitar permisos a tu propia cuenta.'
+                    }, status=status.HTTP_400_BAD_REQUEST)
+                
+                remaining = list(
+                    User.objects
+                    .select_for_update()
+                    .filter(is_superuser=True, is_active=True)
+                    .exclude(pk__in=queryset.values('pk'))
+                    .values_list('pk', flat=True)
+                )
+                if not remaining:
+                    return Response({
+                        'error': 'No se puede dejar al sistema sin ningún superusuario activo.'
+                    }, status=status.HTTP_400_BAD_REQUEST)
+            
+            token_keys = list(
+                Token.objects.filter(user__in=queryset.values('pk')).values_list('key', flat=True)
+            )
+            affected = queryset.update(**patch)
+            transaction.on_commit(lambda: invalidate_tokens(token_keys))
+        
+        return Response({
+            'message': f'{affected} usuarios actualizados exitosamente',
+            'affected': affected
+        }, status=status.HTTP_200_OK)
+
 class MyProfileView(APIView):
     permission_classes = [IsAuthenticated]
     
@@ -117,7 +171,13 @@ class MyProfileView(APIView):
 
         user_serializer = UserProfileSerializer(user, context={'request': request})
 
-        recent_denuncias = Denuncia.objects.filter(user=user).order_by('-created_at')[:5]
+        recent_denuncias = (
+            Denuncia.objects
+            .filter(user=user)
+            .select_related('user')
+            .annotate(evidence_count=Count('evidence'))
+            .order_by('-created_at')[:5]
+        )
         denuncias_serializer = DenunciaListSerializer(recent_denuncias, many=True)
         
         return Response({